@@ -68,6 +68,10 @@ load_dotenv(ENV_FILE)
 SERVER_LOG_FILE = os.getenv("MCP_LOG_FILE", OBSIDIAN_DIR / "server.log")
 MCP_PORT = int(os.getenv("MCP_PORT", 5678))
 MCP_HOST = os.getenv("MCP_HOST", "0.0.0.0")
+MCP_SERVER_MODE = os.getenv("MCP_SERVER_MODE", "development")
+MCP_WORKERS = int(os.getenv("MCP_WORKERS", 0))  # 0 lets serve.py pick based on CPU count
+MCP_THREADS = int(os.getenv("MCP_THREADS", 0))
+MCP_SOCKET = os.getenv("MCP_SOCKET")  # Unix domain socket the server also listens on (production/async mode)
 
 # Terminal colors
 class Colors:
@@ -118,11 +122,16 @@ def run_python_script(script_path, args=None):
 
 def is_server_running():
     """Check if the server is running"""
-    # First, try socket connection
+    # First, try socket connection (the Unix domain socket avoids a TCP handshake when configured)
     import socket
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if MCP_SOCKET and hasattr(socket, "AF_UNIX") and os.path.exists(MCP_SOCKET):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = MCP_SOCKET
+    else:
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = ("localhost", MCP_PORT)
     try:
-        s.connect(("localhost", MCP_PORT))
+        s.connect(address)
         s.close()
         return True
     except (socket.error, ConnectionRefusedError):
@@ -222,8 +231,8 @@ def configure_server():
     except IOError as e:
         colored_print(f"Error saving configuration: {e}", Colors.RED)
 
-def start_server():
-    """Start the Shared Memory Framework Server"""
+def start_server(mode=MCP_SERVER_MODE, workers=MCP_WORKERS, threads=MCP_THREADS):
+    """Start the Shared Memory Framework Server in development, production or async mode"""
     if is_server_running():
         colored_print("Shared Memory Framework Server is already running.", Colors.YELLOW)
         return
@@ -246,7 +255,15 @@ def start_server():
         python_path = VENV_DIR / "bin" / "python"
     
     # Start the server
-    colored_print("Starting Shared Memory Framework Server on port 5678...", Colors.BLUE)
+    colored_print(f"Starting Shared Memory Framework Server on port 5678 ({mode} mode)...", Colors.BLUE)
+    
+    server_cmd = [str(python_path), "serve.py", "--mode", mode, "--host", MCP_HOST, "--port", str(MCP_PORT)]
+    if threads:
+        server_cmd += ["--threads", str(threads)]
+    if workers:
+        server_cmd += ["--workers", str(workers)]
+    if MCP_SOCKET and mode != "development":
+        server_cmd += ["--socket", os.path.abspath(MCP_SOCKET)]
     
     try:
         # Change to server directory
@@ -257,7 +274,7 @@ def start_server():
             # Windows process creation
             from subprocess import CREATE_NEW_CONSOLE
             process = subprocess.Popen(
-                [str(python_path), "app.py"],
+                server_cmd,
                 creationflags=CREATE_NEW_CONSOLE,
                 stdout=open(SERVER_LOG_FILE, 'w'),
                 stderr=subprocess.STDOUT
@@ -265,14 +282,17 @@ def start_server():
         else:
             # Unix-like systems
             process = subprocess.Popen(
-                [str(python_path), "app.py"],
+                server_cmd,
                 stdout=open(SERVER_LOG_FILE, 'w'),
                 stderr=subprocess.STDOUT,
                 start_new_session=True  # Equivalent to nohup
             )
         
-        # Save PID to env file
+        # Save PID and mode to env file
         set_key(ENV_FILE, "MCP_PID", str(process.pid))
+        set_key(ENV_FILE, "MCP_RUNNING_MODE", mode)
+        os.environ["MCP_PID"] = str(process.pid)
+        os.environ["MCP_RUNNING_MODE"] = mode
         
         # Wait a moment to ensure server starts
         import time
@@ -308,7 +328,7 @@ def stop_server():
                 if platform.system() == 'Windows':
                     subprocess.run("taskkill /f /im python.exe /fi \"WINDOWTITLE eq Shared Memory Framework Server\"", shell=True)
                 else:
-                    subprocess.run("pkill -f 'python.*app.py'", shell=True)
+                    subprocess.run("pkill -f 'python.*(app|serve).py'", shell=True)
             except subprocess.SubprocessError:
                 pass
             return
@@ -333,6 +353,27 @@ def stop_server():
     except (ValueError, TypeError):
         colored_print("Invalid PID format in environment settings.", Colors.RED)
 
+def reload_server():
+    """Gracefully reload a production server: workers finish in-flight requests before restarting"""
+    if os.getenv("MCP_RUNNING_MODE") != "production" or platform.system() == 'Windows':
+        colored_print("Graceful reload is only available for production mode on Linux/macOS; use stop and start instead.", Colors.YELLOW)
+        return
+    
+    try:
+        pid = int(os.getenv("MCP_PID", 0))
+    except (ValueError, TypeError):
+        pid = 0
+    if pid <= 0 or not is_server_running():
+        colored_print("Server is not running.", Colors.YELLOW)
+        return
+    
+    import signal
+    try:
+        os.kill(pid, signal.SIGHUP)
+        colored_print(f"Reload signal sent to server (PID: {pid}).", Colors.GREEN)
+    except OSError as e:
+        colored_print(f"Error reloading server: {e}", Colors.RED)
+
 def check_status():
     """Check the status of all knowledge connectors"""
     colored_print(f"{Colors.BOLD}Shared Memory Framework Status{Colors.NC}")
@@ -383,7 +424,7 @@ def check_status():
             else:
                 colored_print("  Status: Not registered", Colors.YELLOW)
                 client_path = SCRIPT_DIR / "obsidian" / "adapters" / "universal_client.py"
-                colored_print(f"  Note: Run '{Colors.BOLD}claude mcp add obsidian -- python {client_path}{Colors.NC}' to register")
+                colored_print(f"  Note: Run '{Colors.BOLD}claude mcp add obsidian -- python {client_path} --jsonrpc-stdio{Colors.NC}' to register")
         except subprocess.SubprocessError:
             colored_print("  Status: Error checking MCP registration", Colors.RED)
     else:
@@ -432,7 +473,7 @@ def repair_mcp():
         
         try:
             result = subprocess.run(
-                ["claude", "mcp", "add", "obsidian", "--", sys.executable, str(client_path), "--jsonrpc"],
+                ["claude", "mcp", "add", "obsidian", "--", sys.executable, str(client_path), "--jsonrpc-stdio"],
                 capture_output=True, text=True, check=False
             )
             
@@ -481,13 +522,21 @@ def main():
     parser = argparse.ArgumentParser(
         description="Shared Memory Framework Management Tool"
     )
-    parser.add_argument("command", nargs="?", choices=["start", "stop", "status", "configure", "repair", "help"],
+    parser.add_argument("command", nargs="?", choices=["start", "stop", "reload", "status", "configure", "repair", "help"],
                       default="help", help="Command to run")
+    parser.add_argument("--mode", choices=["development", "production", "async"], default=MCP_SERVER_MODE,
+                      help="Server mode for start (default: development, or MCP_SERVER_MODE)")
+    parser.add_argument("--workers", type=int, default=MCP_WORKERS,
+                      help="Worker processes in production mode (default: based on CPU count, or MCP_WORKERS)")
+    parser.add_argument("--threads", type=int, default=MCP_THREADS,
+                      help="Threads per worker in production mode (default: 8), or file I/O threads in async mode (default: 32); or MCP_THREADS")
     
     args = parser.parse_args()
     
     if args.command == "start":
-        start_server()
+        start_server(args.mode, args.workers, args.threads)
+    elif args.command == "reload":
+        reload_server()
     elif args.command == "stop":
         stop_server()
     elif args.command == "status":
@@ -500,6 +549,9 @@ def main():
         parser.print_help()
         print("\nExamples:")
         print("  manage-mcp.py start    # Start the Shared Memory Framework Server")
+        print("  manage-mcp.py start --mode production --workers 4 --threads 8")
+        print("  manage-mcp.py start --mode async   # Single event loop, file I/O in a thread pool")
+        print("  manage-mcp.py reload   # Gracefully reload a production server")
         print("  manage-mcp.py status   # Check status of running servers")
         print("  manage-mcp.py repair   # Check and repair MCP connectivity issues")
 
@@ -1,34 +1,198 @@
 #!/usr/bin/env python3
 import requests
 import json
+import gzip
 import os
 import sys
+import socket
 import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.exceptions import NewConnectionError
 from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
 
 # Default server URL
-SERVER_URL = "http://localhost:5678"
+SERVER_URL = os.environ.get("MCP_SERVER_URL", "http://localhost:5678")
+# Unix domain socket of a same-host server started with --socket; used instead of TCP while it accepts connections
+SERVER_SOCKET = os.environ.get("MCP_SOCKET")
 DEFAULT_TIMEOUT = 10  # seconds
+BATCH_TIMEOUT = 120  # seconds, for /write/batch
+NDJSON_MIMETYPE = "application/x-ndjson"
+JSONRPC_WORKERS = 8  # concurrent in-flight requests in --jsonrpc-stdio mode
+COMPRESS_MIN_BYTES = 1024  # request bodies at least this large are sent gzip-compressed
+VALIDATOR_CACHE_SIZE = 256  # /read and /search responses kept for revalidation with If-None-Match
 
-# Create a session with retry logic and connection pooling
-session = requests.Session()
-retry_strategy = Retry(
+def connect_unix(socket_path, timeout=None):
+    """Socket connected to the Unix domain socket at socket_path (raises OSError)"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    if isinstance(timeout, (int, float)):
+        sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def socket_accepts(socket_path):
+    """Check if a server is listening on socket_path, not just a stale socket file left by a crash"""
+    try:
+        connect_unix(socket_path, timeout=1).close()
+    except OSError:
+        return False
+    return True
+
+class UnixSocketConnection(HTTPConnection):
+    """
+    urllib3 connection that talks HTTP over socket_path instead of TCP
+    
+    Falls back to TCP to the URL's host and port when nothing listens on the
+    socket any more (the server stopped or was restarted without --socket).
+    """
+    socket_path = None
+    
+    def _new_conn(self):
+        try:
+            return connect_unix(self.socket_path, self.timeout)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return super()._new_conn()
+        except OSError as e:
+            raise NewConnectionError(self, f"Failed to connect to {self.socket_path}: {e}") from e
+
+class UnixSocketAdapter(HTTPAdapter):
+    """Transport adapter sending requests for its mount prefix through a Unix domain socket"""
+    
+    def __init__(self, socket_path, **kwargs):
+        self.socket_path = socket_path
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        connection_class = type("UnixSocketConnection", (UnixSocketConnection,), {"socket_path": self.socket_path})
+        pool_class = type("UnixSocketConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": connection_class})
+        self.poolmanager.pool_classes_by_scheme = {"http": pool_class, "https": pool_class}
+
+def make_session(retry_strategy):
+    """Session with connection pooling and the given retry logic, over the Unix socket when there is one"""
+    new_session = requests.Session()
+    adapter = HTTPAdapter(max_retries=retry_strategy)
+    new_session.mount("http://", adapter)
+    new_session.mount("https://", adapter)
+    if SERVER_SOCKET and hasattr(socket, "AF_UNIX") and socket_accepts(SERVER_SOCKET) and SERVER_URL.startswith("http://"):
+        new_session.mount(SERVER_URL.rstrip("/") + "/", UnixSocketAdapter(SERVER_SOCKET, max_retries=retry_strategy))
+    # Every coding urllib3 can decode here (gzip and deflate, plus br/zstd when their packages are installed)
+    new_session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    return new_session
+
+# Reads, searches and whole-note writes give the same result when repeated, so
+# timeouts and server errors are retried
+session = make_session(Retry(
     total=3,
     backoff_factor=0.5,
     status_forcelist=[429, 500, 502, 503, 504],
     allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"]
-)
-adapter = HTTPAdapter(max_retries=retry_strategy)
-session.mount("http://", adapter)
-session.mount("https://", adapter)
+))
+# Appends and prepends may already be applied when a response is lost, so they are
+# retried only when the connection could not be made and nothing was sent
+append_session = make_session(Retry(total=3, connect=3, read=0, status=0, other=0, backoff_factor=0.5))
 
-def search_notes(query):
-    """Search for notes matching the query"""
+def post_json(url, data, timeout=DEFAULT_TIMEOUT, idempotent=True):
+    """
+    POST a JSON body, gzip-compressed when it is large enough to be worth it
+    
+    Requests that add to a note rather than replace it pass idempotent=False,
+    so they are never sent twice.
+    """
+    body = json.dumps(data).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=1, mtime=0)
+        headers["Content-Encoding"] = "gzip"
+    return (session if idempotent else append_session).post(url, data=body, headers=headers, timeout=timeout)
+
+# (url, params) -> (ETag, parsed response), least recently used first
+validator_cache = OrderedDict()
+validator_lock = threading.Lock()
+
+def get_json(url, params):
+    """
+    GET a JSON response, revalidating a cached copy with If-None-Match
+    
+    When the server answers 304 Not Modified the cached response is returned,
+    so unchanged notes and search results cost no body transfer.
+    """
+    key = (url, tuple(params.items()) if isinstance(params, dict) else tuple(params))
+    with validator_lock:
+        cached = validator_cache.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else None
+    
+    response = session.get(url, params=params, headers=headers, timeout=DEFAULT_TIMEOUT)
+    if response.status_code == 304 and cached:
+        with validator_lock:
+            if key in validator_cache:
+                validator_cache.move_to_end(key)
+        return cached[1]
+    response.raise_for_status()
+    data = response.json()
+    
+    etag = response.headers.get("ETag")
+    with validator_lock:
+        if etag:
+            validator_cache[key] = (etag, data)
+            validator_cache.move_to_end(key)
+            while len(validator_cache) > VALIDATOR_CACHE_SIZE:
+                validator_cache.popitem(last=False)
+        else:
+            validator_cache.pop(key, None)
+    return data
+
+def stream_ndjson(url, params):
+    """Yield each JSON object of a streamed NDJSON response as soon as its line arrives"""
     try:
-        response = session.get(f"{SERVER_URL}/search", params={"query": query}, timeout=DEFAULT_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        with session.get(url, params=params, headers={"Accept": NDJSON_MIMETYPE},
+                         stream=True, timeout=DEFAULT_TIMEOUT) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+    except requests.exceptions.ConnectionError:
+        yield {"error": {"code": -32003, "message": "Transport error: Could not connect to server"}}
+    except requests.exceptions.Timeout:
+        yield {"error": {"code": -32002, "message": "Server timeout"}}
+    except requests.exceptions.HTTPError as e:
+        yield {"error": {"code": -32001, "message": f"HTTP error: {e}"}}
+    except requests.exceptions.RequestException as e:
+        yield {"error": {"code": -32000, "message": f"Transport error: {str(e)}"}}
+    except ValueError as e:  # JSON decode error
+        yield {"error": {"code": -32700, "message": f"Parse error: {str(e)}"}}
+
+def search_notes(query, stream=False, limit=None, offset=None, sort=None, prefix=None,
+                 snippets=None, context=None, fuzzy=None):
+    """
+    Search for notes matching the query
+    
+    limit/offset page through the results, sort orders them (relevance, mtime, date
+    or path) and prefix restricts them to paths starting with the given folder.
+    snippets/context include up to that many matching lines (with surrounding lines) per hit.
+    fuzzy ("auto" or 0-2 edits per word) tolerates typos, ranking the most similar notes first.
+    With stream=True, returns a generator of {"path": ...} hits yielded as the server finds them
+    """
+    params = {"query": query}
+    for name, value in (("limit", limit), ("offset", offset), ("sort", sort), ("prefix", prefix),
+                        ("snippets", snippets), ("context", context), ("fuzzy", fuzzy)):
+        if value is not None:
+            params[name] = value
+    
+    if stream:
+        return stream_ndjson(f"{SERVER_URL}/search", params)
+    
+    try:
+        return get_json(f"{SERVER_URL}/search", params)
     except requests.exceptions.ConnectionError:
         return {"error": {"code": -32003, "message": "Transport error: Could not connect to server"}}
     except requests.exceptions.Timeout:
@@ -40,16 +204,22 @@ def search_notes(query):
     except ValueError as e:  # JSON decode error
         return {"error": {"code": -32700, "message": f"Parse error: {str(e)}"}}
 
-def read_notes(paths):
-    """Read one or more notes by path"""
+def read_notes(paths, stream=False):
+    """
+    Read one or more notes by path
+    
+    With stream=True, returns a generator of {"path": ..., "content": ...} (or "error")
+    objects yielded one note at a time
+    """
     params = []
     for path in paths:
         params.append(("path", path))
     
+    if stream:
+        return stream_ndjson(f"{SERVER_URL}/read", params)
+    
     try:
-        response = session.get(f"{SERVER_URL}/read", params=params, timeout=DEFAULT_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        return get_json(f"{SERVER_URL}/read", params)
     except requests.exceptions.ConnectionError:
         return {"error": {"code": -32003, "message": "Transport error: Could not connect to server"}}
     except requests.exceptions.Timeout:
@@ -69,7 +239,134 @@ def write_note(path, content):
     }
     
     try:
-        response = session.post(f"{SERVER_URL}/write", json=data, timeout=DEFAULT_TIMEOUT)
+        response = post_json(f"{SERVER_URL}/write", data)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.ConnectionError:
+        return {"error": {"code": -32003, "message": "Transport error: Could not connect to server"}}
+    except requests.exceptions.Timeout:
+        return {"error": {"code": -32002, "message": "Server timeout"}}
+    except requests.exceptions.HTTPError as e:
+        return {"error": {"code": -32001, "message": f"HTTP error: {e}"}}
+    except requests.exceptions.RequestException as e:
+        return {"error": {"code": -32000, "message": f"Transport error: {str(e)}"}}
+    except ValueError as e:  # JSON decode error
+        return {"error": {"code": -32700, "message": f"Parse error: {str(e)}"}}
+
+def write_notes(notes):
+    """
+    Write many notes in one request
+    
+    notes is a list of {"path", "content"} objects. Returns {"written", "failed",
+    "results"} with one {"path", "status"} result per note, in order.
+    """
+    try:
+        response = post_json(f"{SERVER_URL}/write/batch", notes, timeout=BATCH_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.ConnectionError:
+        return {"error": {"code": -32003, "message": "Transport error: Could not connect to server"}}
+    except requests.exceptions.Timeout:
+        return {"error": {"code": -32002, "message": "Server timeout"}}
+    except requests.exceptions.HTTPError as e:
+        return {"error": {"code": -32001, "message": f"HTTP error: {e}"}}
+    except requests.exceptions.RequestException as e:
+        return {"error": {"code": -32000, "message": f"Transport error: {str(e)}"}}
+    except ValueError as e:  # JSON decode error
+        return {"error": {"code": -32700, "message": f"Parse error: {str(e)}"}}
+
+def append_note(path, content):
+    """Append content to a note, creating it if it does not exist"""
+    data = {
+        "path": path,
+        "content": content
+    }
+    
+    try:
+        response = post_json(f"{SERVER_URL}/append", data, idempotent=False)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.ConnectionError:
+        return {"error": {"code": -32003, "message": "Transport error: Could not connect to server"}}
+    except requests.exceptions.Timeout:
+        return {"error": {"code": -32002, "message": "Server timeout"}}
+    except requests.exceptions.HTTPError as e:
+        return {"error": {"code": -32001, "message": f"HTTP error: {e}"}}
+    except requests.exceptions.RequestException as e:
+        return {"error": {"code": -32000, "message": f"Transport error: {str(e)}"}}
+    except ValueError as e:  # JSON decode error
+        return {"error": {"code": -32700, "message": f"Parse error: {str(e)}"}}
+
+def patch_note(path, heading, content, operation=None):
+    """
+    Change the section of a note under a heading
+    
+    operation is "replace" (default), "append" or "prepend"; heading may include
+    the "#" marks to match only that level (e.g. "## Actions").
+    """
+    data = {
+        "path": path,
+        "heading": heading,
+        "content": content
+    }
+    if operation:
+        data["operation"] = operation
+    
+    try:
+        response = post_json(f"{SERVER_URL}/patch", data, idempotent=operation in (None, "replace"))
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.ConnectionError:
+        return {"error": {"code": -32003, "message": "Transport error: Could not connect to server"}}
+    except requests.exceptions.Timeout:
+        return {"error": {"code": -32002, "message": "Server timeout"}}
+    except requests.exceptions.HTTPError as e:
+        return {"error": {"code": -32001, "message": f"HTTP error: {e}"}}
+    except requests.exceptions.RequestException as e:
+        return {"error": {"code": -32000, "message": f"Transport error: {str(e)}"}}
+    except ValueError as e:  # JSON decode error
+        return {"error": {"code": -32700, "message": f"Parse error: {str(e)}"}}
+
+def query_notes(tags=None, agent=None, status=None, project=None, date_from=None, date_to=None,
+                prefix=None, limit=None, offset=None):
+    """
+    Find notes by frontmatter fields
+    
+    Every given filter must match; tags lists tags that must all be present and
+    date_from/date_to (YYYY-MM-DD) bound the frontmatter date inclusively.
+    Returns [{"path", "title", "agent", "date", "tags", ...}] newest first.
+    """
+    params = [("tag", tag) for tag in tags or []]
+    for name, value in (("agent", agent), ("status", status), ("project", project), ("date_from", date_from),
+                        ("date_to", date_to), ("prefix", prefix), ("limit", limit), ("offset", offset)):
+        if value is not None:
+            params.append((name, value))
+    
+    try:
+        response = session.get(f"{SERVER_URL}/query", params=params, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.ConnectionError:
+        return {"error": {"code": -32003, "message": "Transport error: Could not connect to server"}}
+    except requests.exceptions.Timeout:
+        return {"error": {"code": -32002, "message": "Server timeout"}}
+    except requests.exceptions.HTTPError as e:
+        return {"error": {"code": -32001, "message": f"HTTP error: {e}"}}
+    except requests.exceptions.RequestException as e:
+        return {"error": {"code": -32000, "message": f"Transport error: {str(e)}"}}
+    except ValueError as e:  # JSON decode error
+        return {"error": {"code": -32700, "message": f"Parse error: {str(e)}"}}
+
+def recent_conversations(agent=None, limit=None):
+    """Most recent conversation notes of an agent (or of all agents) as {"path", "date"} objects"""
+    params = {}
+    if agent:
+        params["agent"] = agent
+    if limit is not None:
+        params["limit"] = limit
+    
+    try:
+        response = session.get(f"{SERVER_URL}/conversations/recent", params=params, timeout=DEFAULT_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.ConnectionError:
@@ -98,6 +395,15 @@ def check_server():
     except ValueError as e:  # JSON decode error
         return {"status": "error", "message": f"Invalid server response: {str(e)}"}
 
+def note_result(result, path):
+    """Content of one note from a read_notes() result, or its error"""
+    if isinstance(result, dict) and "error" in result:
+        return result
+    # Handle case where result is not a dictionary or doesn't contain the path
+    if not isinstance(result, dict):
+        return {"error": {"code": -32000, "message": f"Unexpected result format: {type(result)}"}}
+    return result.get(path, "")
+
 # Claude MCP API compatibility functions
 def handle_jsonrpc(method, params=None):
     """Handle JSON-RPC requests from Claude MCP"""
@@ -107,29 +413,185 @@ def handle_jsonrpc(method, params=None):
             
         if method == "get":
             if "path" in params:
-                paths = [params["path"]]
-                result = read_notes(paths)
-                if isinstance(result, dict) and "error" in result:
-                    return result
-                # Handle case where result is not a dictionary or doesn't contain the path
-                if not isinstance(result, dict):
-                    return {"error": {"code": -32000, "message": f"Unexpected result format: {type(result)}"}}
-                return result.get(params["path"], "")
+                return note_result(read_notes([params["path"]]), params["path"])
             return {"error": {"code": -32602, "message": "Invalid params: Path parameter required"}}
         elif method == "search":
             if "query" in params:
-                return search_notes(params["query"])
+                return search_notes(params["query"], limit=params.get("limit"), offset=params.get("offset"),
+                                    sort=params.get("sort"), prefix=params.get("prefix"),
+                                    snippets=params.get("snippets"), context=params.get("context"),
+                                    fuzzy=params.get("fuzzy"))
             return {"error": {"code": -32602, "message": "Invalid params: Query parameter required"}}
         elif method == "write":
             if "path" in params and "content" in params:
                 return write_note(params["path"], params["content"])
             return {"error": {"code": -32602, "message": "Invalid params: Path and content parameters required"}}
+        elif method == "write_batch":
+            if isinstance(params.get("notes"), list):
+                return write_notes(params["notes"])
+            return {"error": {"code": -32602, "message": "Invalid params: Notes parameter required"}}
+        elif method == "append":
+            if "path" in params and "content" in params:
+                return append_note(params["path"], params["content"])
+            return {"error": {"code": -32602, "message": "Invalid params: Path and content parameters required"}}
+        elif method == "patch":
+            if "path" in params and "heading" in params and "content" in params:
+                return patch_note(params["path"], params["heading"], params["content"], params.get("operation"))
+            return {"error": {"code": -32602, "message": "Invalid params: Path, heading and content parameters required"}}
+        elif method == "query":
+            tags = params.get("tags", params.get("tag"))
+            return query_notes(tags=[tags] if isinstance(tags, str) else tags, agent=params.get("agent"),
+                               status=params.get("status"), project=params.get("project"),
+                               date_from=params.get("date_from"), date_to=params.get("date_to"),
+                               prefix=params.get("prefix"), limit=params.get("limit"), offset=params.get("offset"))
+        elif method == "recent":
+            return recent_conversations(params.get("agent"), params.get("limit"))
         else:
             return {"error": {"code": -32601, "message": f"Method not found: {method}"}}
     except Exception as e:
         return {"error": {"code": -32000, "message": f"Internal error: {str(e)}"}}
 
+def jsonrpc_error(request_id, code, message):
+    """JSON-RPC error response object"""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": code,
+            "message": message
+        }
+    }
+
+def process_jsonrpc(request):
+    """JSON-RPC response object for one parsed request"""
+    if not isinstance(request, dict):
+        return jsonrpc_error(None, -32600, "Invalid Request: Expected a JSON object")
+    
+    method = request.get("method")
+    params = request.get("params", {})
+    request_id = request.get("id")
+    
+    if method is None:
+        return jsonrpc_error(request_id, -32600, "Invalid Request: Method is required")
+    
+    return jsonrpc_response(request_id, handle_jsonrpc(method, params))
+
+def jsonrpc_response(request_id, result):
+    """JSON-RPC response object for a handle_jsonrpc() result"""
+    # Check if result contains an error
+    if isinstance(result, dict) and "error" in result:
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": result["error"]
+        }
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "result": result
+    }
+
+def is_note_get(request):
+    """Check if a request is a "get" that can share a multi-path /read"""
+    return (isinstance(request, dict) and request.get("method") == "get"
+            and isinstance(request.get("params"), dict) and "path" in request["params"])
+
+def process_jsonrpc_batch(batch):
+    """
+    Responses for a JSON-RPC 2.0 batch, or None if it only holds notifications
+    
+    Runs of consecutive "get" calls are answered by a single multi-path /read and
+    the remaining calls are dispatched concurrently, so a batch costs about one
+    round-trip. Responses are returned in batch order.
+    """
+    if not batch:
+        return jsonrpc_error(None, -32600, "Invalid Request: Empty batch")
+    
+    # Each group of batch indexes becomes one HTTP request
+    groups = []
+    for index, request in enumerate(batch):
+        if groups and is_note_get(request) and is_note_get(batch[groups[-1][-1]]):
+            groups[-1].append(index)
+        else:
+            groups.append([index])
+    
+    responses = [None] * len(batch)
+    
+    def run(group):
+        try:
+            if len(group) == 1:
+                responses[group[0]] = process_jsonrpc(batch[group[0]])
+                return
+            result = read_notes([batch[index]["params"]["path"] for index in group])
+            for index in group:
+                request = batch[index]
+                responses[index] = jsonrpc_response(request.get("id"), note_result(result, request["params"]["path"]))
+        except Exception as e:
+            for index in group:
+                request_id = batch[index].get("id") if isinstance(batch[index], dict) else None
+                responses[index] = jsonrpc_error(request_id, -32000, f"Error processing JSON-RPC request: {str(e)}")
+    
+    with ThreadPoolExecutor(max_workers=min(JSONRPC_WORKERS, len(groups))) as executor:
+        list(executor.map(run, groups))
+    
+    # Notifications get no response
+    responses = [response for request, response in zip(batch, responses)
+                 if not (isinstance(request, dict) and "id" not in request)]
+    return responses or None
+
+def serve_jsonrpc_stdio(workers=JSONRPC_WORKERS):
+    """
+    Answer newline-delimited JSON-RPC requests from stdin until it is closed
+    
+    The process stays up between calls, so interpreter startup and the pooled
+    connection to the server are paid once. Requests run concurrently on a thread
+    pool, so responses may be written out of order; callers match them by id.
+    A line may also hold a batch array, answered with one array.
+    Notifications (requests without an id) get no response.
+    """
+    write_lock = threading.Lock()
+    
+    def respond(response):
+        with write_lock:
+            sys.stdout.write(json.dumps(response) + "\n")
+            sys.stdout.flush()
+    
+    def run(request):
+        if isinstance(request, list):
+            response = process_jsonrpc_batch(request)
+            if response is not None:
+                respond(response)
+            return
+        try:
+            response = process_jsonrpc(request)
+        except Exception as e:
+            response = jsonrpc_error(request.get("id"), -32000, f"Error processing JSON-RPC request: {str(e)}")
+        if "id" in request:
+            respond(response)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                respond(jsonrpc_error(None, -32700, f"Parse error: {str(e)}"))
+                continue
+            if not isinstance(request, (dict, list)):
+                respond(process_jsonrpc(request))
+                continue
+            executor.submit(run, request)
+
 if __name__ == "__main__":
+    # Persistent JSON-RPC mode: one request per line until stdin is closed
+    if len(sys.argv) > 1 and sys.argv[1] == "--jsonrpc-stdio":
+        try:
+            serve_jsonrpc_stdio()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+    
     # Check if this is a JSON-RPC call from Claude MCP
     if len(sys.argv) > 1 and sys.argv[1] == "--jsonrpc":
         # Read the JSON-RPC request from stdin
@@ -140,73 +602,28 @@ if __name__ == "__main__":
                 request_data += line
             
             if not request_data.strip():
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": None,
-                    "error": {
-                        "code": -32700,
-                        "message": "Parse error: Empty request"
-                    }
-                }
-                print(json.dumps(error_response))
+                print(json.dumps(jsonrpc_error(None, -32700, "Parse error: Empty request")))
                 sys.exit(1)
                 
             request = json.loads(request_data)
-            method = request.get("method")
-            params = request.get("params", {})
-            request_id = request.get("id")
+            if isinstance(request, list):
+                response = process_jsonrpc_batch(request)
+                if response is not None:
+                    print(json.dumps(response))
+                sys.exit(0 if isinstance(response, list) or response is None else 1)
             
-            if method is None:
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32600,
-                        "message": "Invalid Request: Method is required"
-                    }
-                }
-                print(json.dumps(error_response))
-                sys.exit(1)
-            
-            result = handle_jsonrpc(method, params)
+            response = process_jsonrpc(request)
+            print(json.dumps(response))
             
-            # Check if result contains an error
-            if isinstance(result, dict) and "error" in result:
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": result["error"]
-                }
-                print(json.dumps(error_response))
-            else:
-                response = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": result
-                }
-                print(json.dumps(response))
+            # Malformed requests are reported with a non-zero exit code
+            if response.get("error", {}).get("code") == -32600:
+                sys.exit(1)
             sys.exit(0)
         except json.JSONDecodeError as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32700,
-                    "message": f"Parse error: {str(e)}"
-                }
-            }
-            print(json.dumps(error_response))
+            print(json.dumps(jsonrpc_error(None, -32700, f"Parse error: {str(e)}")))
             sys.exit(1)
         except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32000,
-                    "message": f"Error processing JSON-RPC request: {str(e)}"
-                }
-            }
-            print(json.dumps(error_response))
+            print(json.dumps(jsonrpc_error(None, -32000, f"Error processing JSON-RPC request: {str(e)}")))
             sys.exit(1)
     
     # Regular command-line interface
@@ -216,10 +633,20 @@ if __name__ == "__main__":
     # Search command
     search_parser = subparsers.add_parser("search", help="Search for notes")
     search_parser.add_argument("query", help="Search query")
+    search_parser.add_argument("--stream", action="store_true", help="Print results as NDJSON as they arrive")
+    search_parser.add_argument("--limit", type=int, help="Maximum number of results")
+    search_parser.add_argument("--offset", type=int, help="Number of results to skip")
+    search_parser.add_argument("--sort", choices=["relevance", "mtime", "date", "path"], help="Result order")
+    search_parser.add_argument("--prefix", help="Only return notes below this path")
+    search_parser.add_argument("--snippets", type=int, help="Include up to N matching lines per note")
+    search_parser.add_argument("--context", type=int, help="Lines of context around each snippet")
+    search_parser.add_argument("--fuzzy", nargs="?", const="auto",
+                               help="Tolerate typos: auto (by word length) or edits per word, 0-2")
     
     # Read command
     read_parser = subparsers.add_parser("read", help="Read one or more notes")
     read_parser.add_argument("paths", nargs="+", help="Note paths to read")
+    read_parser.add_argument("--stream", action="store_true", help="Print notes as NDJSON as they arrive")
     
     # Write command
     write_parser = subparsers.add_parser("write", help="Write content to a note")
@@ -227,13 +654,62 @@ if __name__ == "__main__":
     write_parser.add_argument("content", help="Content to write")
     write_parser.add_argument("--file", help="Read content from file instead of argument")
     
+    # Batch write command
+    batch_parser = subparsers.add_parser("write-batch", help="Write many notes from a JSON array or NDJSON file")
+    batch_parser.add_argument("file", help="File of {\"path\", \"content\"} objects (- for stdin)")
+    
+    # Append command
+    append_parser = subparsers.add_parser("append", help="Append content to a note")
+    append_parser.add_argument("path", help="Note path to append to")
+    append_parser.add_argument("content", help="Content to append")
+    append_parser.add_argument("--file", help="Read content from file instead of argument")
+    
+    # Patch command
+    patch_parser = subparsers.add_parser("patch", help="Change one section of a note")
+    patch_parser.add_argument("path", help="Note path to patch")
+    patch_parser.add_argument("heading", help="Section heading, e.g. \"## Actions\"")
+    patch_parser.add_argument("content", help="New section content")
+    patch_parser.add_argument("--operation", choices=["replace", "append", "prepend"], help="How to change the section (default: replace)")
+    patch_parser.add_argument("--file", help="Read content from file instead of argument")
+    
+    # Query command
+    query_parser = subparsers.add_parser("query", help="Find notes by frontmatter fields")
+    query_parser.add_argument("--tag", action="append", dest="tags", help="Required tag (repeatable)")
+    query_parser.add_argument("--agent", help="Frontmatter agent")
+    query_parser.add_argument("--status", help="Frontmatter status")
+    query_parser.add_argument("--project", help="Frontmatter project")
+    query_parser.add_argument("--date-from", help="Earliest frontmatter date (YYYY-MM-DD)")
+    query_parser.add_argument("--date-to", help="Latest frontmatter date (YYYY-MM-DD)")
+    query_parser.add_argument("--prefix", help="Only return notes below this path")
+    query_parser.add_argument("--limit", type=int, help="Maximum number of results")
+    query_parser.add_argument("--offset", type=int, help="Number of results to skip")
+    
+    # Recent conversations command
+    recent_parser = subparsers.add_parser("recent", help="List the most recent conversations")
+    recent_parser.add_argument("agent", nargs="?", help="Agent name (default: all agents)")
+    recent_parser.add_argument("--limit", type=int, help="Maximum number of conversations")
+    
     # Status command
     status_parser = subparsers.add_parser("status", help="Check server status")
     
     args = parser.parse_args()
     
-    if args.command == "search":
-        results = search_notes(args.query)
+    if args.command in ("search", "read") and args.stream:
+        if args.command == "search":
+            items = search_notes(args.query, stream=True, limit=args.limit, offset=args.offset,
+                                 sort=args.sort, prefix=args.prefix, snippets=args.snippets,
+                                 context=args.context, fuzzy=args.fuzzy)
+        else:
+            items = read_notes(args.paths, stream=True)
+        for item in items:
+            print(json.dumps(item), flush=True)
+            if isinstance(item.get("error"), dict):
+                sys.exit(1)
+    
+    elif args.command == "search":
+        results = search_notes(args.query, limit=args.limit, offset=args.offset,
+                               sort=args.sort, prefix=args.prefix, snippets=args.snippets,
+                               context=args.context, fuzzy=args.fuzzy)
         # Handle error format for CLI differently than JSON-RPC
         if isinstance(results, dict) and "error" in results:
             print(f"Error: {results['error'].get('message', 'Unknown error')}")
@@ -248,7 +724,7 @@ if __name__ == "__main__":
             sys.exit(1)
         print(json.dumps(results, indent=2))
     
-    elif args.command == "write":
+    elif args.command in ("write", "append", "patch"):
         content = args.content
         if args.file:
             try:
@@ -257,13 +733,59 @@ if __name__ == "__main__":
             except Exception as e:
                 print(f"Error reading file: {e}")
                 sys.exit(1)
-        result = write_note(args.path, content)
+        if args.command == "write":
+            result = write_note(args.path, content)
+        elif args.command == "append":
+            result = append_note(args.path, content)
+        else:
+            result = patch_note(args.path, args.heading, content, args.operation)
         # Handle error format for CLI differently than JSON-RPC
         if isinstance(result, dict) and "error" in result:
             print(f"Error: {result['error'].get('message', 'Unknown error')}")
             sys.exit(1)
         print(json.dumps(result, indent=2))
     
+    elif args.command == "write-batch":
+        try:
+            if args.file == "-":
+                text = sys.stdin.read()
+            else:
+                with open(args.file, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            if text.lstrip().startswith("["):
+                notes = json.loads(text)
+            else:
+                notes = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except (OSError, ValueError) as e:
+            print(f"Error reading notes: {e}")
+            sys.exit(1)
+        result = write_notes(notes)
+        # Handle error format for CLI differently than JSON-RPC
+        if isinstance(result, dict) and isinstance(result.get("error"), dict):
+            print(f"Error: {result['error'].get('message', 'Unknown error')}")
+            sys.exit(1)
+        print(json.dumps(result, indent=2))
+        if result.get("failed"):
+            sys.exit(1)
+    
+    elif args.command == "query":
+        results = query_notes(tags=args.tags, agent=args.agent, status=args.status, project=args.project,
+                              date_from=args.date_from, date_to=args.date_to, prefix=args.prefix,
+                              limit=args.limit, offset=args.offset)
+        # Handle error format for CLI differently than JSON-RPC
+        if isinstance(results, dict) and "error" in results:
+            print(f"Error: {results['error'].get('message', 'Unknown error')}")
+            sys.exit(1)
+        print(json.dumps(results, indent=2))
+    
+    elif args.command == "recent":
+        results = recent_conversations(args.agent, args.limit)
+        # Handle error format for CLI differently than JSON-RPC
+        if isinstance(results, dict) and "error" in results:
+            print(f"Error: {results['error'].get('message', 'Unknown error')}")
+            sys.exit(1)
+        print(json.dumps(results, indent=2))
+    
     elif args.command == "status":
         status = check_server()
         if status.get("status") == "error":
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Compression Benchmark
+Bytes on the wire and end-to-end latency of large responses (multi-path /read,
+unpaginated /search) and large /write bodies, uncompressed vs gzip (and zstd
+when the zstandard package is installed)
+
+Latency is measured against a local server over loopback. For a LAN, either
+point --url at a server on another machine, or read the "at N Mbit/s" column,
+which adds the time the measured bytes take on a link of --link-mbps.
+
+Usage: python bench_compression.py [--notes 2000] [--read-paths 50] [--link-mbps 100]
+Requires requests, plus gunicorn (Linux/macOS) or waitress (Windows) for the server.
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+import requests
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_vault import make_vault  # noqa: E402
+from bench_serving import start_server, stop_server  # noqa: E402
+
+CODINGS = ["identity", "gzip"] + (["zstd"] if zstandard is not None else [])
+
+
+def decode(raw, coding):
+    if coding == "gzip":
+        return gzip.decompress(raw)
+    if coding == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    return raw
+
+
+def timed_get(session, url, params, coding, repeat):
+    """Median seconds per request (including decompression and JSON parsing) and bytes on the wire"""
+    times = []
+    wire_bytes = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = session.get(url, params=params, headers={"Accept-Encoding": coding}, stream=True, timeout=60)
+        raw = response.raw.read(decode_content=False)
+        json.loads(decode(raw, response.headers.get("Content-Encoding", "identity")))
+        times.append(time.perf_counter() - start)
+        wire_bytes = len(raw)
+    return statistics.median(times), wire_bytes
+
+
+def timed_write(session, url, note, coding, repeat):
+    """Median seconds per /write of note and bytes of the request body"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = json.dumps(note).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if coding == "gzip":
+            body = gzip.compress(body, compresslevel=1, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+        elif coding == "zstd":
+            body = zstandard.ZstdCompressor(level=3).compress(body)
+            headers["Content-Encoding"] = "zstd"
+        session.post(url, data=body, headers=headers, timeout=60).raise_for_status()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), len(body)
+
+
+def read_paths(vault, count):
+    paths = []
+    for root, _, files in os.walk(os.path.join(vault, "AI", "Memory")):
+        paths.extend(os.path.relpath(os.path.join(root, f), vault) for f in files if f.endswith(".md"))
+    return sorted(paths)[:count]
+
+
+def run(base, vault, args):
+    session = requests.Session()
+    paths = read_paths(vault, args.read_paths)
+    with open(os.path.join(vault, paths[0]), encoding="utf-8") as f:
+        sample = f.read()
+    # A long conversation log, built from realistic note text
+    big_note = {"path": "AI/Memory/Conversations/Claude/20250301-120000-BenchCompression.md",
+                "content": (sample + "\n") * max(1, args.write_kb * 1024 // max(1, len(sample)))}
+
+    results = []
+    for coding in CODINGS:
+        results.append((f"/read x{len(paths)}", coding,
+                        *timed_get(session, f"{base}/read", [("path", p) for p in paths], coding, args.repeat)))
+    for coding in CODINGS:
+        results.append(("/search (all hits)", coding,
+                        *timed_get(session, f"{base}/search", {"query": "terraform"}, coding, args.repeat)))
+    for coding in CODINGS:
+        results.append((f"/write {args.write_kb} KiB", coding,
+                        *timed_write(session, f"{base}/write", big_note, coding, args.repeat)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compressed vs uncompressed transport")
+    parser.add_argument("--notes", type=int, default=2000, help="Number of synthetic notes (default: 2000)")
+    parser.add_argument("--read-paths", type=int, default=50, help="Paths per /read request (default: 50)")
+    parser.add_argument("--write-kb", type=int, default=256, help="Size of the /write body in KiB (default: 256)")
+    parser.add_argument("--repeat", type=int, default=20, help="Requests per measurement (default: 20)")
+    parser.add_argument("--link-mbps", type=float, default=100, help="Link speed for the LAN estimate (default: 100)")
+    parser.add_argument("--url", help="Benchmark a running server (e.g. on another machine) instead of a local one; "
+                                      "its vault must hold the synthetic notes")
+    parser.add_argument("--vault", help="Synthetic vault of the server given with --url")
+    parser.add_argument("--port", type=int, default=5699, help="Port for the benchmark server (default: 5699)")
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.vault:
+            parser.error("--url needs --vault")
+        results = run(args.url.rstrip("/"), args.vault, args)
+        where = args.url
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            vault = make_vault(os.path.join(workdir, "vault"), args.notes)
+            process = start_server("production", args.port, workdir, vault, [])
+            try:
+                results = run(f"http://127.0.0.1:{args.port}", vault, args)
+            finally:
+                stop_server(process)
+        where = "loopback"
+
+    print(f"{args.notes} notes, {where}\n")
+    link = f"at {args.link_mbps:g} Mbit/s"
+    print(f"{'request':<20} {'coding':<9} {'bytes':>10} {'ms':>8} {link:>16}")
+    for name, coding, seconds, wire_bytes in results:
+        lan = seconds + wire_bytes * 8 / (args.link_mbps * 1e6)
+        print(f"{name:<20} {coding:<9} {wire_bytes:>10} {seconds * 1000:>8.2f} {lan * 1000:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
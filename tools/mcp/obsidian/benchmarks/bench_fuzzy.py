@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Search Benchmark
+Files read and time of regex scans over every note vs only the notes the trigram
+prefilter keeps, and latency of typo-tolerant lookups against the exact index
+search, on a synthetic vault whose notes each name a few unique resources
+
+Usage: python bench_fuzzy.py [--notes 5000] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "server"))
+
+import scanner  # noqa: E402
+from matcher import QueryMatcher  # noqa: E402
+from search_index import SearchIndex  # noqa: E402
+from synthetic_vault import make_vault  # noqa: E402
+
+REGEXES = ["snet_app_01\\d\\d", "kv-prod-(eus|weu)-42", "module\\.aks_cluster_0(1|2)", "subnet|peering", "zzz-(no|none)-match"]
+# Misspelled names as an agent types them, with the exact spelling for comparison
+FUZZY = [("snet_app_0142", "snet_app_1042"), ("aks_clsuter_00042", "aks_cluster_00042"),
+         ("terrafrom", "terraform"), ("privte endpiont", "private endpoint")]
+REGIONS = ["eus", "weu", "neu", "sea"]
+
+
+def add_resources(memory_path):
+    """Append a line naming unique resources to every note, so the vocabulary is realistic"""
+    paths = scanner.list_notes(memory_path)
+    for i, path in enumerate(sorted(paths)):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(f"\nDeployed module.aks_cluster_{i:05d} with subnet snet_app_{i:04d} "
+                    f"and key vault kv-prod-{REGIONS[i % len(REGIONS)]}-{i % 97}\n")
+    return paths
+
+
+def scan(paths, query):
+    matcher = QueryMatcher(query)
+    return [path for path in paths
+            if scanner.match_content(path, matcher, matcher.search(os.path.basename(path)), 0)[0]]
+
+
+def exact_search(index, vault, query):
+    """Notes containing query as /search finds them: from the index, or by matching the phrase candidates"""
+    paths = index.search(query)
+    if paths is None:
+        candidates = [os.path.join(vault, path) for path in sorted(index.phrase_candidates(query))]
+        paths = [os.path.relpath(path, vault) for path in scan(candidates, query)]
+    return paths
+
+
+def best_of(repeat, func, *args):
+    """(best ms, result)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trigram regex prefilter and fuzzy search")
+    parser.add_argument("--notes", type=int, default=5000, help="Number of synthetic notes (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions, best time is reported (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        vault = make_vault(os.path.join(workdir, "vault"), args.notes)
+        memory_path = os.path.join(vault, "AI", "Memory")
+        paths = add_resources(memory_path)
+        index = SearchIndex(os.path.join(workdir, "search_index.json"))
+        index.load(vault)
+        index.sync(vault, memory_path)
+
+        print(f"{len(paths)} notes, {len(index.postings)} terms, {len(index.ngrams.grams)} trigrams\n")
+        print(f"{'regex':<28} {'hits':>6} {'files read':>11} {'full ms':>9} {'prefiltered ms':>15}")
+        for query in REGEXES:
+            full, expected = best_of(args.repeat, scan, paths, query)
+
+            def prefiltered():
+                matcher = QueryMatcher(query)
+                candidates = index.regex_candidates(query, matcher.search)
+                if candidates is None:
+                    return paths, scan(paths, query)
+                candidates = {os.path.join(vault, path) for path in candidates}
+                kept = [path for path in paths if path in candidates]
+                return kept, scan(kept, query)
+
+            filtered, (kept, actual) = best_of(args.repeat, prefiltered)
+            assert expected == actual, f"Result mismatch for {query!r}"
+            print(f"{query:<28} {len(expected):>6} {len(kept):>11} {full:>9.1f} {filtered:>15.1f}")
+
+        print(f"\n{'query':<22} {'exact hits':>10} {'exact ms':>9} {'fuzzy hits':>11} {'fuzzy ms':>9}")
+        for typo, spelled in FUZZY:
+            exact, exact_hits = best_of(args.repeat, exact_search, index, vault, typo)
+            fuzzy, fuzzy_hits = best_of(args.repeat, index.fuzzy_search, typo)
+            found = set(exact_search(index, vault, spelled)) <= {path for path, _, _ in fuzzy_hits}
+            print(f"{typo:<22} {len(exact_hits):>10} {exact:>9.2f} {len(fuzzy_hits):>11} {fuzzy:>9.2f}"
+                  f"{'' if found else '  (misses notes of ' + spelled + ')'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+JSON-RPC Client Benchmark
+Compares per-call latency of universal_client.py started once per request
+(--jsonrpc) with one long-lived process answering requests over stdio (--jsonrpc-stdio)
+
+Usage: python bench_jsonrpc.py [--notes 2000] [--calls 200]
+Requires requests, plus gunicorn (Linux/macOS) or waitress (Windows) for the server.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CLIENT_PATH = os.path.join(BENCH_DIR, "..", "adapters", "universal_client.py")
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_vault import make_vault  # noqa: E402
+from bench_serving import start_server, stop_server  # noqa: E402
+
+
+def make_requests(vault, count):
+    paths = []
+    for root, _, files in os.walk(os.path.join(vault, "AI", "Memory")):
+        paths.extend(os.path.relpath(os.path.join(root, f), vault) for f in files[:5])
+    calls = []
+    for i in range(count):
+        if i % 2:
+            calls.append({"jsonrpc": "2.0", "id": i, "method": "get", "params": {"path": paths[i % len(paths)]}})
+        else:
+            calls.append({"jsonrpc": "2.0", "id": i, "method": "search", "params": {"query": "private endpoint", "limit": 10}})
+    return calls
+
+
+def run_one_shot(calls, env):
+    start = time.perf_counter()
+    for call in calls:
+        subprocess.run([sys.executable, CLIENT_PATH, "--jsonrpc"], input=json.dumps(call),
+                       capture_output=True, text=True, env=env, check=False)
+    return time.perf_counter() - start
+
+
+def run_stdio(calls, env, in_flight):
+    process = subprocess.Popen([sys.executable, CLIENT_PATH, "--jsonrpc-stdio"], stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, text=True, bufsize=1, env=env)
+    start = time.perf_counter()
+    for first in range(0, len(calls), in_flight):
+        window = calls[first:first + in_flight]
+        for call in window:
+            process.stdin.write(json.dumps(call) + "\n")
+        process.stdin.flush()
+        for _ in window:
+            json.loads(process.stdout.readline())
+    elapsed = time.perf_counter() - start
+    process.stdin.close()
+    process.wait(timeout=30)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark one-shot vs persistent JSON-RPC client")
+    parser.add_argument("--notes", type=int, default=2000, help="Number of synthetic notes (default: 2000)")
+    parser.add_argument("--calls", type=int, default=200, help="JSON-RPC calls per mode (default: 200)")
+    parser.add_argument("--in-flight", type=int, default=8, help="Concurrent requests for the pipelined run (default: 8)")
+    parser.add_argument("--port", type=int, default=5699, help="Port for the benchmark server (default: 5699)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        vault = make_vault(os.path.join(workdir, "vault"), args.notes)
+        calls = make_requests(vault, args.calls)
+        env = dict(os.environ, MCP_SERVER_URL=f"http://127.0.0.1:{args.port}")
+
+        process = start_server("production", args.port, workdir, vault, [])
+        try:
+            # Starting an interpreter per call is slow, so time a sample of calls
+            one_shot_calls = calls[:max(1, args.calls // 10)]
+            results = [
+                ("one-shot", len(one_shot_calls), run_one_shot(one_shot_calls, env)),
+                ("stdio", len(calls), run_stdio(calls, env, 1)),
+                (f"stdio x{args.in_flight}", len(calls), run_stdio(calls, env, args.in_flight)),
+            ]
+        finally:
+            stop_server(process)
+
+    print(f"{args.notes} notes\n")
+    print(f"{'client':<12} {'calls':>6} {'ms/call':>9}")
+    for name, count, elapsed in results:
+        print(f"{name:<12} {count:>6} {elapsed / count * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
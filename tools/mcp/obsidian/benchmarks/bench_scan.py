@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Scan Benchmark
+Time and peak Python memory of full-content scans that decode every note
+(the original path) vs matching raw bytes with large notes memory-mapped, on a
+synthetic vault plus a few multi-megabyte pasted logs
+
+Usage: python bench_scan.py [--notes 2000] [--logs 8] [--log-mb 4] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "server"))
+
+import scanner  # noqa: E402
+from matcher import QueryMatcher  # noqa: E402
+from snippets import find_snippets  # noqa: E402
+from synthetic_vault import make_vault  # noqa: E402
+
+QUERIES = ["terraform", "zzz-no-match", "subnet|peering", "key.?vault"]
+
+
+def scan_decoded(paths, query, snippets):
+    """The original scan: read and decode each note, then match the text"""
+    matcher = QueryMatcher(query)
+    matches = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        if matcher.search(os.path.basename(path)) or matcher.search(content):
+            matches.append((path, find_snippets(content, matcher.spans(content), snippets) if snippets else None))
+    return matches
+
+
+def scan_bytes(paths, query, snippets):
+    matcher = QueryMatcher(query)
+    matches = []
+    for path in paths:
+        matched, found = scanner.match_content(path, matcher, matcher.search(os.path.basename(path)), snippets)
+        if matched:
+            matches.append((path, found))
+    return matches
+
+
+def measure(func, paths, query, snippets, repeat):
+    """(best seconds, peak traced bytes, result)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(paths, query, snippets)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    func(paths, query, snippets)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def make_logs(folder, count, size_mb):
+    """Large pasted logs: long runs of command output with a match near the end"""
+    os.makedirs(folder, exist_ok=True)
+    line = "2025-03-01T12:00:00Z INFO apply: module.network.azurerm_subnet.private — still creating… [10s elapsed]\n"
+    body = line * (size_mb * 1024 * 1024 // len(line.encode('utf-8')))
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"20250301-12000{i}-PastedLog.md")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# Pasted log {i}\n\n```\n{body}```\nterraform apply finished\n")
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark decoded vs bytes-level scanning")
+    parser.add_argument("--notes", type=int, default=2000, help="Number of synthetic notes (default: 2000)")
+    parser.add_argument("--logs", type=int, default=8, help="Number of large pasted logs (default: 8)")
+    parser.add_argument("--log-mb", type=int, default=4, help="Size of each log in MB (default: 4)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions, best time is reported (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        vault = make_vault(os.path.join(workdir, "vault"), args.notes)
+        notes = scanner.list_notes(os.path.join(vault, "AI", "Memory"))
+        logs = make_logs(os.path.join(workdir, "logs"), args.logs, args.log_mb)
+
+        print(f"{len(notes)} notes, {args.logs} logs of {args.log_mb} MB, "
+              f"memory-mapped from {scanner.MMAP_MIN_BYTES} bytes\n")
+        print(f"{'files':<7} {'query':<16} {'snippets':>8} {'decoded ms':>11} {'bytes ms':>9} "
+              f"{'decoded peak KB':>16} {'bytes peak KB':>14}")
+        for label, paths in (("notes", notes), ("logs", logs)):
+            for query in QUERIES:
+                for snippets in (0, 3):
+                    decoded, decoded_peak, expected = measure(scan_decoded, paths, query, snippets, args.repeat)
+                    raw, raw_peak, actual = measure(scan_bytes, paths, query, snippets, args.repeat)
+                    assert expected == actual, f"Result mismatch for {query!r}"
+                    print(f"{label:<7} {query:<16} {snippets:>8} {decoded * 1000:>11.1f} {raw * 1000:>9.1f} "
+                          f"{decoded_peak / 1024:>16.0f} {raw_peak / 1024:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
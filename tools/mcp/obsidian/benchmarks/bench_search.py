@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Search Matching Benchmark
+Compares the per-file cost of the original re.search(query, ..., re.IGNORECASE) calls with
+the cached QueryMatcher on a synthetic vault
+
+Usage: python bench_search.py [--notes 5000] [--repeat 3]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "server"))
+
+from matcher import get_matcher  # noqa: E402
+from synthetic_vault import make_vault  # noqa: E402
+
+QUERIES = ["terraform", "private endpoint", "Claude", "key.?vault", "subnet|peering", "zzz-no-match"]
+
+
+def load_notes(vault):
+    notes = []
+    for root, _, files in os.walk(os.path.join(vault, "AI", "Memory")):
+        for file in files:
+            if file.endswith('.md'):
+                with open(os.path.join(root, file), 'r', encoding='utf-8') as f:
+                    notes.append((file, f.read()))
+    return notes
+
+
+def run_original(notes, queries):
+    # Mixed queries per request, as the server sees them; re's internal cache is keyed by
+    # (type, pattern, flags) and looked up twice per file
+    matches = 0
+    for query in queries:
+        for file, content in notes:
+            if re.search(query, file, re.IGNORECASE) or re.search(query, content, re.IGNORECASE):
+                matches += 1
+    return matches
+
+
+def run_matcher(notes, queries):
+    matches = 0
+    for query in queries:
+        matcher = get_matcher(query)
+        for file, content in notes:
+            if matcher.search(file) or matcher.search(content):
+                matches += 1
+    return matches
+
+
+def timed(func, *args, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search matching per file")
+    parser.add_argument("--notes", type=int, default=5000, help="Number of synthetic notes (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions, best time is reported (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as vault:
+        make_vault(vault, args.notes)
+        notes = load_notes(vault)
+
+    print(f"{len(notes)} notes, {sum(len(c) for _, c in notes) / 1024 / 1024:.1f} MB of content\n")
+    print(f"{'query':<18} {'original us/file':>17} {'matcher us/file':>16} {'speedup':>8}")
+    for query in QUERIES:
+        original, expected = timed(run_original, notes, [query], repeat=args.repeat)
+        cached, actual = timed(run_matcher, notes, [query], repeat=args.repeat)
+        assert expected == actual, f"Result mismatch for {query!r}: {expected} != {actual}"
+        per_file = 1e6 / len(notes)
+        print(f"{query:<18} {original * per_file:>17.2f} {cached * per_file:>16.2f} {original / cached:>7.1f}x")
+
+    original, _ = timed(run_original, notes, QUERIES, repeat=args.repeat)
+    cached, _ = timed(run_matcher, notes, QUERIES, repeat=args.repeat)
+    per_file = 1e6 / (len(notes) * len(QUERIES))
+    print(f"{'(mixed)':<18} {original * per_file:>17.2f} {cached * per_file:>16.2f} {original / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Search Cache Benchmark
+Latency of repeated identical /search requests (the agent-name search behind
+`smf.py recent`, snippet and regex searches) with the search result cache
+disabled vs enabled, plus the hit rate reported by /stats
+
+Usage: python bench_search_cache.py [--notes 5000] [--repeat 50] [--mode production]
+Requires requests, plus gunicorn (Linux/macOS) or waitress (Windows) for the server.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_vault import make_vault  # noqa: E402
+from bench_serving import start_server, stop_server  # noqa: E402
+
+SEARCHES = [
+    ("agent name", {"query": "Claude", "sort": "date", "limit": 10}),
+    ("snippets", {"query": "private endpoint", "snippets": 3, "limit": 20}),
+    ("regex", {"query": "subnet|peering", "limit": 20}),
+    ("regex, no hits", {"query": "zzz-(no|none)-match"}),
+]
+
+
+def run(base, repeat):
+    """Median ms per repeated request for each search, and the search_cache stats"""
+    session = requests.Session()
+    results = []
+    for name, params in SEARCHES:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            session.get(f"{base}/search", params=params, timeout=60).raise_for_status()
+            times.append((time.perf_counter() - start) * 1000)
+        results.append((name, statistics.median(times)))
+    return results, session.get(f"{base}/stats", timeout=10).json().get("search_cache")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark repeated searches with and without the result cache")
+    parser.add_argument("--notes", type=int, default=5000, help="Number of synthetic notes (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=50, help="Requests per search (default: 50)")
+    parser.add_argument("--mode", choices=["production", "async"], default="production", help="Server mode (default: production)")
+    parser.add_argument("--port", type=int, default=5699, help="Port for the benchmark server (default: 5699)")
+    args = parser.parse_args()
+
+    runs = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        vault = make_vault(os.path.join(workdir, "vault"), args.notes)
+        for label, cache_bytes in (("uncached", "0"), ("cached", None)):
+            if cache_bytes is None:
+                os.environ.pop("OBSIDIAN_SEARCH_CACHE_BYTES", None)
+            else:
+                os.environ["OBSIDIAN_SEARCH_CACHE_BYTES"] = cache_bytes
+            # One worker, so every repeat reaches the same cache
+            process = start_server(args.mode, args.port, workdir, vault, ["--workers", "1"] if args.mode == "production" else [])
+            try:
+                runs[label] = run(f"http://127.0.0.1:{args.port}", args.repeat)
+            finally:
+                stop_server(process)
+
+    print(f"{args.notes} notes, {args.mode} server, {args.repeat} identical requests per search\n")
+    print(f"{'search':<16} {'uncached ms':>12} {'cached ms':>10} {'speedup':>8}")
+    for (name, uncached), (_, cached) in zip(runs["uncached"][0], runs["cached"][0]):
+        print(f"{name:<16} {uncached:>12.2f} {cached:>10.2f} {uncached / cached:>7.1f}x")
+    stats = runs["cached"][1]
+    print(f"\nhit rate {stats['hit_rate']:.2%}, {stats['entries']} entries, {stats['bytes']} bytes, "
+          f"{stats['saved_seconds']} s of search work saved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Serving Benchmark
+Compares requests/sec and latency of the development server, production mode and
+the async server under concurrent load on a synthetic vault
+
+Usage: python bench_serving.py [--notes 2000] [--clients 16] [--duration 10]
+Requires requests, gunicorn (Linux/macOS) or waitress (Windows) for production mode,
+and aiohttp for async mode.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.join(BENCH_DIR, "..", "server")
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_vault import make_vault  # noqa: E402
+
+READ_PATHS = []
+
+
+def start_server(mode, port, workdir, vault, extra_args):
+    config_file = os.path.join(workdir, f"config-{mode}.json")
+    with open(config_file, 'w') as f:
+        json.dump({"vault_path": vault}, f)
+    env = dict(os.environ,
+               OBSIDIAN_CONFIG_FILE=config_file,
+               OBSIDIAN_INDEX_FILE=os.path.join(workdir, f"index-{mode}", "search_index.json"))
+    cmd = [sys.executable, os.path.join(SERVER_DIR, "serve.py"), "--mode", mode,
+           "--host", "127.0.0.1", "--port", str(port)] + extra_args
+    process = subprocess.Popen(cmd, cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, start_new_session=platform.system() != 'Windows')
+
+    # Wait until the server answers and its search index is built
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            stats = requests.get(f"http://127.0.0.1:{port}/stats", timeout=1).json()
+            if stats["search_index"]["ready"]:
+                return process
+        except (requests.exceptions.RequestException, ValueError, KeyError):
+            pass
+        time.sleep(0.5)
+    stop_server(process)
+    raise RuntimeError(f"{mode} server did not become ready")
+
+
+def stop_server(process):
+    # The development server's reloader and gunicorn's workers are child processes
+    if platform.system() == 'Windows':
+        process.terminate()
+    else:
+        os.killpg(process.pid, signal.SIGTERM)
+    process.wait(timeout=30)
+
+
+def client(port, duration, latencies, errors, index):
+    session = requests.Session()
+    base = f"http://127.0.0.1:{port}"
+    requests_mix = [
+        ("/health", None),
+        ("/search", {"query": "private endpoint", "limit": 10, "sort": "relevance"}),
+        ("/read", [("path", READ_PATHS[index % len(READ_PATHS)])]),
+        ("/search", {"query": "key.?vault", "limit": 10}),
+    ]
+    deadline = time.perf_counter() + duration
+    i = index
+    while time.perf_counter() < deadline:
+        path, params = requests_mix[i % len(requests_mix)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = session.get(base + path, params=params, timeout=30)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        except requests.exceptions.RequestException:
+            errors.append(1)
+
+
+def run_load(port, clients, duration):
+    latencies = []
+    errors = []
+    threads = [threading.Thread(target=client, args=(port, duration, latencies, errors, i)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(0.50),
+        "p99": percentile(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark development, production and async serving")
+    parser.add_argument("--notes", type=int, default=2000, help="Number of synthetic notes (default: 2000)")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients (default: 16)")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load per mode (default: 10)")
+    parser.add_argument("--workers", type=int, default=0, help="Production worker processes (default: serve.py default)")
+    parser.add_argument("--threads", type=int, default=8, help="Production threads per worker (default: 8)")
+    parser.add_argument("--port", type=int, default=5699, help="Port for the benchmark servers (default: 5699)")
+    args = parser.parse_args()
+
+    production_args = ["--threads", str(args.threads)]
+    if args.workers:
+        production_args += ["--workers", str(args.workers)]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        vault = make_vault(os.path.join(workdir, "vault"), args.notes)
+        for root, _, files in os.walk(os.path.join(vault, "AI", "Memory")):
+            READ_PATHS.extend(os.path.relpath(os.path.join(root, f), vault) for f in files[:5])
+
+        print(f"{args.notes} notes, {args.clients} clients, {args.duration:.0f}s per mode\n")
+        print(f"{'mode':<12} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        modes = (("development", []), ("production", production_args), ("async", []))
+        for mode, extra_args in modes:
+            process = start_server(mode, args.port, workdir, vault, extra_args)
+            try:
+                result = run_load(args.port, args.clients, args.duration)
+            finally:
+                stop_server(process)
+            print(f"{mode:<12} {result['requests']:>9} {result['errors']:>7} {result['rps']:>8.1f} "
+                  f"{result['p50']:>8.1f} {result['p99']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
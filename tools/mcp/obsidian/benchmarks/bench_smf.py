@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+SMF CLI Benchmark
+Wall-clock time of each smf.py subcommand with the universal client called
+in-process versus launched as a subprocess (SMF_CLIENT_MODE=subprocess)
+
+Usage: python bench_smf.py [--notes 500] [--runs 5]
+Requires requests, plus gunicorn (Linux/macOS) or waitress (Windows) for the server.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SMF_PATH = os.path.join(BENCH_DIR, "..", "..", "smf.py")
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_vault import make_vault  # noqa: E402
+from bench_serving import start_server, stop_server  # noqa: E402
+
+COMMANDS = [
+    ("status", ["status"]),
+    ("search", ["search", "private endpoint"]),
+    ("read", ["read", "AI/Memory/Contexts/Shared/Bench.md"]),
+    ("write", ["write", "AI/Memory/Contexts/Shared/Bench.md", "# Bench\n\nBenchmark note."]),
+    ("recent", ["recent", "--agent", "GPT", "--limit", "5"]),
+]
+
+
+def time_command(args, env, runs):
+    """Median wall-clock seconds of running smf.py with args"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, SMF_PATH] + args, capture_output=True, text=True, env=env)
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(f"smf.py {' '.join(args)} failed: {result.stdout}{result.stderr}")
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark smf.py subcommands in-process vs subprocess client")
+    parser.add_argument("--notes", type=int, default=500, help="Number of synthetic notes (default: 500)")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per subcommand and mode (default: 5)")
+    parser.add_argument("--port", type=int, default=5699, help="Port for the benchmark server (default: 5699)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        vault = make_vault(os.path.join(workdir, "vault"), args.notes)
+        base_env = dict(os.environ, MCP_SERVER_URL=f"http://127.0.0.1:{args.port}")
+
+        process = start_server("production", args.port, workdir, vault, [])
+        try:
+            results = []
+            for name, command in COMMANDS:
+                timings = [time_command(command, dict(base_env, SMF_CLIENT_MODE=mode), args.runs)
+                           for mode in ("inprocess", "subprocess")]
+                results.append((name, *timings))
+        finally:
+            stop_server(process)
+
+    print(f"median of {args.runs} runs\n")
+    print(f"{'command':<8} {'in-process ms':>14} {'subprocess ms':>14}")
+    for name, inprocess, subproc in results:
+        print(f"{name:<8} {inprocess * 1000:>14.1f} {subproc * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Transport Benchmark
+Per-call latency of small requests (/health, single-note /read) over loopback
+TCP vs the server's Unix domain socket, on a kept-alive session and with a new
+connection per call, plus the cost of the bare liveness probe manage-mcp.py uses
+
+Usage: python bench_transport.py [--mode async] [--repeat 2000]
+Requires requests, plus gunicorn (production mode) or aiohttp (async mode); Linux/macOS only.
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "adapters"))
+
+from synthetic_vault import make_vault  # noqa: E402
+from bench_serving import start_server, stop_server  # noqa: E402
+from universal_client import UnixSocketAdapter  # noqa: E402
+
+
+def new_session(base, socket_path):
+    session = requests.Session()
+    session.trust_env = False
+    if socket_path:
+        session.mount(base + "/", UnixSocketAdapter(socket_path))
+    return session
+
+
+def timed_pair(tcp_call, unix_call, repeat):
+    """[(median, p99) ms over TCP, (median, p99) ms over the socket], calls interleaved so drift hits both alike"""
+    for _ in range(min(50, repeat)):
+        tcp_call()
+        unix_call()
+    times = ([], [])
+    for _ in range(repeat):
+        for call, samples in ((tcp_call, times[0]), (unix_call, times[1])):
+            start = time.perf_counter()
+            call()
+            samples.append((time.perf_counter() - start) * 1000)
+    return [(statistics.median(samples), sorted(samples)[int(len(samples) * 0.99) - 1]) for samples in times]
+
+
+def probe(family, address):
+    s = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        s.connect(address)
+    finally:
+        s.close()
+
+
+def run(base, port, socket_path, note, repeat):
+    sessions = {"tcp": new_session(base, None), "unix": new_session(base, socket_path)}
+    paths = {"tcp": None, "unix": socket_path}
+    results = []
+    for name, url, params in (("/health", f"{base}/health", None), ("/read", f"{base}/read", {"path": note})):
+        def keepalive(transport):
+            return lambda: sessions[transport].get(url, params=params, timeout=10).raise_for_status()
+
+        def fresh(transport):
+            def call():
+                with new_session(base, paths[transport]) as one_shot:
+                    one_shot.get(url, params=params, timeout=10).raise_for_status()
+            return call
+
+        for label, make_call in (("keep-alive", keepalive), ("new conn", fresh)):
+            tcp, unix = timed_pair(make_call("tcp"), make_call("unix"), repeat)
+            results.append((f"{name} {label}", tcp, unix))
+    tcp, unix = timed_pair(lambda: probe(socket.AF_INET, ("127.0.0.1", port)),
+                           lambda: probe(socket.AF_UNIX, socket_path), repeat)
+    results.append(("liveness probe", tcp, unix))
+    for session in sessions.values():
+        session.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark loopback TCP vs Unix domain socket transport")
+    parser.add_argument("--mode", choices=["production", "async"], default="async", help="Server mode (default: async)")
+    parser.add_argument("--repeat", type=int, default=2000, help="Calls per measurement (default: 2000)")
+    parser.add_argument("--port", type=int, default=5699, help="Port for the benchmark server (default: 5699)")
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        sys.exit("Unix domain sockets are not available on this platform")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        vault = make_vault(os.path.join(workdir, "vault"), 200)
+        socket_path = os.path.join(workdir, "mcp.sock")
+        note = next(os.path.relpath(os.path.join(root, f), vault)
+                    for root, _, files in os.walk(os.path.join(vault, "AI", "Memory"))
+                    for f in sorted(files) if f.endswith(".md"))
+        base = f"http://127.0.0.1:{args.port}"
+
+        process = start_server(args.mode, args.port, workdir, vault, ["--socket", socket_path])
+        try:
+            results = run(base, args.port, socket_path, note, args.repeat)
+        finally:
+            stop_server(process)
+
+    print(f"{args.mode} server, {args.repeat} calls per row\n")
+    print(f"{'request':<20} {'tcp p50':>9} {'unix p50':>9} {'tcp p99':>9} {'unix p99':>9}  (ms)")
+    for name, (tcp_p50, tcp_p99), (unix_p50, unix_p99) in results:
+        print(f"{name:<20} {tcp_p50:>9.3f} {unix_p50:>9.3f} {tcp_p99:>9.3f} {unix_p99:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
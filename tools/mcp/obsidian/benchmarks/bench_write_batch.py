@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Batch Write Benchmark
+Compares notes/sec of importing notes with one POST /write per note against
+POST /write/batch in chunks
+
+Usage: python bench_write_batch.py [--notes 2000] [--batch-size 200] [--mode production]
+Requires requests, plus gunicorn (Linux/macOS) or waitress (Windows) for the server.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_vault import make_vault  # noqa: E402
+from bench_serving import start_server, stop_server  # noqa: E402
+
+
+def make_notes(count, run):
+    body = "\n".join(f"- Imported item {i} about private endpoints and terraform state" for i in range(40))
+    return [{"path": f"AI/Memory/Conversations/Import/{run}/20250301-{i:06d}-Note.md",
+             "content": f"---\ntags: [import]\nagent: Import\n---\n# Note {i}\n\n{body}\n"}
+            for i in range(count)]
+
+
+def run_single(base, notes):
+    session = requests.Session()
+    start = time.perf_counter()
+    for note in notes:
+        session.post(f"{base}/write", json=note, timeout=30).raise_for_status()
+    return time.perf_counter() - start
+
+
+def run_batch(base, notes, batch_size):
+    session = requests.Session()
+    start = time.perf_counter()
+    for first in range(0, len(notes), batch_size):
+        response = session.post(f"{base}/write/batch", json=notes[first:first + batch_size], timeout=300)
+        response.raise_for_status()
+        if response.json()["failed"]:
+            raise RuntimeError("batch write failed")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-note writes vs /write/batch")
+    parser.add_argument("--notes", type=int, default=2000, help="Notes written per run (default: 2000)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Notes per /write/batch request (default: 200)")
+    parser.add_argument("--mode", choices=["production", "async"], default="production", help="Server mode (default: production)")
+    parser.add_argument("--port", type=int, default=5699, help="Port for the benchmark server (default: 5699)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        vault = make_vault(os.path.join(workdir, "vault"), 200)
+        base = f"http://127.0.0.1:{args.port}"
+
+        process = start_server(args.mode, args.port, workdir, vault, [])
+        try:
+            results = [
+                ("per-note /write", run_single(base, make_notes(args.notes, "single"))),
+                (f"/write/batch x{args.batch_size}", run_batch(base, make_notes(args.notes, "batch"), args.batch_size)),
+            ]
+        finally:
+            stop_server(process)
+
+    print(f"{args.notes} notes, {args.mode} server\n")
+    print(f"{'path':<22} {'seconds':>8} {'notes/sec':>10}")
+    for name, elapsed in results:
+        print(f"{name:<22} {elapsed:>8.2f} {args.notes / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Synthetic Vault
+Generates a reproducible Obsidian vault with an AI/Memory tree for benchmarks
+"""
+
+import os
+import random
+import datetime
+
+WORDS = (
+    "terraform azurerm module resource group network subnet vnet peering storage account "
+    "container registry keyvault secret identity policy role assignment pipeline agent "
+    "variable output backend state workspace provider version locals data source build "
+    "image packer windows linux compute scale set load balancer gateway firewall dns "
+    "private endpoint monitor diagnostic log analytics alert budget tag naming convention"
+).split()
+
+AGENTS = ["Claude", "GPT", "Copilot", "Gemini"]
+CATEGORIES = ["Contexts", "Conversations", "System_Prompts", "Projects"]
+
+
+def make_note(rng, title, agent, when, paragraphs):
+    """Build a note with the frontmatter layout written by smf.py"""
+    tags = ", ".join(rng.sample(WORDS, 3))
+    body = "\n\n".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120)))
+        for _ in range(paragraphs)
+    )
+    return f"""---
+title: "{title}"
+agent: "{agent}"
+date: "{when.strftime('%Y-%m-%d %H:%M')}"
+tags: [terraform, {tags}]
+status: "active"
+---
+
+# {title}
+
+{body}
+"""
+
+
+def make_vault(root, notes=2000, seed=42, paragraphs=6):
+    """Write `notes` markdown files below root/AI/Memory and return the vault path"""
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    for i in range(notes):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        agent = AGENTS[i % len(AGENTS)]
+        when = start + datetime.timedelta(minutes=37 * i)
+        topic = f"{rng.choice(WORDS).title()}{rng.choice(WORDS).title()}{i}"
+        if category == "Conversations":
+            filename = f"{when.strftime('%Y%m%d-%H%M')}-{topic}.md"
+        else:
+            filename = f"{topic}.md"
+        directory = os.path.join(root, "AI", "Memory", category, agent)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, filename), 'w', encoding='utf-8') as f:
+            f.write(make_note(rng, topic, agent, when, paragraphs))
+    return root
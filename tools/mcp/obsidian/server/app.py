@@ -2,14 +2,48 @@
 import os
 import json
 import re
-from flask import Flask, request, jsonify
+import time
+import uuid
+import hashlib
+import datetime
+import itertools
+import atexit
+import threading
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
+from werkzeug.serving import is_running_from_reloader
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+from search_index import SearchIndex
+from ngram_index import MAX_EDITS
+from matcher import get_matcher, matcher_cache, is_regex
+from scanner import ScanEngine, list_notes
+from note_dates import parse_note_date
+from snippets import find_snippets, MAX_SNIPPETS, MAX_CONTEXT_LINES
+from watcher import VaultWatcher, DEFAULT_POLL_INTERVAL
+from note_cache import NoteCache, DEFAULT_MAX_BYTES
+from result_cache import SearchResultCache, DEFAULT_MAX_BYTES as DEFAULT_SEARCH_CACHE_BYTES
+from conversation_index import ConversationIndex, CONVERSATIONS_DIR, sort_key as conversation_sort_key
+from vault_stats import VaultStats
+from query_index import QueryIndex, VALUE_FIELDS
+from frontmatter import parse_frontmatter, parse_date
+from note_writer import NoteWriter, DEFAULT_SYNC_MODE, DEFAULT_BATCH_WORKERS, remove_temp_files
+from note_sections import patch_section, PATCH_OPERATIONS
+from compression import (DecompressRequestMiddleware, DEFAULT_MIN_BYTES, choose_encoding, should_compress,
+                         compress, strip_etag_coding)
 
 # Configuration - will be loaded from config file or environment variables
 DEFAULT_PORT = 5678
+NDJSON_MIMETYPE = 'application/x-ndjson'
+SORT_ORDERS = ('relevance', 'mtime', 'date', 'path')
+CONFIG_FILE = os.environ.get('OBSIDIAN_CONFIG_FILE', os.path.join(os.path.dirname(__file__), 'config.json'))
+DEFAULT_INDEX_FILE = os.path.join(os.path.dirname(__file__), '.index', 'search_index.json')
+INDEX_SAVE_INTERVAL = 60  # seconds between saves of a search index changed by watcher events
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+# Accept gzip (and zstd) compressed request bodies
+app.wsgi_app = DecompressRequestMiddleware(app.wsgi_app)
 
 # Global config that will be loaded at startup
 config = {
@@ -17,13 +51,54 @@ config = {
     "memory_path": None
 }
 
+# Inverted index used to answer plain-text searches without scanning the vault
+search_index = SearchIndex(os.environ.get('OBSIDIAN_INDEX_FILE', DEFAULT_INDEX_FILE))
+
+# Conversation notes per agent, newest first, for /conversations/recent
+conversation_index = ConversationIndex()
+
+# Per-category note counts and sizes for /metadata
+vault_stats = VaultStats()
+
+# Columnar index of note frontmatter for /query
+query_index = QueryIndex()
+
+# Decoded content of recently read notes, validated against the file on every read
+note_cache = NoteCache(int(os.environ.get('OBSIDIAN_CACHE_BYTES', DEFAULT_MAX_BYTES)))
+
+# Atomic note writes; the journal of unfinished writes lives next to the search index
+note_writer = NoteWriter(os.environ.get('OBSIDIAN_WRITE_SYNC', DEFAULT_SYNC_MODE),
+                         journal_dir=os.path.dirname(search_index.index_file))
+interrupted_writes = []
+batch_workers = int(os.environ.get('OBSIDIAN_BATCH_WORKERS', DEFAULT_BATCH_WORKERS))
+
+# Bumped after every change the indexes apply; generation ETags of /search and /metadata
+# include a per-process tag because each production worker counts its own generations
+vault_generation = 0
+generation_lock = threading.Lock()
+PROCESS_TAG = uuid.uuid4().hex[:8]
+
+# Finished /search results for the current generation
+search_cache = SearchResultCache(int(os.environ.get('OBSIDIAN_SEARCH_CACHE_BYTES', DEFAULT_SEARCH_CACHE_BYTES)))
+
+# JSON responses at least this large are compressed for clients that accept it
+compress_min_bytes = int(os.environ.get('OBSIDIAN_COMPRESS_MIN_BYTES', DEFAULT_MIN_BYTES))
+
+# Process pool used for searches the index cannot answer
+scan_engine = ScanEngine(workers=int(os.environ.get('OBSIDIAN_SCAN_WORKERS', 0)) or None)
+
+# Watcher feeding edits made outside the server (e.g. in Obsidian) into the index
+vault_watcher = None
+last_index_save = time.monotonic()
+initialized = False  # set by init_app()
+
 def load_config():
     """Load configuration from file or environment variables"""
     # First try environment variables
     vault_path = os.environ.get('OBSIDIAN_VAULT_PATH')
     
     # Then try config file
-    config_path = os.path.join(os.path.dirname(__file__), 'config.json')
+    config_path = CONFIG_FILE
     if os.path.exists(config_path):
         try:
             with open(config_path, 'r') as f:
@@ -40,17 +115,820 @@ def load_config():
         config["vault_path"] = vault_path
         config["memory_path"] = os.path.join(vault_path, "AI/Memory")
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Simple health check endpoint"""
-    is_configured = config["vault_path"] is not None
+def build_search_index():
+    """Load the persisted search index and re-index notes changed since it was saved"""
+    vault_path = config["vault_path"]
+    memory_path = config["memory_path"]
+    if not vault_path:
+        return
+    
+    search_index.ready = False
+    conversation_index.ready = False
+    vault_stats.ready = False
+    query_index.ready = False
+    search_index.load(vault_path)
+    # Watch before syncing so edits made during the initial walk are not missed
+    start_vault_watcher()
+    search_index.sync(vault_path, memory_path)
+    recover_interrupted_writes()
+    rebuild_note_indexes()
+    if search_index.dirty:
+        save_search_index()
+    print(f"Search index ready: {len(search_index.docs)} notes")
+
+def rebuild_note_indexes():
+    """Rebuild the conversation, stats and frontmatter indexes from the notes in the search index"""
+    with search_index.lock:
+        docs = [(doc["path"], doc["size"], doc["mtime"] / 1e9) for doc in search_index.docs.values()]
+        frontmatter = [(doc["path"], doc["meta"]) for doc in search_index.docs.values() if "meta" in doc]
+    conversation_index.rebuild(path for path, _, _ in docs)
+    vault_stats.rebuild(docs)
+    query_index.rebuild(frontmatter)
+    bump_generation()
+
+def open_write_journal():
+    """Start this process's write journal, keeping writes a crashed process left unfinished"""
+    global interrupted_writes
+    interrupted_writes = note_writer.journal.open()
+
+def recover_interrupted_writes():
+    """Re-apply index updates for writes interrupted by a crash and drop their temporary files"""
+    global interrupted_writes
+    paths, interrupted_writes = interrupted_writes, []
+    if not paths:
+        return
+    for directory in {os.path.dirname(os.path.join(config["vault_path"], path)) for path in paths}:
+        if os.path.isdir(directory):
+            remove_temp_files(directory)
+    for path in paths:
+        full_path = os.path.join(config["vault_path"], path)
+        note_cache.invalidate(full_path)
+        search_index.update_note(path, full_path)
+    print(f"Recovered {len(paths)} interrupted writes")
+
+def start_search_index():
+    """Build the search index in the background; searches fall back to scanning until it is ready"""
+    thread = threading.Thread(target=build_search_index, name="search-index", daemon=True)
+    thread.start()
+    return thread
+
+def save_search_index():
+    """Persist index changes made since the last save"""
+    global last_index_save
+    if search_index.ready and search_index.dirty:
+        search_index.save()
+    last_index_save = time.monotonic()
+
+def start_vault_watcher():
+    """(Re)start the filesystem watcher for memory_path"""
+    global vault_watcher
+    stop_vault_watcher()
+    
+    mode = os.environ.get('OBSIDIAN_WATCHER', 'auto')
+    memory_path = config["memory_path"]
+    if mode == 'off' or not memory_path or not os.path.isdir(memory_path):
+        return
     
-    return jsonify({
+    poll_interval = float(os.environ.get('OBSIDIAN_POLL_INTERVAL', DEFAULT_POLL_INTERVAL))
+    vault_watcher = VaultWatcher(memory_path, apply_vault_events, mode=mode, poll_interval=poll_interval)
+    backend = vault_watcher.start()
+    print(f"Watching {memory_path} for changes ({backend})")
+
+def stop_vault_watcher():
+    """Stop the filesystem watcher if one is running"""
+    global vault_watcher
+    if vault_watcher is not None:
+        vault_watcher.stop()
+        vault_watcher = None
+
+def note_rel_path(full_path):
+    """Vault-relative path of a markdown note below memory_path, or None for anything else"""
+    if not full_path.endswith('.md'):
+        return None
+    memory_path = os.path.abspath(config["memory_path"])
+    if not os.path.abspath(full_path).startswith(memory_path + os.sep):
+        return None
+    return os.path.relpath(os.path.abspath(full_path), os.path.abspath(config["vault_path"]))
+
+def refresh_note(full_path):
+    """Bring the indexes up to date for a single note that was created, changed or removed"""
+    rel_path = note_rel_path(full_path)
+    if rel_path is not None:
+        search_index.update_note(rel_path, full_path)
+        refresh_note_indexes(rel_path, full_path)
+        bump_generation()
+
+def refresh_note_indexes(rel_path, full_path):
+    """Bring the conversation, stats and query indexes in line with a note the search index has seen"""
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        conversation_index.remove(rel_path)
+        vault_stats.remove(rel_path)
+        query_index.remove(rel_path)
+        return
+    conversation_index.add(rel_path)
+    vault_stats.update(rel_path, stat.st_size, stat.st_mtime)
+    query_index.update(rel_path, search_index.note_meta(rel_path))
+
+def forget_path(full_path, is_dir=False):
+    """Drop a removed note, or every note below a removed directory, from the indexes"""
+    if is_dir:
+        rel_dir = os.path.relpath(os.path.abspath(full_path), os.path.abspath(config["vault_path"]))
+        search_index.remove_tree(rel_dir)
+        conversation_index.remove_tree(rel_dir)
+        vault_stats.remove_tree(rel_dir)
+        query_index.remove_tree(rel_dir)
+        note_cache.invalidate_tree(full_path)
+        bump_generation()
+        return
+    note_cache.invalidate(full_path)
+    rel_path = note_rel_path(full_path)
+    if rel_path is not None:
+        search_index.remove_note(rel_path)
+        conversation_index.remove(rel_path)
+        vault_stats.remove(rel_path)
+        query_index.remove(rel_path)
+        bump_generation()
+
+def bump_generation():
+    """Invalidate the generation ETags handed out so far; call after the indexes changed"""
+    global vault_generation
+    with generation_lock:
+        vault_generation += 1
+
+def refresh_tree(full_path):
+    """Index every note below a directory that was moved into place"""
+    for root, _, files in os.walk(full_path):
+        for file in files:
+            refresh_note(os.path.join(root, file))
+
+def apply_vault_events(events):
+    """Apply a batch of watcher events; cost is proportional to the number of changed files"""
+    if not config["vault_path"]:
+        return
+    
+    for event in events:
+        if event.kind == "rescan":
+            search_index.sync(config["vault_path"], config["memory_path"])
+            rebuild_note_indexes()
+        elif event.kind == "moved":
+            forget_path(event.path, event.is_dir)
+            if event.is_dir:
+                refresh_tree(event.dest_path)
+            else:
+                refresh_note(event.dest_path)
+        elif event.kind == "deleted":
+            forget_path(event.path, event.is_dir)
+        else:
+            refresh_note(event.path)
+    
+    if time.monotonic() - last_index_save > INDEX_SAVE_INTERVAL:
+        save_search_index()
+
+def scan_notes(query, limit=None, prefix=None, snippets=0, context_lines=0):
+    """
+    Search by reading every note that can match; used for regex and multi-word
+    queries and while the index is building
+    """
+    root = config["memory_path"]
+    if prefix:
+        # Only walk the part of the notes folder the prefix can match
+        prefix_root = os.path.join(config["vault_path"], os.path.dirname(prefix.lstrip('/')))
+        common = os.path.commonpath([os.path.abspath(prefix_root), os.path.abspath(root)])
+        if common == os.path.abspath(root):
+            root = prefix_root
+        elif common != os.path.abspath(prefix_root):
+            root = None  # The prefix names a folder beside the notes
+    paths = list_notes(root) if root is not None else []
+    # The index rules out notes lacking the words of a plain-text query, like it answers
+    # one-word queries once built, and while the watcher keeps it current, notes lacking
+    # the regex's literals
+    if is_regex(query):
+        candidates = None
+        if tracked_generation() is not None:
+            candidates = search_index.regex_candidates(query, get_matcher(query).search)
+    else:
+        candidates = search_index.phrase_candidates(query)
+    if candidates is not None:
+        # Cheaper than os.path.relpath(); paths outside the prefix are kept to be safe
+        vault_prefix = os.path.join(config["vault_path"], "")
+        paths = [path for path in paths if not path.startswith(vault_prefix)
+                 or path[len(vault_prefix):].replace('/', os.sep) in candidates]
+    if prefix:
+        paths = [path for path in paths if os.path.relpath(path, config["vault_path"]).startswith(prefix.lstrip('/'))]
+    return scan_engine.scan(config["vault_path"], paths, query, limit=limit,
+                            snippets=snippets, context_lines=context_lines)
+
+def fuzzy_snippets(path, terms, max_snippets, context_lines):
+    """Snippets for a fuzzy hit, at the indexed words that matched the query"""
+    content = read_note(path)
+    if isinstance(content, dict):
+        return []
+    return find_snippets(content, search_index.term_offsets(content, terms), max_snippets, context_lines)
+
+def index_snippets(path, query, max_snippets, context_lines):
+    """Snippets for an index hit, at the query's occurrences in the note, inside words too"""
+    content = read_note(path)
+    if isinstance(content, dict):
+        return []
+    return find_snippets(content, get_matcher(query).spans(content), max_snippets, context_lines)
+
+def note_mtime(path):
+    """Modification time of a note by vault-relative path (0 when it cannot be read)"""
+    try:
+        return os.stat(os.path.join(config["vault_path"], path)).st_mtime
+    except OSError:
+        return 0
+
+def sort_results(paths, query, sort):
+    """Order search results: relevance, mtime and date put the best or newest first"""
+    if sort == 'relevance':
+        scores = search_index.bm25_scores(paths, query)
+        return sorted(paths, key=lambda path: (-scores[path], path))
+    if sort == 'mtime':
+        return sorted(paths, key=lambda path: (-note_mtime(path), path))
+    if sort == 'date':
+        # Notes without a date in their filename go last
+        dated = [(parse_note_date(path), path) for path in paths]
+        dated.sort(key=lambda item: (item[0] is None, -(item[0].timestamp() if item[0] else 0), item[1]))
+        return [path for _, path in dated]
+    return sorted(paths)
+
+def prefers_ndjson(accept_header):
+    """Check if an Accept header ranks NDJSON above JSON (by q-value, wildcards included)"""
+    accept = parse_accept_header(accept_header, MIMEAccept)
+    return accept[NDJSON_MIMETYPE] > accept['application/json']
+
+def wants_ndjson():
+    """Check if the client asked for a streamed NDJSON response"""
+    return prefers_ndjson(request.headers.get('Accept'))
+
+def conditional_response(etag):
+    """304 response if the client's If-None-Match already holds etag, else None"""
+    if not etag_matches(request.headers.get('If-None-Match'), etag):
+        return None
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def with_etag(response, etag):
+    """Attach an ETag so the client can revalidate the response later"""
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Compress large JSON responses for clients that accept gzip or zstd"""
+    if response.is_streamed or response.direct_passthrough or response.status_code != 200 \
+            or 'Content-Encoding' in response.headers or response.mimetype != 'application/json':
+        return response
+    response.vary.add('Accept-Encoding')
+    coding = choose_encoding(request.headers.get('Accept-Encoding'))
+    data = response.get_data()
+    if coding is None or not should_compress(response.mimetype, len(data), compress_min_bytes):
+        return response
+    response.set_data(compress(data, coding))
+    response.headers['Content-Encoding'] = coding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{coding}", weak)
+    return response
+
+def ndjson_response(items):
+    """Stream each item as one JSON line as soon as it is produced"""
+    def generate():
+        try:
+            for item in items:
+                yield json.dumps(item) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": f"Error while streaming results: {str(e)}"}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+def read_note(path):
+    """Content of a note by vault-relative path, or an error object"""
+    full_path = os.path.join(config["vault_path"], path.lstrip('/'))
+    
+    try:
+        if os.path.exists(full_path) and full_path.endswith('.md'):
+            return note_cache.read(full_path)
+        return {"error": f"File not found or not a markdown file: {path}"}
+    except Exception as e:
+        return {"error": f"Error reading file: {str(e)}"}
+
+# Vault operations shared by the Flask routes below and the asyncio server (async_app.py)
+
+class ApiError(Exception):
+    """Error returned to the client as {"error": message} with an HTTP status"""
+    
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+def require_configured():
+    """Raise unless a vault has been configured"""
+    if not config["vault_path"]:
+        raise ApiError("Server not configured. Set vault_path first.", 500)
+
+def int_arg(args, name, default=None):
+    """Integer query parameter from a Flask or aiohttp multidict"""
+    value = args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(f"{name} must be an integer")
+
+def list_arg(args, name):
+    """All values of a repeatable query parameter from a Flask or aiohttp multidict"""
+    if hasattr(args, 'getlist'):
+        return args.getlist(name)
+    return args.getall(name, [])
+
+def fuzzy_arg(args):
+    """fuzzy query parameter: None for exact matching, "auto" (edits by word length) or edits per word"""
+    value = (args.get('fuzzy') or '').strip().lower()
+    if value in ('', 'false', 'off'):
+        return None
+    if value in ('true', 'auto', 'on'):
+        return 'auto'
+    if value.isdigit() and int(value) <= MAX_EDITS:
+        return int(value)
+    raise ApiError(f"fuzzy must be auto or a number of edits from 0 to {MAX_EDITS}")
+
+def date_arg(args, name, end_of_day=False):
+    """Date query parameter (YYYY-MM-DD, optionally with a time); a bare end date covers that whole day"""
+    value = args.get(name)
+    if not value:
+        return None
+    date_time = parse_date(value)
+    if date_time is None:
+        raise ApiError(f"{name} must be a date (YYYY-MM-DD or YYYY-MM-DD HH:MM)")
+    if end_of_day and len(value.strip()) == 10:
+        date_time += datetime.timedelta(days=1, microseconds=-1)
+    return date_time
+
+def prefix_arg(args):
+    """Vault-relative path prefix query parameter; prefixes reaching outside the vault are refused"""
+    value = args.get('prefix')
+    if not value:
+        return None
+    prefix = os.path.normpath(value.lstrip('/'))
+    if os.path.isabs(prefix) or prefix == os.pardir or prefix.startswith(os.pardir + os.sep):
+        raise ApiError(f"Invalid prefix: {value}")
+    if prefix == os.curdir:
+        return None
+    # normpath drops a trailing slash, which limits the prefix to one folder
+    return prefix + os.sep if value.endswith('/') else prefix
+
+def parse_search_args(args):
+    """Validate /search query parameters into keyword arguments for search_vault()"""
+    query = args.get('query', '')
+    if not query:
+        raise ApiError("Query parameter required")
+    
+    limit = int_arg(args, 'limit')
+    offset = int_arg(args, 'offset', 0)
+    if (limit is not None and limit < 0) or offset < 0:
+        raise ApiError("limit and offset must be non-negative integers")
+    
+    sort = args.get('sort')
+    if sort is not None and sort not in SORT_ORDERS:
+        raise ApiError(f"sort must be one of: {', '.join(SORT_ORDERS)}")
+    
+    fuzzy = fuzzy_arg(args)
+    if fuzzy is not None and is_regex(query):
+        raise ApiError("fuzzy search needs a plain-text query, not a regular expression")
+    
+    return {
+        "query": query,
+        "limit": limit,
+        "offset": offset,
+        "sort": sort,
+        "prefix": prefix_arg(args),
+        "snippets": max(0, min(int_arg(args, 'snippets', 0), MAX_SNIPPETS)),
+        "context_lines": max(0, min(int_arg(args, 'context', 0), MAX_CONTEXT_LINES)),
+        "fuzzy": fuzzy
+    }
+
+def search_vault(query, limit=None, offset=0, sort=None, prefix=None, snippets=0, context_lines=0, fuzzy=None,
+                 lazy=False):
+    """
+    Run a search and return (hits, next_offset)
+    
+    Hits are vault-relative paths, or {"path", "snippets"} objects when snippets are
+    requested. With lazy=True unsorted scan results are returned as an iterator that
+    produces hits as they are found, and next_offset is None. Other results are
+    cached until the vault changes.
+    
+    fuzzy ("auto" or a number of edits per word) matches query words with typos,
+    most similar notes first; while the index builds the search is exact instead.
+    """
+    require_configured()
+    end = offset + limit if limit is not None else None
+    
+    # Read before searching, so a change made meanwhile leaves the result stored under an old generation
+    generation = tracked_generation()
+    cache_key = (query, limit, offset, sort, prefix, snippets, context_lines, fuzzy)
+    if generation is not None and not lazy:
+        cached = search_cache.get(cache_key, generation)
+        if cached is not None:
+            return cached
+    started = time.perf_counter()
+    
+    # Snippets found while scanning, keyed by path
+    scan_snippets = {}
+    
+    def scan_paths(hits):
+        for path, found in hits:
+            if found is not None:
+                scan_snippets[path] = found
+            yield path
+    
+    # One-word queries are answered from the index (fuzzy ones ranked by similarity);
+    # phrases and regex queries need a scan, which the index narrows
+    ranked = search_index.fuzzy_search(query, None if fuzzy == 'auto' else fuzzy) if fuzzy is not None else None
+    fuzzy_terms = {path: terms for path, _, terms in ranked} if ranked is not None else {}
+    results = [path for path, _, _ in ranked] if ranked is not None else search_index.search(query)
+    if results is not None:
+        if prefix:
+            results = [path for path in results if path.startswith(prefix.lstrip('/'))]
+    else:
+        try:
+            get_matcher(query)
+        except re.error as e:
+            raise ApiError(f"Invalid regular expression: {e}")
+        # Unsorted scans can stop early; one extra match tells us whether another page exists
+        scan_limit = end + 1 if end is not None and not sort else None
+        results = scan_paths(scan_notes(query, limit=scan_limit, prefix=prefix,
+                                        snippets=snippets, context_lines=context_lines))
+        if sort or not lazy:
+            results = list(results)
+    
+    if sort and not (ranked is not None and sort == 'relevance'):
+        results = sort_results(results, query, sort)
+    
+    def hit(path):
+        if not snippets:
+            return path
+        found = scan_snippets.get(path)
+        if found is None and path in fuzzy_terms:
+            found = fuzzy_snippets(path, fuzzy_terms[path], snippets, context_lines)
+        elif found is None:
+            found = index_snippets(path, query, snippets, context_lines)
+        return {"path": path, "snippets": found}
+    
+    if not isinstance(results, list):
+        return (hit(path) for path in itertools.islice(results, offset, end)), None
+    
+    # No header for an empty page (limit=0): following it would request the same page forever
+    next_offset = end if end is not None and end > offset and len(results) > end else None
+    hits = [hit(path) for path in results[offset:end]]
+    if generation is not None:
+        search_cache.put(cache_key, generation, (hits, next_offset), time.perf_counter() - started)
+    return hits, next_offset
+
+def parse_query_args(args):
+    """Validate /query parameters into keyword arguments for query_vault()"""
+    filters = {}
+    for field in VALUE_FIELDS:
+        # tag=a&tag=b and tag=a,b both require every listed tag
+        name = 'tag' if field == 'tags' else field
+        values = [value.strip() for item in list_arg(args, name) for value in item.split(',') if value.strip()]
+        if values:
+            filters[field] = values
+    
+    limit = int_arg(args, 'limit')
+    offset = int_arg(args, 'offset', 0)
+    if (limit is not None and limit < 0) or offset < 0:
+        raise ApiError("limit and offset must be non-negative integers")
+    
+    return {
+        "filters": filters,
+        "date_from": date_arg(args, 'date_from'),
+        "date_to": date_arg(args, 'date_to', end_of_day=True),
+        "prefix": prefix_arg(args),
+        "limit": limit,
+        "offset": offset
+    }
+
+def query_vault(filters, date_from=None, date_to=None, prefix=None, limit=None, offset=0):
+    """Notes whose frontmatter matches every filter, newest first; returns (results, next_offset)"""
+    require_configured()
+    index = query_index
+    if not index.ready:
+        # Index still building: parse the frontmatter of every note for this request
+        entries = []
+        for path in list_notes(config["memory_path"]):
+            content = read_note(os.path.relpath(path, config["vault_path"]))
+            meta = parse_frontmatter(content) if isinstance(content, str) else None
+            if meta:
+                entries.append((os.path.relpath(path, config["vault_path"]), meta))
+        index = QueryIndex()
+        index.rebuild(entries)
+    
+    results = index.query(filters, date_from=date_from, date_to=date_to,
+                          prefix=prefix.lstrip('/') if prefix else None)
+    end = offset + limit if limit is not None else None
+    # No header for an empty page (limit=0): following it would request the same page forever
+    next_offset = end if end is not None and end > offset and len(results) > end else None
+    return results[offset:end], next_offset
+
+def note_written(full_path):
+    """Drop the cached copy of a note the server changed and bring the indexes up to date"""
+    note_cache.invalidate(full_path)
+    refresh_note(full_path)
+
+def write_vault_note(path, content):
+    """Write a note atomically and bring the indexes up to date"""
+    require_configured()
+    full_path = os.path.join(config["vault_path"], path.lstrip('/'))
+    
+    try:
+        note_writer.write(full_path, content, rel_path=path.lstrip('/'), apply=lambda: note_written(full_path))
+    except Exception as e:
+        raise ApiError(f"Failed to write file: {str(e)}", 500)
+    return {"status": "success", "path": path}
+
+def batch_written(written):
+    """Index the notes a batch wrote in one pass; written holds (full path, content, stat) tuples"""
+    notes = []
+    for full_path, content, stat in written:
+        note_cache.invalidate(full_path)
+        rel_path = note_rel_path(full_path)
+        if rel_path is not None:
+            notes.append((rel_path, full_path, content, stat))
+    search_index.add_notes(notes)
+    for rel_path, full_path, _, _ in notes:
+        refresh_note_indexes(rel_path, full_path)
+    bump_generation()
+
+def parse_batch_items(body, ndjson=False):
+    """
+    Items of a /write/batch body: a JSON array, or one JSON object per line for NDJSON
+    
+    Lines that are not valid JSON become ValueError items, reported per item.
+    """
+    if not ndjson:
+        try:
+            items = json.loads(body)
+        except ValueError as e:
+            raise ApiError(f"Invalid JSON: {str(e)}", 400)
+        if not isinstance(items, list):
+            raise ApiError("Expected a JSON array of {path, content} objects", 400)
+        return items
+    
+    items = []
+    for number, line in enumerate(body.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError as e:
+            items.append(ValueError(f"Invalid JSON on line {number}: {str(e)}"))
+    return items
+
+def write_vault_batch(items):
+    """
+    Write many notes at once with a pool of workers and index them in one pass
+    
+    Returns counts and one {"path", "status"} result per item, in request order;
+    failed items carry an "error" message and do not stop the others.
+    """
+    require_configured()
+    results = [None] * len(items)
+    writes = []
+    for index, item in enumerate(items):
+        if isinstance(item, ValueError):
+            results[index] = {"path": None, "status": "error", "error": str(item)}
+        elif not isinstance(item, dict) or not isinstance(item.get('path'), str) or not isinstance(item.get('content'), str):
+            path = item.get('path') if isinstance(item, dict) else None
+            results[index] = {"path": path, "status": "error", "error": "Path and content are required"}
+        else:
+            path = item['path']
+            writes.append((index, os.path.join(config["vault_path"], path.lstrip('/')), item['content'], path.lstrip('/')))
+    
+    written = note_writer.write_batch([(full_path, content, rel_path) for _, full_path, content, rel_path in writes],
+                                      apply=batch_written, workers=batch_workers)
+    for (index, _, _, _), result in zip(writes, written):
+        path = items[index]['path']
+        if isinstance(result, Exception):
+            results[index] = {"path": path, "status": "error", "error": f"Failed to write file: {str(result)}"}
+        else:
+            results[index] = {"path": path, "status": "success"}
+    
+    failed = sum(1 for result in results if result["status"] == "error")
+    return {"written": len(items) - failed, "failed": failed, "results": results}
+
+def append_vault_note(path, content):
+    """Append content to a note, creating it if needed, and bring the indexes up to date"""
+    require_configured()
+    full_path = os.path.join(config["vault_path"], path.lstrip('/'))
+    
+    try:
+        size = note_writer.append(full_path, content, rel_path=path.lstrip('/'), apply=lambda: note_written(full_path))
+    except Exception as e:
+        raise ApiError(f"Failed to append to file: {str(e)}", 500)
+    return {"status": "success", "path": path, "size": size}
+
+def patch_vault_note(path, heading, content, operation="replace"):
+    """Replace, append to or prepend to one section of a note"""
+    require_configured()
+    if operation not in PATCH_OPERATIONS:
+        raise ApiError(f"operation must be one of: {', '.join(PATCH_OPERATIONS)}", 400)
+    full_path = os.path.join(config["vault_path"], path.lstrip('/'))
+    
+    def patch(current):
+        if current is None:
+            raise ApiError(f"Note not found: {path}", 404)
+        patched = patch_section(current, heading, content, operation)
+        if patched is None:
+            raise ApiError(f"Section not found: {heading}", 404)
+        return patched
+    
+    try:
+        note_writer.update(full_path, patch, rel_path=path.lstrip('/'), apply=lambda: note_written(full_path))
+    except ApiError:
+        raise
+    except Exception as e:
+        raise ApiError(f"Failed to patch file: {str(e)}", 500)
+    return {"status": "success", "path": path, "heading": heading}
+
+def update_vault_path(vault_path):
+    """Save a new vault path and rebuild the indexes for it"""
+    # Validate path exists
+    if not os.path.exists(vault_path):
+        raise ApiError(f"Vault path does not exist: {vault_path}")
+    
+    # Save to config file
+    try:
+        with open(CONFIG_FILE, 'w') as f:
+            json.dump({"vault_path": vault_path}, f)
+    except Exception as e:
+        raise ApiError(f"Failed to save configuration: {str(e)}", 500)
+    
+    # Update running config
+    config["vault_path"] = vault_path
+    config["memory_path"] = os.path.join(vault_path, "AI/Memory")
+    
+    # Rebuild the search index for the new vault
+    note_cache.clear()
+    start_search_index()
+    
+    return {"status": "Configuration updated successfully"}
+
+def recent_conversations(agent=None, limit=10):
+    """Newest conversation notes of an agent (or of all agents) as {"path", "date"} objects"""
+    require_configured()
+    if agent is not None and (os.sep in agent or '/' in agent or agent in ('.', '..')):
+        raise ApiError(f"Invalid agent name: {agent}")
+    if conversation_index.ready:
+        paths = conversation_index.recent(agent, limit)
+    else:
+        # Index still building: list the conversation folder (names only, no content)
+        root = os.path.join(config["vault_path"], CONVERSATIONS_DIR, agent or "")
+        rel_paths = [os.path.relpath(path, config["vault_path"]) for path in list_notes(root)]
+        paths = sorted(rel_paths, key=conversation_sort_key)[:limit]
+    
+    results = []
+    for path in paths:
+        date_time = parse_note_date(path)
+        results.append({"path": path, "date": date_time.isoformat() if date_time else None})
+    return results
+
+def server_stats():
+    """Cache and index statistics"""
+    return {
+        "note_cache": note_cache.stats(),
+        "matcher_cache": matcher_cache.stats(),
+        "search_cache": search_cache.stats(),
+        "search_index": {
+            "ready": search_index.ready,
+            "notes": len(search_index.docs),
+            "terms": len(search_index.postings),
+            "trigrams": len(search_index.ngrams.grams)
+        },
+        "conversation_index": conversation_index.stats(),
+        "query_index": query_index.stats(),
+        "note_writer": note_writer.stats()
+    }
+
+def vault_metadata():
+    """Basic structure and stats about the vault"""
+    require_configured()
+    if vault_stats.ready:
+        categories = vault_stats.snapshot()
+    else:
+        # Stats are still being built: walk the AI Memory directory once for this request
+        entries = []
+        for path in list_notes(config["memory_path"]):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((os.path.relpath(path, config["vault_path"]), stat.st_size, stat.st_mtime))
+        walked = VaultStats()
+        walked.rebuild(entries)
+        categories = walked.snapshot()
+    
+    return {
+        "vault_configured": config["vault_path"] is not None,
+        "stats": {category: totals["notes"] for category, totals in categories.items()},
+        "categories": categories,
+        "total_bytes": sum(totals["bytes"] for totals in categories.values())
+    }
+
+def health():
+    """Health check payload"""
+    return {
         "status": "healthy",
-        "configured": is_configured,
+        "configured": config["vault_path"] is not None,
         "version": "0.1.0",
         "name": "Shared Memory Framework Server"
-    })
+    }
+
+def tracked_generation():
+    """
+    Current vault generation, or None when it may miss changes
+    
+    Only the watcher keeps the indexes in step with edits made outside the
+    server, so without it (or while the indexes build) nothing derived from
+    them can be reused.
+    """
+    if vault_watcher is None or not search_index.ready or not vault_stats.ready:
+        return None
+    with generation_lock:
+        return vault_generation
+
+def generation_etag():
+    """ETag of responses built from the indexes (/search, /metadata), or None while generations are not tracked"""
+    generation = tracked_generation()
+    return f"g-{PROCESS_TAG}-{generation}" if generation is not None else None
+
+def note_etag(path):
+    """Strong ETag of a note from its inode, modification time and size ("missing" if it is gone)"""
+    try:
+        stat = os.stat(os.path.join(config["vault_path"], path.lstrip('/')))
+    except OSError:
+        return "missing"
+    return f"{stat.st_ino:x}-{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+def read_etag(paths):
+    """
+    ETag of a /read response
+    
+    Taken before the notes are read, so a note changing mid-request leaves the
+    client with an older ETag and at worst an extra full response.
+    """
+    if len(paths) == 1:
+        return note_etag(paths[0])
+    tags = "\0".join(f"{path}\0{note_etag(path)}" for path in paths)
+    return hashlib.sha1(tags.encode('utf-8')).hexdigest()
+
+def etag_matches(if_none_match, etag):
+    """Check an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match or etag is None:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        # Compressed responses carry the ETag with their coding appended
+        if strip_etag_coding(candidate.strip('"')) == etag:
+            return True
+    return False
+
+def ndjson_search_hit(hit):
+    """NDJSON line object for a search hit"""
+    return hit if isinstance(hit, dict) else {"path": hit}
+
+def ndjson_notes(paths):
+    """NDJSON line objects for /read, one per path"""
+    for path in paths:
+        content = read_note(path)
+        if isinstance(content, dict):
+            yield {"path": path, "error": content["error"]}
+        else:
+            yield {"path": path, "content": content}
+
+# Flask routes
+
+@app.errorhandler(ApiError)
+def handle_api_error(error):
+    return jsonify({"error": error.message}), error.status
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Simple health check endpoint"""
+    return jsonify(health())
 
 @app.route('/config', methods=['GET', 'POST'])
 def manage_config():
@@ -70,143 +948,155 @@ def manage_config():
         
         # Update config
         if 'vault_path' in data:
-            vault_path = data['vault_path']
-            
-            # Validate path exists
-            if not os.path.exists(vault_path):
-                return jsonify({"error": f"Vault path does not exist: {vault_path}"}), 400
-            
-            # Save to config file
-            config_path = os.path.join(os.path.dirname(__file__), 'config.json')
-            try:
-                with open(config_path, 'w') as f:
-                    json.dump({"vault_path": vault_path}, f)
-                
-                # Update running config
-                config["vault_path"] = vault_path
-                config["memory_path"] = os.path.join(vault_path, "AI/Memory")
-                
-                return jsonify({"status": "Configuration updated successfully"})
-            except Exception as e:
-                return jsonify({"error": f"Failed to save configuration: {str(e)}"}), 500
+            return jsonify(update_vault_path(data['vault_path']))
         
         return jsonify({"error": "No valid configuration options provided"}), 400
 
 @app.route('/search', methods=['GET'])
 def search_notes():
     """Search for notes matching a query"""
-    if not config["memory_path"]:
-        return jsonify({"error": "Server not configured. Set vault_path first."}), 500
+    require_configured()
+    options = parse_search_args(request.args)
     
-    query = request.args.get('query', '')
-    if not query:
-        return jsonify({"error": "Query parameter required"}), 400
+    if wants_ndjson():
+        hits, _ = search_vault(lazy=True, **options)
+        return ndjson_response(ndjson_search_hit(hit) for hit in hits)
     
-    # Case-insensitive search in files
-    results = []
-    for root, _, files in os.walk(config["memory_path"]):
-        for file in files:
-            if file.endswith('.md'):
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, config["vault_path"])
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Check if query matches filename or content
-                    if re.search(query, file, re.IGNORECASE) or re.search(query, content, re.IGNORECASE):
-                        results.append(rel_path)
-                except Exception as e:
-                    print(f"Error reading {file_path}: {e}")
-    
-    return jsonify(results)
+    etag = generation_etag()
+    not_modified = conditional_response(etag)
+    if not_modified is not None:
+        return not_modified
+    
+    hits, next_offset = search_vault(**options)
+    response = jsonify(hits)
+    if next_offset is not None:
+        response.headers['X-Next-Offset'] = str(next_offset)
+    return with_etag(response, etag)
 
 @app.route('/read', methods=['GET'])
 def read_notes():
     """Read one or more notes by path"""
-    if not config["vault_path"]:
-        return jsonify({"error": "Server not configured. Set vault_path first."}), 500
+    require_configured()
     
     paths = request.args.getlist('path')
     if not paths:
         return jsonify({"error": "At least one path parameter required"}), 400
     
+    if wants_ndjson():
+        return ndjson_response(ndjson_notes(paths))
+    
+    etag = read_etag(paths)
+    not_modified = conditional_response(etag)
+    if not_modified is not None:
+        return not_modified
+    
     results = {}
     for path in paths:
-        full_path = os.path.join(config["vault_path"], path.lstrip('/'))
-        
-        try:
-            if os.path.exists(full_path) and full_path.endswith('.md'):
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                results[path] = content
-            else:
-                results[path] = {"error": f"File not found or not a markdown file: {path}"}
-        except Exception as e:
-            results[path] = {"error": f"Error reading file: {str(e)}"}
+        results[path] = read_note(path)
     
-    return jsonify(results)
+    return with_etag(jsonify(results), etag)
 
 @app.route('/write', methods=['POST'])
 def write_note():
     """Write content to a note"""
-    if not config["vault_path"]:
-        return jsonify({"error": "Server not configured. Set vault_path first."}), 500
+    require_configured()
     
     data = request.get_json()
     
     if not data or 'path' not in data or 'content' not in data:
         return jsonify({"error": "Path and content are required"}), 400
     
-    path = data['path']
-    content = data['content']
+    return jsonify(write_vault_note(data['path'], data['content']))
+
+@app.route('/write/batch', methods=['POST'])
+def write_notes_batch():
+    """Write many notes in one request (JSON array or NDJSON body)"""
+    require_configured()
     
-    full_path = os.path.join(config["vault_path"], path.lstrip('/'))
+    ndjson = request.mimetype == NDJSON_MIMETYPE
+    items = parse_batch_items(request.get_data(as_text=True), ndjson=ndjson)
+    return jsonify(write_vault_batch(items))
+
+@app.route('/append', methods=['POST'])
+def append_note():
+    """Append content to a note"""
+    require_configured()
     
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    data = request.get_json()
     
-    try:
-        with open(full_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        return jsonify({"status": "success", "path": path})
-    except Exception as e:
-        return jsonify({"error": f"Failed to write file: {str(e)}"}), 500
+    if not data or 'path' not in data or 'content' not in data:
+        return jsonify({"error": "Path and content are required"}), 400
+    
+    return jsonify(append_vault_note(data['path'], data['content']))
+
+@app.route('/patch', methods=['POST', 'PATCH'])
+def patch_note():
+    """Change one section of a note"""
+    require_configured()
+    
+    data = request.get_json()
+    
+    if not data or 'path' not in data or 'heading' not in data or 'content' not in data:
+        return jsonify({"error": "Path, heading and content are required"}), 400
+    
+    return jsonify(patch_vault_note(data['path'], data['heading'], data['content'],
+                                    data.get('operation', 'replace')))
+
+@app.route('/query', methods=['GET'])
+def query_notes():
+    """Find notes by frontmatter fields"""
+    results, next_offset = query_vault(**parse_query_args(request.args))
+    response = jsonify(results)
+    if next_offset is not None:
+        response.headers['X-Next-Offset'] = str(next_offset)
+    return response
+
+@app.route('/conversations/recent', methods=['GET'])
+def get_recent_conversations():
+    """Most recent conversations, newest first"""
+    limit = int_arg(request.args, 'limit', 10)
+    if limit < 0:
+        return jsonify({"error": "limit must be a non-negative integer"}), 400
+    return jsonify(recent_conversations(request.args.get('agent') or None, limit))
+
+@app.route('/stats', methods=['GET'])
+def get_server_stats():
+    """Get cache and index statistics"""
+    return jsonify(server_stats())
 
 @app.route('/metadata', methods=['GET'])
 def get_vault_metadata():
     """Get metadata about the vault structure"""
-    if not config["memory_path"]:
-        return jsonify({"error": "Server not configured. Set vault_path first."}), 500
-    
-    # Return basic structure and stats about the vault
-    stats = {
-        "contexts": 0,
-        "conversations": 0,
-        "system_prompts": 0,
-        "projects": 0
-    }
-    
-    # Walk through the AI Memory directory and count files
-    for root, _, files in os.walk(config["memory_path"]):
-        if "Contexts" in root:
-            stats["contexts"] += sum(1 for f in files if f.endswith('.md'))
-        elif "Conversations" in root:
-            stats["conversations"] += sum(1 for f in files if f.endswith('.md'))
-        elif "System_Prompts" in root:
-            stats["system_prompts"] += sum(1 for f in files if f.endswith('.md'))
-        elif "Projects" in root:
-            stats["projects"] += sum(1 for f in files if f.endswith('.md'))
-    
-    return jsonify({
-        "vault_configured": config["vault_path"] is not None,
-        "stats": stats
-    })
+    etag = generation_etag()
+    not_modified = conditional_response(etag)
+    if not_modified is not None:
+        return not_modified
+    return with_etag(jsonify(vault_metadata()), etag)
 
-# Load config on startup
-load_config()
+def init_app():
+    """
+    Load the config, open the write journal and start building the search index
+    
+    Called once by each serving process (the __main__ blocks, serve.py and every
+    gunicorn worker) rather than on import: scan workers started with the spawn
+    method re-import the main module, and must not start indexes, watchers or
+    journals of their own.
+    """
+    global initialized
+    if initialized:
+        return
+    initialized = True
+    load_config()
+    open_write_journal()
+    start_search_index()
+    atexit.register(scan_engine.shutdown)
+    atexit.register(save_search_index)
+    atexit.register(stop_vault_watcher)
+    atexit.register(note_writer.journal.close)
 
 if __name__ == '__main__':
+    # The reloader's parent process only watches source files and restarts the server
+    if is_running_from_reloader():
+        init_app()
     port = int(os.environ.get('PORT', DEFAULT_PORT))
     app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
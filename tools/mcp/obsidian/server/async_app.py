@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Async Server
+asyncio variant of the Shared Memory Framework Server built on aiohttp
+
+Serves the same routes as app.py and shares its configuration, search index,
+note cache and vault watcher. Every handler that touches the file system runs
+in a thread pool, so a slow search over a network-mounted vault does not hold up
+other requests: they are all multiplexed on one event loop.
+"""
+
+import os
+import json
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+
+import app as api
+import compression
+
+DEFAULT_PORT = 5678
+DEFAULT_IO_THREADS = 32
+# Content-Encodings aiohttp decodes itself while reading a request body
+AIOHTTP_DECODED = ("identity", "gzip", "deflate", "br")
+# Methods a CORS preflight may ask for, as flask-cors allows them by default
+CORS_METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+
+IO_THREADS = int(os.environ.get("OBSIDIAN_ASYNC_THREADS", DEFAULT_IO_THREADS))
+
+# Blocking file I/O and scans run here, off the event loop; created on first use and
+# shut down with the application, so an application created later gets a new pool
+io_executor = None
+
+# End of a streamed generator (StopIteration cannot cross an executor future)
+_DONE = object()
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call in the I/O thread pool"""
+    global io_executor
+    if io_executor is None:
+        io_executor = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="vault-io")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, functools.partial(func, *args, **kwargs))
+
+
+def json_response(data, status=200, headers=None):
+    return web.json_response(data, status=status, headers=headers, dumps=json.dumps)
+
+
+def etag_headers(etag, headers=None):
+    """Response headers carrying an ETag the client can revalidate with"""
+    headers = dict(headers or {})
+    if etag is not None:
+        headers["ETag"] = f'"{etag}"'
+        headers["Cache-Control"] = "no-cache"
+    return headers
+
+
+def conditional_response(request, etag):
+    """304 response if the client's If-None-Match already holds etag, else None"""
+    if not api.etag_matches(request.headers.get("If-None-Match"), etag):
+        return None
+    return web.Response(status=304, headers=etag_headers(etag))
+
+
+def wants_ndjson(request):
+    """Check if the client asked for a streamed NDJSON response"""
+    return api.prefers_ndjson(request.headers.get("Accept"))
+
+
+async def ndjson_response(request, items):
+    """Stream each item as one JSON line, pulling items from the generator in the I/O pool"""
+    response = web.StreamResponse(headers={"Content-Type": api.NDJSON_MIMETYPE})
+    await response.prepare(request)
+    try:
+        while True:
+            item = await run_blocking(next, items, _DONE)
+            if item is _DONE:
+                break
+            await response.write((json.dumps(item) + "\n").encode("utf-8"))
+    except (ConnectionResetError, asyncio.CancelledError):
+        # Client went away; the generator is dropped and stops producing results
+        raise
+    except Exception as e:
+        await response.write((json.dumps({"error": f"Error while streaming results: {str(e)}"}) + "\n").encode("utf-8"))
+    await response.write_eof()
+    return response
+
+
+async def read_body(request):
+    """Request body, also decoding the Content-Encodings aiohttp leaves to the application (zstd)"""
+    data = await request.read()
+    coding = request.headers.get("Content-Encoding", "identity").strip().lower()
+    if coding in AIOHTTP_DECODED:
+        return data
+    try:
+        return await run_blocking(compression.decompress, data, coding)
+    except compression.BodyTooLarge as e:
+        raise api.ApiError(str(e), 413)
+    except ValueError as e:
+        raise api.ApiError(str(e), 415)
+
+
+async def read_json(request):
+    """Parsed JSON request body, or None if it is not valid JSON"""
+    body = await read_body(request)
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+@web.middleware
+async def compression_middleware(request, handler):
+    """Compress large JSON responses for clients that accept gzip or zstd"""
+    response = await handler(request)
+    if type(response) is not web.Response or response.status != 200 or not isinstance(response.body, bytes) \
+            or "Content-Encoding" in response.headers or response.content_type != "application/json":
+        return response
+    response.headers.add("Vary", "Accept-Encoding")
+    coding = compression.choose_encoding(request.headers.get("Accept-Encoding"))
+    if coding is None or not compression.should_compress(response.content_type, len(response.body),
+                                                         api.compress_min_bytes):
+        return response
+    response.body = await run_blocking(compression.compress, response.body, coding)
+    response.headers["Content-Encoding"] = coding
+    if "ETag" in response.headers:
+        response.headers["ETag"] = compression.encoded_etag(response.headers["ETag"], coding)
+    return response
+
+
+@web.middleware
+async def error_middleware(request, handler):
+    """Report ApiError as {"error": ...}"""
+    try:
+        return await handler(request)
+    except api.ApiError as e:
+        return json_response({"error": e.message}, status=e.status)
+
+
+@web.middleware
+async def preflight_middleware(request, handler):
+    """Answer CORS preflight (OPTIONS) requests for every route, as flask-cors does"""
+    if request.method != "OPTIONS":
+        return await handler(request)
+    not_allowed = request.match_info.http_exception
+    if not_allowed is not None and not isinstance(not_allowed, web.HTTPMethodNotAllowed):
+        return await handler(request)
+    headers = {}
+    if not_allowed is not None:
+        headers["Allow"] = ", ".join(sorted(not_allowed.allowed_methods | {"OPTIONS"}))
+    requested_method = request.headers.get("Access-Control-Request-Method", "").upper()
+    if requested_method in CORS_METHODS:
+        headers["Access-Control-Allow-Methods"] = ", ".join(CORS_METHODS)
+        requested_headers = request.headers.get("Access-Control-Request-Headers")
+        if requested_headers:
+            headers["Access-Control-Allow-Headers"] = ", ".join(
+                sorted(header.strip() for header in requested_headers.split(",")))
+    return web.Response(headers=headers)
+
+
+async def cors_headers(request, response):
+    """Allow cross-origin requests on every response, streamed ones included, like flask-cors"""
+    origin = request.headers.get("Origin")
+    if origin:
+        response.headers["Access-Control-Allow-Origin"] = origin
+        response.headers.add("Vary", "Origin")
+    else:
+        response.headers["Access-Control-Allow-Origin"] = "*"
+
+
+async def health_check(request):
+    """Simple health check endpoint"""
+    return json_response(api.health())
+
+
+async def get_config(request):
+    """Get server configuration"""
+    return json_response({
+        "vault_configured": api.config["vault_path"] is not None,
+        "api_version": "0.1.0"
+    })
+
+
+async def update_config(request):
+    """Update server configuration"""
+    data = await read_json(request)
+
+    if not data:
+        return json_response({"error": "Invalid request"}, status=400)
+
+    if 'vault_path' in data:
+        return json_response(await run_blocking(api.update_vault_path, data['vault_path']))
+
+    return json_response({"error": "No valid configuration options provided"}, status=400)
+
+
+async def search_notes(request):
+    """Search for notes matching a query"""
+    api.require_configured()
+    options = api.parse_search_args(request.query)
+
+    if wants_ndjson(request):
+        hits, _ = await run_blocking(api.search_vault, lazy=True, **options)
+        return await ndjson_response(request, (api.ndjson_search_hit(hit) for hit in hits))
+
+    etag = api.generation_etag()
+    not_modified = conditional_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    hits, next_offset = await run_blocking(api.search_vault, **options)
+    headers = {"X-Next-Offset": str(next_offset)} if next_offset is not None else None
+    return json_response(hits, headers=etag_headers(etag, headers))
+
+
+async def read_notes(request):
+    """Read one or more notes by path"""
+    api.require_configured()
+
+    paths = request.query.getall('path', [])
+    if not paths:
+        return json_response({"error": "At least one path parameter required"}, status=400)
+
+    if wants_ndjson(request):
+        return await ndjson_response(request, api.ndjson_notes(paths))
+
+    etag = await run_blocking(api.read_etag, paths)
+    not_modified = conditional_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    # Notes are read concurrently; the response keeps the requested order
+    contents = await asyncio.gather(*(run_blocking(api.read_note, path) for path in paths))
+    return json_response(dict(zip(paths, contents)), headers=etag_headers(etag))
+
+
+async def write_note(request):
+    """Write content to a note"""
+    api.require_configured()
+
+    data = await read_json(request)
+
+    if not data or 'path' not in data or 'content' not in data:
+        return json_response({"error": "Path and content are required"}, status=400)
+
+    return json_response(await run_blocking(api.write_vault_note, data['path'], data['content']))
+
+
+async def write_notes_batch(request):
+    """Write many notes in one request (JSON array or NDJSON body)"""
+    api.require_configured()
+
+    ndjson = request.content_type == api.NDJSON_MIMETYPE
+    body = await read_body(request)
+    items = api.parse_batch_items(body.decode('utf-8', errors='replace'), ndjson=ndjson)
+    return json_response(await run_blocking(api.write_vault_batch, items))
+
+
+async def append_note(request):
+    """Append content to a note"""
+    api.require_configured()
+
+    data = await read_json(request)
+
+    if not data or 'path' not in data or 'content' not in data:
+        return json_response({"error": "Path and content are required"}, status=400)
+
+    return json_response(await run_blocking(api.append_vault_note, data['path'], data['content']))
+
+
+async def patch_note(request):
+    """Change one section of a note"""
+    api.require_configured()
+
+    data = await read_json(request)
+
+    if not data or 'path' not in data or 'heading' not in data or 'content' not in data:
+        return json_response({"error": "Path, heading and content are required"}, status=400)
+
+    return json_response(await run_blocking(api.patch_vault_note, data['path'], data['heading'], data['content'],
+                                            data.get('operation', 'replace')))
+
+
+async def query_notes(request):
+    """Find notes by frontmatter fields"""
+    options = api.parse_query_args(request.query)
+    results, next_offset = await run_blocking(api.query_vault, **options)
+    headers = {"X-Next-Offset": str(next_offset)} if next_offset is not None else None
+    return json_response(results, headers=headers)
+
+
+async def get_recent_conversations(request):
+    """Most recent conversations, newest first"""
+    limit = api.int_arg(request.query, 'limit', 10)
+    if limit < 0:
+        return json_response({"error": "limit must be a non-negative integer"}, status=400)
+    return json_response(await run_blocking(api.recent_conversations, request.query.get('agent') or None, limit))
+
+
+async def get_server_stats(request):
+    """Get cache and index statistics"""
+    return json_response(api.server_stats())
+
+
+async def get_vault_metadata(request):
+    """Get metadata about the vault structure"""
+    etag = api.generation_etag()
+    not_modified = conditional_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    return json_response(await run_blocking(api.vault_metadata), headers=etag_headers(etag))
+
+
+async def shutdown(application):
+    global io_executor
+    if io_executor is not None:
+        io_executor.shutdown(wait=False, cancel_futures=True)
+        io_executor = None
+
+
+def create_app():
+    """aiohttp application serving the memory server routes"""
+    application = web.Application(middlewares=[preflight_middleware, error_middleware, compression_middleware],
+                                  client_max_size=compression.MAX_REQUEST_BYTES)
+    application.router.add_get('/health', health_check)
+    application.router.add_get('/config', get_config)
+    application.router.add_post('/config', update_config)
+    application.router.add_get('/search', search_notes)
+    application.router.add_get('/read', read_notes)
+    application.router.add_post('/write', write_note)
+    application.router.add_post('/write/batch', write_notes_batch)
+    application.router.add_post('/append', append_note)
+    application.router.add_post('/patch', patch_note)
+    application.router.add_patch('/patch', patch_note)
+    application.router.add_get('/query', query_notes)
+    application.router.add_get('/conversations/recent', get_recent_conversations)
+    application.router.add_get('/stats', get_server_stats)
+    application.router.add_get('/metadata', get_vault_metadata)
+    application.on_response_prepare.append(cors_headers)
+    application.on_cleanup.append(shutdown)
+    return application
+
+
+if __name__ == '__main__':
+    api.init_app()
+    port = int(os.environ.get('PORT', DEFAULT_PORT))
+    web.run_app(create_app(), host='0.0.0.0', port=port)
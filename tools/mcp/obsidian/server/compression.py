@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Compression
+Content-Encoding negotiation for responses and decoding of compressed request
+bodies, shared by the Flask and asyncio servers
+
+gzip is always available; zstd is used when the optional zstandard package is
+installed and the client accepts it.
+"""
+
+import io
+import gzip
+import json
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Responses smaller than this are sent uncompressed (override with OBSIDIAN_COMPRESS_MIN_BYTES)
+DEFAULT_MIN_BYTES = 1024
+GZIP_LEVEL = 1  # fastest level; still shrinks markdown JSON about 4x
+ZSTD_LEVEL = 3
+# Decompressed request bodies larger than this are rejected
+MAX_REQUEST_BYTES = 256 * 1024 * 1024
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/plain", "text/markdown")
+
+
+class BodyTooLarge(ValueError):
+    """A compressed request body expands beyond MAX_REQUEST_BYTES"""
+
+
+def supported_encodings():
+    """Content codings this server can produce and decode, in order of preference"""
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding):
+    """Best coding both sides support for a response, or None to send it as is"""
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0)
+    for coding in supported_encodings():
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def should_compress(mimetype, size, min_bytes):
+    """Check if a response body is worth compressing"""
+    return size >= min_bytes and mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def encoded_etag(etag, coding):
+    """ETag header value for the compressed representation of a response with ETag header etag"""
+    weak = etag.startswith("W/")
+    tag = (etag[2:] if weak else etag).strip('"')
+    return ("W/" if weak else "") + f'"{tag}-{coding}"'
+
+
+def strip_etag_coding(tag):
+    """Unquoted ETag with the suffix added by encoded_etag() removed"""
+    for coding in ("zstd", "gzip"):
+        if tag.endswith(f"-{coding}"):
+            return tag[:-len(coding) - 1]
+    return tag
+
+
+def compress(data, coding):
+    """data encoded with a coding from supported_encodings()"""
+    if coding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    # mtime=0 keeps the output stable for identical bodies
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def decompress(data, coding):
+    """
+    Decode a request body sent with Content-Encoding: coding
+
+    Raises ValueError for unsupported codings or corrupt data, and BodyTooLarge
+    for bodies that decompress to more than MAX_REQUEST_BYTES.
+    """
+    coding = (coding or "identity").strip().lower()
+    if coding == "identity":
+        return data
+    try:
+        if coding in ("gzip", "x-gzip"):
+            decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            result = decoder.decompress(data, MAX_REQUEST_BYTES + 1)
+        elif coding == "deflate":
+            decoder = zlib.decompressobj()
+            result = decoder.decompress(data, MAX_REQUEST_BYTES + 1)
+        elif coding == "zstd" and zstandard is not None:
+            with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)) as reader:
+                result = reader.read(MAX_REQUEST_BYTES + 1)
+        else:
+            raise ValueError(f"Unsupported Content-Encoding: {coding}")
+    except (zlib.error, EOFError) as e:
+        raise ValueError(f"Invalid {coding} request body: {e}")
+    except Exception as e:
+        if zstandard is not None and isinstance(e, zstandard.ZstdError):
+            raise ValueError(f"Invalid {coding} request body: {e}")
+        raise
+    if len(result) > MAX_REQUEST_BYTES:
+        raise BodyTooLarge(f"Decompressed request body exceeds {MAX_REQUEST_BYTES} bytes")
+    return result
+
+
+class DecompressRequestMiddleware:
+    """WSGI middleware decoding compressed request bodies before the application reads them"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        coding = environ.get("HTTP_CONTENT_ENCODING")
+        if coding and coding.strip().lower() != "identity":
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+            body = environ["wsgi.input"].read(length) if length else environ["wsgi.input"].read()
+            try:
+                body = decompress(body, coding)
+            except ValueError as e:
+                status = "413 Request Entity Too Large" if isinstance(e, BodyTooLarge) else "415 Unsupported Media Type"
+                message = json.dumps({"error": str(e)}).encode("utf-8")
+                start_response(status, [("Content-Type", "application/json"),
+                                        ("Content-Length", str(len(message)))])
+                return [message]
+            environ["wsgi.input"] = io.BytesIO(body)
+            environ["CONTENT_LENGTH"] = str(len(body))
+            del environ["HTTP_CONTENT_ENCODING"]
+        return self.wsgi_app(environ, start_response)
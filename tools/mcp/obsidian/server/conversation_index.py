@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Conversation Index
+Conversation notes per agent, kept ordered by the timestamp in their filenames
+so the most recent ones can be listed without walking or reading the vault
+"""
+
+import os
+import heapq
+import bisect
+import itertools
+import threading
+from note_dates import parse_note_date
+
+CONVERSATIONS_DIR = os.path.join("AI", "Memory", "Conversations")
+
+
+def conversation_agent(rel_path):
+    """Agent a vault-relative note path belongs to, or None if it is not a conversation"""
+    prefix = CONVERSATIONS_DIR + os.sep
+    if not rel_path.startswith(prefix) or not rel_path.endswith('.md'):
+        return None
+    agent, sep, _ = rel_path[len(prefix):].partition(os.sep)
+    return agent if sep else None
+
+
+def sort_key(rel_path):
+    """Newest first; notes without a date in their filename go last"""
+    date_time = parse_note_date(rel_path)
+    if date_time is None:
+        return (1, 0, rel_path)
+    return (0, -date_time.timestamp(), rel_path)
+
+
+class ConversationIndex:
+    """Per-agent lists of conversation notes sorted newest first"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = False
+        self.agents = {}  # agent -> sorted [(sort key, relative path)]
+        self.keys = {}    # relative path -> (agent, sort key)
+
+    def rebuild(self, rel_paths):
+        """Replace the index with the conversations among rel_paths"""
+        agents = {}
+        keys = {}
+        for rel_path in rel_paths:
+            agent = conversation_agent(rel_path)
+            if agent is None:
+                continue
+            key = sort_key(rel_path)
+            agents.setdefault(agent, []).append((key, rel_path))
+            keys[rel_path] = (agent, key)
+        for entries in agents.values():
+            entries.sort()
+
+        with self.lock:
+            self.agents = agents
+            self.keys = keys
+            self.ready = True
+
+    def add(self, rel_path):
+        """Add a conversation note (other paths are ignored)"""
+        agent = conversation_agent(rel_path)
+        if agent is None:
+            return
+        key = sort_key(rel_path)
+        with self.lock:
+            if rel_path in self.keys:
+                return
+            bisect.insort(self.agents.setdefault(agent, []), (key, rel_path))
+            self.keys[rel_path] = (agent, key)
+
+    def remove(self, rel_path):
+        """Drop a conversation note"""
+        with self.lock:
+            entry = self.keys.pop(rel_path, None)
+            if entry is None:
+                return
+            agent, key = entry
+            entries = self.agents[agent]
+            index = bisect.bisect_left(entries, (key, rel_path))
+            if index < len(entries) and entries[index][1] == rel_path:
+                del entries[index]
+            if not entries:
+                del self.agents[agent]
+
+    def remove_tree(self, rel_dir):
+        """Drop every conversation below a directory"""
+        prefix = rel_dir.rstrip(os.sep) + os.sep
+        with self.lock:
+            paths = [path for path in self.keys if path.startswith(prefix)]
+        for path in paths:
+            self.remove(path)
+
+    def recent(self, agent=None, limit=10):
+        """Vault-relative paths of the newest conversations of one agent, or of all agents"""
+        with self.lock:
+            if agent is not None:
+                return [path for _, path in self.agents.get(agent, [])[:limit]]
+            merged = heapq.merge(*self.agents.values())
+            return [path for _, path in itertools.islice(merged, limit)]
+
+    def stats(self):
+        """Counters for the /stats endpoint"""
+        with self.lock:
+            return {
+                "ready": self.ready,
+                "conversations": len(self.keys),
+                "agents": len(self.agents)
+            }
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Frontmatter
+Parser for the YAML frontmatter block at the top of notes
+
+Covers the subset of YAML the note templates use (scalars, quoted strings,
+inline [a, b] lists and "- item" block lists) without a YAML dependency.
+"""
+
+import re
+import datetime
+
+# Fields kept for the query index
+FRONTMATTER_FIELDS = ("title", "agent", "date", "tags", "status", "project")
+
+KEY_RE = re.compile(r"^([A-Za-z_][\w-]*)\s*:\s*(.*)$")
+
+
+def parse_scalar(value):
+    """Strip quotes and trailing comments from a scalar value"""
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if " #" in value:
+        value = value.split(" #", 1)[0].rstrip()
+    return value
+
+
+def parse_list(value):
+    """Items of an inline [a, b, "c"] list"""
+    inner = value.strip()[1:-1]
+    return [item for item in (parse_scalar(part) for part in inner.split(",")) if item]
+
+
+def parse_frontmatter(content):
+    """
+    Fields of the frontmatter block at the start of content
+
+    Returns a dict with the FRONTMATTER_FIELDS that are present ("tags" is always
+    a list), or an empty dict when the note has no frontmatter.
+    """
+    if not content.startswith("---"):
+        return {}
+    lines = content.splitlines()
+    if lines[0].strip() != "---":
+        return {}
+
+    fields = {}
+    key = None
+    for line in lines[1:]:
+        if line.strip() in ("---", "..."):
+            break
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        # "- item" lines continue a block list under the previous key
+        if stripped.startswith("- ") and key is not None:
+            if isinstance(fields.get(key), list):
+                item = parse_scalar(stripped[2:])
+                if item:
+                    fields[key].append(item)
+            continue
+        match = KEY_RE.match(line)
+        if not match:
+            key = None
+            continue
+        key, value = match.group(1).lower(), match.group(2).strip()
+        if not value:
+            fields[key] = []
+        elif value.startswith("[") and value.endswith("]"):
+            fields[key] = parse_list(value)
+        else:
+            fields[key] = parse_scalar(value)
+    else:
+        # No closing delimiter: not a frontmatter block
+        return {}
+
+    meta = {name: fields[name] for name in FRONTMATTER_FIELDS if name in fields}
+    tags = meta.get("tags", [])
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    meta["tags"] = [tag.lstrip("#") for tag in tags]
+    for name in FRONTMATTER_FIELDS:
+        # Empty block values ("key:" with no items) only make sense for tags
+        if name != "tags" and meta.get(name) == []:
+            del meta[name]
+    return meta
+
+
+def parse_date(value):
+    """datetime for a frontmatter or query date (YYYY-MM-DD with optional HH:MM), or None"""
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
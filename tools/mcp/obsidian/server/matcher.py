@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Query Matcher
+Compiled search queries with a bounded cache; plain-text queries skip the regex engine
+
+Queries that mean the same on raw UTF-8 also get a bytes pattern, so full scans can
+match memory-mapped notes without decoding them.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 256
+
+# Characters that make a query a real regular expression rather than plain text
+REGEX_META = set(".^$*+?{}[]\\|()")
+
+# Escapes that mean the same in str and bytes patterns; other letters and digits are
+# Unicode-aware classes (\w, \b, ...), code points (\x, \u, ...) or backreferences
+BYTES_SAFE_ESCAPES = set("AZfnrtv")
+
+# Non-ASCII letters that case-insensitive str matching equates with ASCII letters
+# (found by checking every code point against str.casefold() and re.IGNORECASE)
+ASCII_FOLDING_CHARS = "ßİıŉſǰẖẗẘẙẚẞKﬀﬁﬂﬃﬄﬅﬆ"
+
+OCTAL_DIGITS = set("01234567")
+
+
+def is_regex(query):
+    """Check if a query uses regex syntax"""
+    return any(char in REGEX_META for char in query)
+
+
+def ascii_letters(text):
+    """Lowercase ASCII letters in text"""
+    return {char.lower() for char in text if char.isascii() and char.isalpha()}
+
+
+def is_bytes_safe(query):
+    """
+    Check if query matches UTF-8 bytes exactly where it matches the decoded text
+
+    Needs an ASCII query without constructs that match one character of any kind
+    ("." or "[^...]"), since a non-ASCII character is several bytes.
+    """
+    if not query.isascii():
+        return False
+    escaped = False
+    for index, char in enumerate(query):
+        if escaped:
+            if char.isalnum() and char not in BYTES_SAFE_ESCAPES:
+                return False
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '.' or (char == '[' and query[index + 1:index + 2] == '^'):
+            return False
+    return True
+
+
+def required_literals(pattern):
+    """
+    Literal strings a regex match must contain, as one list per top-level alternative
+
+    Conservative: groups, classes and escapes other than escaped punctuation end
+    a literal (along with the operands of escapes such as \\x61, \\141 or \\1),
+    and a character made optional by a quantifier is dropped. Returns None for
+    verbose patterns, whose whitespace is not literal.
+    """
+    if re.search(r"\(\?[aiLmsux-]*x", pattern):
+        return None
+    branches = [[]]
+    current = []
+
+    def close():
+        if current:
+            branches[-1].append("".join(current))
+            current.clear()
+
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        index += 1
+        if char == '\\':
+            escaped = pattern[index:index + 1]
+            index += 1
+            if escaped and not escaped.isalnum():
+                current.append(escaped)
+            else:
+                close()
+                index = escape_end(pattern, index)
+        elif char in '?*{':
+            # The previous character may not occur at all
+            if current:
+                current.pop()
+            close()
+            if char == '{':
+                closing = pattern.find('}', index)
+                index = len(pattern) if closing == -1 else closing + 1
+        elif char == '+':
+            close()
+        elif char == '|':
+            close()
+            branches.append([])
+        elif char == '[':
+            close()
+            index = class_end(pattern, index)
+        elif char == '(':
+            close()
+            depth = 1
+            while index < len(pattern) and depth:
+                char = pattern[index]
+                index += 1
+                if char == '\\':
+                    index += 1
+                elif char == '[':
+                    index = class_end(pattern, index)
+                elif char == '(':
+                    depth += 1
+                elif char == ')':
+                    depth -= 1
+        elif char in '^$.)':
+            close()
+        else:
+            current.append(char)
+    close()
+    return branches
+
+
+def escape_end(pattern, index):
+    """
+    Index just past the operands of the letter or digit escape ending at index - 1:
+    hex and unicode code points, named characters, octal codes and group references
+    """
+    escaped = pattern[index - 1:index]
+    if escaped == 'x':
+        return index + 2
+    if escaped == 'u':
+        return index + 4
+    if escaped == 'U':
+        return index + 8
+    if escaped == 'N' and pattern[index:index + 1] == '{':
+        closing = pattern.find('}', index)
+        return len(pattern) if closing == -1 else closing + 1
+    if escaped == '0':
+        # \0 takes up to two more octal digits
+        for _ in range(2):
+            if pattern[index:index + 1] in OCTAL_DIGITS:
+                index += 1
+        return index
+    if escaped.isdigit():
+        # Three octal digits are a character code, otherwise up to two digits name a group
+        if escaped in OCTAL_DIGITS and len(pattern[index:index + 2]) == 2 and all(
+                digit in OCTAL_DIGITS for digit in pattern[index:index + 2]):
+            return index + 2
+        if pattern[index:index + 1].isdigit():
+            return index + 1
+    return index
+
+
+def class_end(pattern, index):
+    """Index just past the character class whose "[" is at index - 1"""
+    if pattern[index:index + 1] == '^':
+        index += 1
+    if pattern[index:index + 1] == ']':
+        index += 1
+    while index < len(pattern):
+        if pattern[index] == '\\':
+            index += 2
+            continue
+        if pattern[index] == ']':
+            return index + 1
+        index += 1
+    return index
+
+
+def contains_any(data, sequences):
+    """Check if bytes or a memory map contain any of sequences"""
+    for sequence in sequences:
+        # Searching for the lead byte uses memchr, which is far faster than a
+        # multi-byte find and usually settles it for the whole note
+        start = data.find(sequence[:1])
+        if start != -1 and data.find(sequence, start) != -1:
+            return True
+    return False
+
+
+class QueryMatcher:
+    """Case-insensitive matcher for a single query"""
+
+    def __init__(self, query):
+        self.query = query
+        self.literal = not is_regex(query)
+        if self.literal:
+            # Without metacharacters the regex is a plain substring
+            self.needle = query.casefold()
+            self.pattern = None
+            # casefold() can change string length, so match offsets come from re
+            self.span_pattern = re.compile(re.escape(query), re.IGNORECASE)
+        else:
+            self.needle = None
+            self.pattern = self.span_pattern = re.compile(query, re.IGNORECASE)
+
+        self.byte_pattern = None
+        self.byte_needle = None
+        self.decode_sequences = ()
+        if is_bytes_safe(query):
+            source = query.encode('ascii')
+            if self.literal:
+                self.byte_needle = source.lower()
+            try:
+                self.byte_pattern = re.compile(re.escape(source) if self.literal else source, re.IGNORECASE)
+            except re.error:
+                pass  # e.g. (?u), which bytes patterns reject
+            # Sequences whose presence means a note must be decoded to match it exactly;
+            # a character class can cover letters the pattern does not spell out
+            letters = set("abcdefghijklmnopqrstuvwxyz") if '[' in query else ascii_letters(query)
+            self.decode_sequences = (b'\r',) + tuple(
+                char.encode('utf-8') for char in ASCII_FOLDING_CHARS
+                if ascii_letters(char.casefold() + char.lower() + char.upper()) & letters)
+
+    def search(self, text):
+        """Check if the query matches anywhere in text"""
+        if self.literal:
+            return self.needle in text.casefold()
+        return self.pattern.search(text) is not None
+
+    def spans(self, text):
+        """Yield (start, end) of each non-empty match in text"""
+        for match in self.span_pattern.finditer(text):
+            if match.end() > match.start():
+                yield match.span()
+
+    def bytes_decidable(self, data):
+        """
+        Check if matching the raw UTF-8 data with byte_pattern gives the same
+        result and spans as matching its decoded text
+
+        Not when the note has carriage returns (text mode reads them as newlines)
+        or letters that case folding equates with the query's ASCII letters.
+        """
+        return self.byte_pattern is not None and not contains_any(data, self.decode_sequences)
+
+    def search_bytes(self, data):
+        """Check if byte_pattern matches anywhere in data (bytes or a memory map)"""
+        if self.byte_needle is not None and isinstance(data, bytes):
+            # ASCII lowercasing a small note beats a case-insensitive regex scan
+            return self.byte_needle in data.lower()
+        return self.byte_pattern.search(data) is not None
+
+    def byte_spans(self, data):
+        """Yield (start, end) byte offsets of each non-empty byte_pattern match in data"""
+        for match in self.byte_pattern.finditer(data):
+            if match.end() > match.start():
+                yield match.span()
+
+
+class MatcherCache:
+    """LRU cache of QueryMatcher objects keyed by query string"""
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.matchers = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query):
+        """Return the matcher for a query, compiling it on first use (raises re.error)"""
+        with self.lock:
+            matcher = self.matchers.get(query)
+            if matcher is not None:
+                self.matchers.move_to_end(query)
+                self.hits += 1
+                return matcher
+            self.misses += 1
+
+        matcher = QueryMatcher(query)
+        with self.lock:
+            self.matchers[query] = matcher
+            if len(self.matchers) > self.max_size:
+                self.matchers.popitem(last=False)
+        return matcher
+
+    def stats(self):
+        """Counters for the /stats endpoint"""
+        with self.lock:
+            return {
+                "entries": len(self.matchers),
+                "max_entries": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+matcher_cache = MatcherCache()
+
+
+def get_matcher(query):
+    """Shared compiled matcher for a query"""
+    return matcher_cache.get(query)
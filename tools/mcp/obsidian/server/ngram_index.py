@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+N-gram Index
+Trigrams of the search index vocabulary: typo-tolerant lookup of indexed words,
+and the words containing a fragment, which narrows regex scans to the notes that
+can match
+"""
+
+import re
+
+NGRAM = 3
+PADDING = "  "  # words are padded so short words and their first and last letters get trigrams
+
+# Typo tolerance by word length, like "AUTO" fuzziness elsewhere: exact below 3 letters,
+# one edit up to 5 letters, two edits beyond
+AUTO_EDITS = ((3, 0), (6, 1))
+MAX_EDITS = 2
+# Fuzzy matches considered per query word, most similar first
+MAX_EXPANSIONS = 50
+
+# Word characters whose matching is the same for the regex engine and the index
+ASCII_WORD_RE = re.compile(r"[A-Za-z0-9_]{%d,}" % NGRAM)
+
+
+def fold(term):
+    """
+    Case-folded form of an indexed word for substring checks
+
+    Unlike lower() it maps the few letters that case-insensitive regexes equate
+    with ASCII letters (the long s, the Kelvin sign, dotted and dotless i) onto them.
+    """
+    return term.casefold().replace("i̇", "i").replace("ı", "i")
+
+
+def ngrams(text):
+    """Set of trigrams of text"""
+    return {text[index:index + NGRAM] for index in range(len(text) - NGRAM + 1)}
+
+
+def auto_edits(word):
+    """Edits tolerated for a query word of this length"""
+    for length, edits in AUTO_EDITS:
+        if len(word) < length:
+            return edits
+    return MAX_EDITS
+
+
+def edit_distance(a, b, limit):
+    """
+    Edits (insertions, deletions, substitutions, adjacent transpositions) turning
+    a into b, or limit + 1 once it is certain to exceed limit
+
+    Only cells within limit of the diagonal can stay within limit, so each row
+    computes just that band of the part between the shared prefix and suffix.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # A shared prefix or suffix costs nothing; identifiers often differ in a few characters only
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+    over = limit + 1
+    previous2 = None
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        low = max(1, i - limit)
+        high = min(len(b), i + limit)
+        row_min = current[0]
+        for j in range(low, high + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous2, previous = previous, current
+    return min(previous[-1], over)
+
+
+class NgramIndex:
+    """Trigram -> words map over a vocabulary of lowercase words; callers provide locking"""
+
+    def __init__(self):
+        self.grams = {}  # trigram -> set of words
+
+    def add(self, word):
+        for gram in ngrams(PADDING + fold(word) + PADDING):
+            self.grams.setdefault(gram, set()).add(word)
+
+    def remove(self, word):
+        for gram in ngrams(PADDING + fold(word) + PADDING):
+            words = self.grams.get(gram)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self.grams[gram]
+
+    def clear(self):
+        self.grams.clear()
+
+    def similar(self, word, max_edits=None):
+        """
+        [(indexed word, similarity)] within max_edits of word (auto by length when
+        None), most similar first; similarity is 1 - edits / length of the longer word
+        """
+        word = word.lower()
+        if max_edits is None:
+            max_edits = auto_edits(word)
+        word_grams = ngrams(PADDING + fold(word) + PADDING)
+        # An edit changes at most NGRAM trigrams (NGRAM + 1 for a transposition), so
+        # words within max_edits share at least this many
+        needed = max(1, len(word_grams) - (NGRAM + 1) * max_edits)
+        shared = {}
+        for gram in word_grams:
+            for candidate in self.grams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        matches = []
+        for candidate, count in shared.items():
+            if count < needed:
+                continue
+            edits = edit_distance(word, candidate, max_edits)
+            if edits <= max_edits:
+                matches.append((candidate, 1 - edits / max(len(word), len(candidate))))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:MAX_EXPANSIONS]
+
+    def containing(self, fragment):
+        """Indexed words containing fragment (at least NGRAM characters), compared case-folded"""
+        fragment = fold(fragment)
+        grams = sorted((self.grams.get(gram, set()) for gram in ngrams(fragment)), key=len)
+        if not grams or not grams[0]:
+            return set()
+        words = set(grams[0])
+        for other in grams[1:]:
+            words.intersection_update(other)
+            if not words:
+                return words
+        return {word for word in words if fragment in fold(word)}
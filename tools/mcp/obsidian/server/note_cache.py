@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Note Cache
+Byte-bounded LRU cache of decoded note content, validated against os.stat on every lookup
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class NoteCache:
+    """LRU cache mapping absolute path -> note content"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # path -> (signature, content, size)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def signature(stat):
+        """Identity of a file version: a rewrite or replacement changes at least one field"""
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def read(self, path):
+        """Return the content of a note, from memory when the file is unchanged"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = self.signature(stat)
+
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        self.put(path, signature, content, stat.st_size)
+        return content
+
+    def put(self, path, signature, content, size):
+        """Store a note, evicting least recently used entries to stay within max_bytes"""
+        with self.lock:
+            self._discard(path)
+            if size > self.max_bytes:
+                return
+            self.entries[path] = (signature, content, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, path):
+        """Drop a note from the cache"""
+        with self.lock:
+            self._discard(os.path.abspath(path))
+
+    def invalidate_tree(self, directory):
+        """Drop every note below a directory"""
+        prefix = os.path.abspath(directory) + os.sep
+        with self.lock:
+            for path in [path for path in self.entries if path.startswith(prefix)]:
+                self._discard(path)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def _discard(self, path):
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def stats(self):
+        """Counters for the /stats endpoint"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Note Dates
+Timestamps encoded in note filenames (YYYYMMDD-Topic.md or YYYYMMDD-HHMM-Topic.md)
+"""
+
+import os
+import datetime
+
+
+def parse_note_date(path):
+    """Return the datetime encoded in a note's filename, or None if it has none"""
+    parts = os.path.basename(path).split("-")
+    if len(parts) < 2:
+        return None
+    
+    try:
+        date_time = datetime.datetime.strptime(parts[0], "%Y%m%d")
+    except ValueError:
+        return None
+    
+    # YYYYMMDD-HHMM-Topic.md carries a time of day as well
+    if len(parts) >= 3 and len(parts[1]) == 4 and parts[1].isdigit():
+        try:
+            time_obj = datetime.datetime.strptime(parts[1], "%H%M").time()
+            date_time = datetime.datetime.combine(date_time.date(), time_obj)
+        except ValueError:
+            pass
+    
+    return date_time
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Note Sections
+Locating and patching the Markdown sections of a note, so one section can be
+changed without sending the whole note back and forth
+"""
+
+import re
+
+# ATX headings ("## Title", optionally closed by "##")
+HEADING_RE = re.compile(r"^(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+FENCE_RE = re.compile(r"^[ \t]*(```|~~~)")
+
+PATCH_OPERATIONS = ("replace", "append", "prepend")
+
+
+def parse_heading(heading):
+    """(level, title) of "## Actions", or (None, title) for a bare "Actions" matching any level"""
+    match = HEADING_RE.match(heading.strip())
+    if match:
+        return len(match.group(1)), (match.group(2) or "").strip()
+    return None, heading.strip()
+
+
+def body_start(lines):
+    """Index of the first line after the frontmatter block (whose "#" lines are YAML comments)"""
+    if not lines or lines[0].strip() != "---":
+        return 0
+    for index in range(1, len(lines)):
+        if lines[index].strip() in ("---", "..."):
+            return index + 1
+    return 0
+
+
+def find_section(lines, heading):
+    """
+    (heading line, end) indexes of the first section titled heading, or None
+
+    Titles are compared case-insensitively. The section ends at the next heading
+    of the same or a higher level; headings inside code fences are ignored.
+    """
+    level, title = parse_heading(heading)
+    title = title.lower()
+    fence = None
+    start = None
+    start_level = None
+    for index in range(body_start(lines), len(lines)):
+        line = lines[index].rstrip("\r\n")
+        fence_match = FENCE_RE.match(line)
+        if fence_match:
+            if fence is None:
+                fence = fence_match.group(1)
+            elif fence == fence_match.group(1):
+                fence = None
+            continue
+        if fence is not None:
+            continue
+        match = HEADING_RE.match(line)
+        if not match:
+            continue
+        line_level = len(match.group(1))
+        if start is not None:
+            if line_level <= start_level:
+                return start, index
+        elif (match.group(2) or "").strip().lower() == title and level in (None, line_level):
+            start, start_level = index, line_level
+    if start is not None:
+        return start, len(lines)
+    return None
+
+
+def patch_section(content, heading, text, operation="replace"):
+    """
+    content with the body of a section replaced, appended to or prepended to
+
+    The heading line and the blank lines separating the section from the next
+    one are kept. Returns None if the note has no such section.
+    """
+    if operation not in PATCH_OPERATIONS:
+        raise ValueError(f"operation must be one of: {', '.join(PATCH_OPERATIONS)}")
+    lines = content.splitlines(keepends=True)
+    found = find_section(lines, heading)
+    if found is None:
+        return None
+    start, end = found
+
+    newline = "\r\n" if lines[start].endswith("\r\n") else "\n"
+    heading_line = lines[start] if lines[start].endswith("\n") else lines[start] + newline
+    body = lines[start + 1:end]
+    spacing = len(body)
+    while spacing > 0 and not body[spacing - 1].strip():
+        spacing -= 1
+    body, trailing = body[:spacing], body[spacing:]
+
+    if text and not text.endswith("\n"):
+        text += newline
+    if operation == "replace":
+        new_body = [text]
+    elif operation == "append":
+        if body and not body[-1].endswith("\n"):
+            body[-1] += newline
+        new_body = body + [text]
+    else:
+        new_body = [text] + body
+    return "".join(lines[:start] + [heading_line] + new_body + trailing + lines[end:])
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Note Writer
+Atomic, durable note writes
+
+Each write or update goes to a temporary file in the target directory which
+then replaces the note with os.replace, so readers see either the old or the
+new note and never a truncated one; appends only write the new text. Changes to
+the same path are serialized, across the threads of a process and, through
+locked files next to the journal, across server processes. fsync calls from concurrent writers are batched
+into group commits. A small journal records writes whose index and cache
+updates have not been applied yet, so they can be replayed after a crash.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import zlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows, where the server runs as a single process
+
+SYNC_MODES = ("none", "fsync", "group")
+DEFAULT_SYNC_MODE = "group"
+DEFAULT_GROUP_WINDOW = 0.002  # seconds a group commit leader waits for other writers
+DEFAULT_BATCH_WORKERS = 8
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+JOURNAL_RE = re.compile(r"^write_journal\.(\d+)\.log$")
+# Notes hash onto this many lock files shared by all server processes
+LOCK_FILES = 256
+
+
+def temp_path(full_path):
+    """Hidden, non-markdown temporary file next to a note, ignored by the indexes and watcher"""
+    directory, name = os.path.split(full_path)
+    return os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+
+
+def fsync_directory(directory):
+    """Persist a rename in a directory (not supported on Windows)"""
+    if os.name == 'nt':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def process_alive(pid):
+    """Check if another process with this PID is running"""
+    if os.name == 'nt':
+        # os.kill would terminate it; the Windows server runs as a single process anyway
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _Batch:
+    def __init__(self):
+        self.led = False
+        self.fds = set()
+        self.directories = set()
+        self.done = threading.Event()
+        self.error = None
+
+
+class GroupCommit:
+    """
+    Batches fsync calls from concurrent writers
+
+    The first writer to join a batch leads it: if other writes are in flight it
+    waits a short window for them to join, then syncs every file and directory
+    in the batch once while the others wait for the result.
+    """
+
+    def __init__(self, window=DEFAULT_GROUP_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.batch = _Batch()
+        self.active = 0  # writers between begin() and end()
+        self.commits = 0
+        self.requests = 0
+
+    def begin(self):
+        with self.lock:
+            self.active += 1
+
+    def end(self):
+        with self.lock:
+            self.active -= 1
+
+    def sync(self, fds=(), directory=None):
+        """Return once fds and directory are durable (raises OSError if syncing failed)"""
+        with self.lock:
+            batch = self.batch
+            batch.fds.update(fds)
+            if directory is not None:
+                batch.directories.add(directory)
+            leader = not batch.led
+            batch.led = True
+            wait = self.active > 1
+            self.requests += 1
+
+        if not leader:
+            batch.done.wait()
+            if batch.error:
+                raise batch.error
+            return
+
+        if wait:
+            time.sleep(self.window)
+        with self.lock:
+            # Later writers start a new batch
+            self.batch = _Batch()
+            self.commits += 1
+        try:
+            for batch_fd in batch.fds:
+                os.fsync(batch_fd)
+            for batch_directory in batch.directories:
+                fsync_directory(batch_directory)
+        except OSError as e:
+            batch.error = e
+        finally:
+            batch.done.set()
+        if batch.error:
+            raise batch.error
+
+
+class WriteJournal:
+    """
+    Append-only log of writes whose index updates are pending
+
+    A "begin" record is written before a note is replaced and a "done" record
+    once the indexes and cache have been updated. Each server process keeps its
+    own journal; writes begun but not done by a process that is gone are
+    replayed at startup.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.journal_file = os.path.join(directory, f"write_journal.{os.getpid()}.log")
+        self.lock = threading.Lock()
+        self.file = None
+        self.next_id = 0
+        self.pending = set()
+
+    def open(self):
+        """Start this process's journal and return the vault-relative paths of unfinished writes"""
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            unfinished = set()
+            for name in os.listdir(self.directory):
+                match = JOURNAL_RE.match(name)
+                if not match:
+                    continue
+                pid = int(match.group(1))
+                if pid != os.getpid() and process_alive(pid):
+                    continue
+                unfinished.update(self._read_unfinished(os.path.join(self.directory, name)))
+            self.file = open(self.journal_file, 'w', encoding='utf-8')
+            self.next_id = 0
+            self.pending = set()
+            return sorted(unfinished)
+
+    def _read_unfinished(self, journal_file):
+        begun = {}
+        try:
+            with open(journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # torn final record from a crash
+                    if record.get("op") == "begin":
+                        begun[record["id"]] = record["path"]
+                    elif record.get("op") == "done":
+                        begun.pop(record["id"], None)
+            os.remove(journal_file)
+        except OSError as e:
+            print(f"Error reading write journal {journal_file}: {e}")
+        return begun.values()
+
+    def close(self):
+        """Close and remove the journal after a clean shutdown"""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+                if not self.pending:
+                    os.remove(self.journal_file)
+
+    def _append(self, record):
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def begin(self, rel_path):
+        """Record a write that is about to happen; returns its ID, or None when the journal is closed"""
+        with self.lock:
+            if self.file is None:
+                return None
+            record_id = self.next_id
+            self.next_id += 1
+            self.pending.add(record_id)
+            self._append({"op": "begin", "id": record_id, "path": rel_path})
+            return record_id
+
+    def done(self, record_id):
+        """Record that a write's index and cache updates have been applied"""
+        if record_id is None:
+            return
+        with self.lock:
+            if self.file is None:
+                return
+            self.pending.discard(record_id)
+            self._append({"op": "done", "id": record_id})
+            # Nothing in flight: the journal can start over
+            if not self.pending and self.file.tell() > JOURNAL_COMPACT_BYTES:
+                self.file.seek(0)
+                self.file.truncate()
+
+    def fileno(self):
+        with self.lock:
+            return self.file.fileno() if self.file is not None else None
+
+
+class NoteWriter:
+    """Atomic note writes with per-path locking, group commit and a write journal"""
+
+    def __init__(self, sync_mode=DEFAULT_SYNC_MODE, journal_dir=None, window=DEFAULT_GROUP_WINDOW):
+        if sync_mode not in SYNC_MODES:
+            raise ValueError(f"sync mode must be one of: {', '.join(SYNC_MODES)}")
+        self.sync_mode = sync_mode
+        self.group = GroupCommit(window)
+        self.journal = WriteJournal(journal_dir) if journal_dir else None
+        # gunicorn workers share the journal directory, so their lock files meet there
+        self.lock_dir = os.path.join(journal_dir, "locks") if journal_dir and fcntl is not None else None
+        self.locks_lock = threading.Lock()
+        self.path_locks = {}  # full path -> [lock, users, lock file descriptor]
+        self.writes = 0
+
+    def _lock_path(self, full_path):
+        with self.locks_lock:
+            entry = self.path_locks.get(full_path)
+            if entry is None:
+                entry = self.path_locks[full_path] = [threading.Lock(), 0, None]
+            entry[1] += 1
+        entry[0].acquire()
+        try:
+            entry[2] = self._lock_file(full_path)
+        except BaseException:
+            self._unlock_path(full_path, entry)
+            raise
+        return entry
+
+    def _unlock_path(self, full_path, entry):
+        fd, entry[2] = entry[2], None
+        if fd is not None:
+            os.close(fd)  # releases the flock
+        entry[0].release()
+        with self.locks_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.path_locks[full_path]
+
+    def _lock_file(self, full_path):
+        """Exclusively lock the file guarding full_path in other processes; returns its descriptor or None"""
+        if self.lock_dir is None:
+            return None
+        os.makedirs(self.lock_dir, exist_ok=True)
+        stripe = zlib.crc32(full_path.encode('utf-8', 'surrogateescape')) % LOCK_FILES
+        fd = os.open(os.path.join(self.lock_dir, f"{stripe:03d}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def _sync(self, fds=(), directory=None):
+        if self.sync_mode == "group":
+            self.group.sync(fds=fds, directory=directory)
+        elif self.sync_mode == "fsync":
+            for fd in fds:
+                os.fsync(fd)
+            if directory is not None:
+                fsync_directory(directory)
+
+    def _journal_fd(self):
+        fd = self.journal.fileno() if self.journal else None
+        return [fd] if fd is not None else []
+
+    def write(self, full_path, content, rel_path=None, apply=None):
+        """
+        Atomically replace full_path with content and return its stat
+
+        apply() is called after the note is in place, still holding the path lock,
+        so index and cache updates for one path happen in write order. The write
+        is journaled under rel_path until apply() returns.
+        """
+        full_path = os.path.abspath(full_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        entry = self._lock_path(full_path)
+        self.group.begin()
+        try:
+            stat, record_id = self._replace(full_path, content, rel_path)
+            if apply is not None:
+                apply()
+            if self.journal:
+                self.journal.done(record_id)
+            return stat
+        finally:
+            self.group.end()
+            self._unlock_path(full_path, entry)
+
+    def update(self, full_path, transform, rel_path=None, apply=None):
+        """
+        Atomically replace full_path with transform(current content)
+
+        current is None if the note does not exist. transform runs under the path
+        lock, which other server processes sharing the journal directory honor too,
+        so concurrent updates of one note never lose each other's changes (edits
+        made outside the server are not locked out); an exception it raises aborts
+        the update. Returns the new content.
+        """
+        full_path = os.path.abspath(full_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        entry = self._lock_path(full_path)
+        self.group.begin()
+        try:
+            try:
+                with open(full_path, 'r', encoding='utf-8', newline='') as f:
+                    current = f.read()
+            except FileNotFoundError:
+                current = None
+            content = transform(current)
+            _, record_id = self._replace(full_path, content, rel_path)
+            if apply is not None:
+                apply()
+            if self.journal:
+                self.journal.done(record_id)
+            return content
+        finally:
+            self.group.end()
+            self._unlock_path(full_path, entry)
+
+    def _replace(self, full_path, content, rel_path):
+        """Swap in the new content of a locked note; returns its stat and journal record ID"""
+        record_id = self.journal.begin(rel_path or full_path) if self.journal else None
+        tmp_path = temp_path(full_path)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(content)
+                f.flush()
+                # The data and the journal record must be on disk before the rename
+                self._sync(fds=[f.fileno()] + self._journal_fd())
+                stat = os.fstat(f.fileno())
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._sync(directory=os.path.dirname(full_path))
+        self.writes += 1
+        return stat, record_id
+
+    def write_batch(self, items, apply=None, workers=DEFAULT_BATCH_WORKERS):
+        """
+        Atomically write many (full_path, content, rel_path) notes with a pool of workers
+
+        Concurrent writes share group commits; items for the same path are written
+        in order. apply(written) is called once afterwards with (full_path, content,
+        stat) for every note written, and the writes stay journaled until it
+        returns. Returns the stat of each written note, or the exception that
+        stopped it.
+        """
+        paths = {}
+        for index, (full_path, _, _) in enumerate(items):
+            paths.setdefault(os.path.abspath(full_path), []).append(index)
+        results = [None] * len(items)
+        record_ids = []
+
+        def run(indexes):
+            for index in indexes:
+                full_path, content, rel_path = items[index]
+                full_path = os.path.abspath(full_path)
+                try:
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    entry = self._lock_path(full_path)
+                    self.group.begin()
+                    try:
+                        results[index], record_id = self._replace(full_path, content, rel_path)
+                        record_ids.append(record_id)
+                    finally:
+                        self.group.end()
+                        self._unlock_path(full_path, entry)
+                except Exception as e:
+                    results[index] = e
+
+        if paths:
+            with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+                list(executor.map(run, paths.values()))
+
+        if apply is not None:
+            apply([(items[index][0], items[index][1], result) for index, result in enumerate(results)
+                   if not isinstance(result, Exception)])
+        if self.journal:
+            for record_id in record_ids:
+                self.journal.done(record_id)
+        return results
+
+    def append(self, full_path, content, rel_path=None, apply=None):
+        """
+        Append content to full_path, creating it if it does not exist
+
+        Only the new text is written, in place; a newline is added first if the
+        note does not end with one. apply() and journaling work as for write().
+        Returns the size of the note after the append.
+        """
+        full_path = os.path.abspath(full_path)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+
+        entry = self._lock_path(full_path)
+        self.group.begin()
+        try:
+            record_id = self.journal.begin(rel_path or full_path) if self.journal else None
+            with open(full_path, 'a+b') as f:
+                size = f.tell()
+                created = size == 0
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        content = "\n" + content
+                f.write(content.encode('utf-8'))
+                f.flush()
+                self._sync(fds=[f.fileno()] + self._journal_fd())
+                size = f.tell()
+            if created:
+                self._sync(directory=directory)
+            self.writes += 1
+            if apply is not None:
+                apply()
+            if self.journal:
+                self.journal.done(record_id)
+            return size
+        finally:
+            self.group.end()
+            self._unlock_path(full_path, entry)
+
+    def stats(self):
+        """Counters for the /stats endpoint"""
+        return {
+            "sync_mode": self.sync_mode,
+            "writes": self.writes,
+            "sync_requests": self.group.requests,
+            "group_commits": self.group.commits
+        }
+
+
+def remove_temp_files(root):
+    """Delete temporary files left behind by writes interrupted by a crash"""
+    removed = 0
+    for directory, _, files in os.walk(root):
+        for file in files:
+            if file.startswith('.') and file.endswith('.tmp') and '.md.' in file:
+                try:
+                    os.remove(os.path.join(directory, file))
+                    removed += 1
+                except OSError:
+                    pass
+    return removed
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Query Index
+Columnar index over note frontmatter: one value -> notes map per field plus a
+date-ordered column, so structured filters (tag, agent, status, project, date
+range) are set intersections instead of full-text scans
+"""
+
+import os
+import bisect
+import threading
+from frontmatter import parse_date
+
+# Frontmatter fields that can be filtered by value (matched case-insensitively)
+VALUE_FIELDS = ("agent", "status", "project", "tags")
+
+# Sorts after any path, so (timestamp, MAX_PATH) bounds every note at that timestamp
+MAX_PATH = chr(0x10FFFF)
+
+
+def field_values(meta, field):
+    """Lowercased values of a field (tags are a list, the rest single strings)"""
+    value = meta.get(field)
+    if value is None:
+        return []
+    values = value if isinstance(value, list) else [value]
+    return [str(item).lower() for item in values if str(item)]
+
+
+class QueryIndex:
+    """Frontmatter of every note, indexed column by column"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = False
+        self._reset()
+
+    def _reset(self):
+        self.meta = {}  # relative path -> frontmatter fields
+        self.columns = {field: {} for field in VALUE_FIELDS}  # field -> value -> {paths}
+        self.dates = []  # sorted [(timestamp, relative path)] for notes with a valid date
+
+    def rebuild(self, entries):
+        """Replace the index with (relative path, frontmatter) entries"""
+        with self.lock:
+            self._reset()
+            for rel_path, meta in entries:
+                self._add(rel_path, meta, sort_dates=False)
+            self.dates.sort()
+            self.ready = True
+
+    def update(self, rel_path, meta):
+        """Index the frontmatter of a note that was created or changed (None drops it)"""
+        with self.lock:
+            self._remove(rel_path)
+            if meta:
+                self._add(rel_path, meta)
+
+    def remove(self, rel_path):
+        """Drop a removed note"""
+        with self.lock:
+            self._remove(rel_path)
+
+    def remove_tree(self, rel_dir):
+        """Drop every note below a directory"""
+        prefix = rel_dir.rstrip(os.sep) + os.sep
+        with self.lock:
+            for rel_path in [path for path in self.meta if path.startswith(prefix)]:
+                self._remove(rel_path)
+
+    def _add(self, rel_path, meta, sort_dates=True):
+        self.meta[rel_path] = meta
+        for field in VALUE_FIELDS:
+            for value in field_values(meta, field):
+                self.columns[field].setdefault(value, set()).add(rel_path)
+        date_time = parse_date(meta.get("date"))
+        if date_time is not None:
+            entry = (date_time.timestamp(), rel_path)
+            if sort_dates:
+                bisect.insort(self.dates, entry)
+            else:
+                self.dates.append(entry)
+
+    def _remove(self, rel_path):
+        meta = self.meta.pop(rel_path, None)
+        if meta is None:
+            return
+        for field in VALUE_FIELDS:
+            column = self.columns[field]
+            for value in field_values(meta, field):
+                paths = column.get(value)
+                if paths is not None:
+                    paths.discard(rel_path)
+                    if not paths:
+                        del column[value]
+        date_time = parse_date(meta.get("date"))
+        if date_time is not None:
+            entry = (date_time.timestamp(), rel_path)
+            index = bisect.bisect_left(self.dates, entry)
+            if index < len(self.dates) and self.dates[index] == entry:
+                del self.dates[index]
+
+    def query(self, filters, date_from=None, date_to=None, prefix=None):
+        """
+        Notes matching every filter, newest first
+
+        filters maps a field in VALUE_FIELDS to the values it must have (for tags,
+        every listed tag). date_from/date_to are inclusive bounds on the frontmatter
+        date. Returns [{"path", ...frontmatter}].
+        """
+        with self.lock:
+            candidates = []
+            for field, values in filters.items():
+                for value in values:
+                    candidates.append(self.columns[field].get(value.lower(), set()))
+            if date_from is not None or date_to is not None:
+                start = bisect.bisect_left(self.dates, (date_from.timestamp(),)) if date_from else 0
+                end = bisect.bisect_right(self.dates, (date_to.timestamp(), MAX_PATH)) if date_to else len(self.dates)
+                candidates.append({path for _, path in self.dates[start:end]})
+
+            if candidates:
+                # Intersect starting from the most selective column
+                candidates.sort(key=len)
+                paths = set(candidates[0])
+                for other in candidates[1:]:
+                    paths &= other
+                    if not paths:
+                        break
+            else:
+                paths = set(self.meta)
+
+            if prefix:
+                paths = {path for path in paths if path.startswith(prefix)}
+
+            results = [dict(self.meta[path], path=path) for path in paths]
+
+        # Newest first by frontmatter date; undated notes last, then by path
+        def order(result):
+            date_time = parse_date(result.get("date"))
+            return (date_time is None, -date_time.timestamp() if date_time else 0, result["path"])
+
+        results.sort(key=order)
+        return results
+
+    def stats(self):
+        """Counters for the /stats endpoint"""
+        with self.lock:
+            return {
+                "ready": self.ready,
+                "notes": len(self.meta),
+                "tags": len(self.columns["tags"])
+            }
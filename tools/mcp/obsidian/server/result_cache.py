@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Search Result Cache
+Byte-bounded cache of finished /search results keyed by query and options, valid
+for one vault generation. Eviction is cost-aware (GreedyDual-Size): results that
+took long to compute for their size stay longest, cheap or bulky ones go first.
+"""
+
+import heapq
+import itertools
+import threading
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+ENTRY_OVERHEAD = 200  # rough bytes of bookkeeping per entry and per hit
+
+
+def result_size(hits):
+    """Rough memory footprint of a list of search hits (paths or {"path", "snippets"} objects)"""
+    size = ENTRY_OVERHEAD
+    for hit in hits:
+        if isinstance(hit, str):
+            size += len(hit) + ENTRY_OVERHEAD
+        else:
+            size += len(hit["path"]) + ENTRY_OVERHEAD
+            size += sum(len(snippet["text"]) + ENTRY_OVERHEAD for snippet in hit["snippets"])
+    return size
+
+
+class SearchResultCache:
+    """Cache mapping search options -> (hits, next_offset) for the current vault generation"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = {}  # key -> [priority, result, size, cost]
+        self.heap = []  # (priority, order, key); superseded items are skipped when popped
+        self.order = itertools.count()
+        self.generation = None
+        self.inflation = 0.0  # priority of the last eviction, so old entries age out
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+
+    def get(self, key, generation):
+        """Cached result for key computed at generation, or None"""
+        with self.lock:
+            self._advance(generation)
+            entry = self.entries.get(key) if generation == self.generation else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += entry[3]
+            self._prioritize(key, entry)
+            return entry[1]
+
+    def put(self, key, generation, result, cost):
+        """Store a result computed at generation in cost seconds"""
+        size = result_size(result[0])
+        with self.lock:
+            self._advance(generation)
+            # A result from before the latest change is already stale
+            if generation != self.generation or size > self.max_bytes:
+                return
+            self._discard(key)
+            entry = [0.0, result, size, cost]
+            self.entries[key] = entry
+            self.current_bytes += size
+            self._prioritize(key, entry)
+            while self.current_bytes > self.max_bytes:
+                self._evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.heap.clear()
+            self.current_bytes = 0
+
+    def _advance(self, generation):
+        """Drop every entry once a newer generation is seen"""
+        if self.generation is None or generation > self.generation:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+            self.heap.clear()
+            self.current_bytes = 0
+            self.inflation = 0.0
+            self.generation = generation
+
+    def _prioritize(self, key, entry):
+        entry[0] = self.inflation + max(entry[3], 1e-6) / entry[2]
+        heapq.heappush(self.heap, (entry[0], next(self.order), key))
+        # Each hit leaves a superseded heap item behind; rebuild before they pile up
+        if len(self.heap) > 4 * len(self.entries) + 64:
+            self.heap = [(entry[0], next(self.order), key) for key, entry in self.entries.items()]
+            heapq.heapify(self.heap)
+
+    def _evict(self):
+        while self.heap:
+            priority, _, key = heapq.heappop(self.heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == priority:
+                self.inflation = priority
+                self._discard(key)
+                self.evictions += 1
+                return
+
+    def _discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def stats(self):
+        """Counters for the /stats endpoint"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3)
+            }
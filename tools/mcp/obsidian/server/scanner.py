@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Scan Engine
+Full-content search over the vault, sharded across a process pool so cold regex
+searches use every core. Shards are yielded in order as soon as each is done, so
+a scan returns the same matches in the same order every time (and pages built
+from it neither overlap nor skip notes), and scanning stops once a result limit
+is reached.
+
+Queries that can be matched on raw UTF-8 are run over the note's bytes, with large
+notes memory-mapped, so a broad search neither decodes nor copies whole notes;
+only the lines around requested snippets are decoded.
+"""
+
+import os
+import mmap
+import threading
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from matcher import QueryMatcher
+from snippets import find_snippets, find_byte_snippets
+
+DEFAULT_CHUNK_SIZE = 64  # files per task; smaller chunks stream sooner and stop earlier
+MIN_PARALLEL_FILES = 256  # below this a pool costs more than it saves
+# Notes at least this large are memory-mapped rather than read (0 never maps them)
+MMAP_MIN_BYTES = int(os.environ.get("OBSIDIAN_MMAP_MIN_BYTES", 256 * 1024))
+
+# Per-process matcher cache for pool workers (each worker is single threaded)
+_worker_matchers = {}
+
+
+def list_notes(memory_path):
+    """All markdown notes below memory_path, in a stable (name-sorted walk) order"""
+    paths = []
+    for root, dirs, files in os.walk(memory_path):
+        dirs.sort()
+        for file in sorted(files):
+            if file.endswith('.md'):
+                paths.append(os.path.join(root, file))
+    return paths
+
+
+@contextmanager
+def note_bytes(file_path):
+    """Raw content of a note: a read-only memory map for large notes, otherwise bytes"""
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not MMAP_MIN_BYTES or size < MMAP_MIN_BYTES:
+            yield f.read()
+            return
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapping.madvise(mmap.MADV_SEQUENTIAL)
+            yield mapping
+        finally:
+            mapping.close()
+
+
+def match_content(file_path, matcher, name_matches, snippets=0, context_lines=0):
+    """
+    (matched, snippets) for the content of one note
+
+    Matched on the raw bytes when the matcher allows it and the note has nothing
+    that could make that differ from matching the text; otherwise decoded in full.
+    """
+    if matcher.byte_pattern is not None:
+        with note_bytes(file_path) as data:
+            matched = name_matches or matcher.search_bytes(data)
+            # A plain-text query found in the bytes is certainly in the text
+            if matched and matcher.literal and not snippets:
+                return True, None
+            if matcher.bytes_decidable(data):
+                found = find_byte_snippets(data, matcher.byte_spans(data), snippets, context_lines) \
+                    if matched and snippets else None
+                return matched, found
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if name_matches or matcher.search(content):
+        return True, find_snippets(content, matcher.spans(content), snippets, context_lines) if snippets else None
+    return False, None
+
+
+def scan_files(vault_path, paths, query, snippets=0, context_lines=0):
+    """
+    Match a query against the filename and content of each file
+
+    Runs inside pool workers. Returns (matches, errors) where matches are
+    (vault-relative path, snippets) pairs in input order; snippets is None
+    unless requested, in which case they are taken from the content already in hand.
+    """
+    matcher = _worker_matchers.get(query)
+    if matcher is None:
+        matcher = _worker_matchers[query] = QueryMatcher(query)
+
+    matches = []
+    errors = []
+    for file_path in paths:
+        try:
+            name_matches = matcher.search(os.path.basename(file_path))
+            if name_matches and not snippets:
+                matches.append((os.path.relpath(file_path, vault_path), None))
+                continue
+            matched, found = match_content(file_path, matcher, name_matches, snippets, context_lines)
+            if matched:
+                matches.append((os.path.relpath(file_path, vault_path), found))
+        except Exception as e:
+            errors.append(f"Error reading {file_path}: {e}")
+    return matches, errors
+
+
+class ScanEngine:
+    """Process pool scanner shared by all request threads"""
+
+    def __init__(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+        self.pool = None
+
+    def _get_pool(self):
+        with self.lock:
+            if self.pool is None:
+                # spawn avoids forking a process that holds locks in other threads
+                context = multiprocessing.get_context('spawn')
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self.pool
+
+    def shutdown(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+
+    def scan(self, vault_path, paths, query, limit=None, snippets=0, context_lines=0):
+        """
+        Yield (vault-relative path, snippets) for matching notes, stopping after `limit` matches
+
+        snippets is the maximum number of snippets per note (0 disables them).
+        """
+        if limit is not None and limit <= 0:
+            return
+        options = (query, snippets, context_lines)
+        if self.workers <= 1 or len(paths) < MIN_PARALLEL_FILES:
+            yield from self._scan_serial(vault_path, paths, options, limit)
+        else:
+            yield from self._scan_parallel(vault_path, paths, options, limit)
+
+    def _scan_serial(self, vault_path, paths, options, limit):
+        found = 0
+        for start in range(0, len(paths), self.chunk_size):
+            matches, errors = scan_files(vault_path, paths[start:start + self.chunk_size], *options)
+            for error in errors:
+                print(error)
+            for match in matches:
+                yield match
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+    def _scan_parallel(self, vault_path, paths, options, limit):
+        pool = self._get_pool()
+        chunks = iter(range(0, len(paths), self.chunk_size))
+        pending = deque()  # futures in submission order; later shards wait here until earlier ones are yielded
+        found = 0
+
+        def submit_next():
+            start = next(chunks, None)
+            if start is None:
+                return False
+            pending.append(pool.submit(scan_files, vault_path, paths[start:start + self.chunk_size], *options))
+            return True
+
+        # Keep a bounded number of shards in flight so an early stop leaves little work queued
+        for _ in range(self.workers * 2):
+            if not submit_next():
+                break
+
+        try:
+            while pending:
+                matches, errors = pending.popleft().result()
+                for error in errors:
+                    print(error)
+                for match in matches:
+                    yield match
+                    found += 1
+                    if limit is not None and found >= limit:
+                        return
+                submit_next()
+        finally:
+            for future in pending:
+                future.cancel()
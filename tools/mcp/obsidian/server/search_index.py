@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Search Index
+Persistent inverted index (term -> note IDs and token positions) for the AI Memory tree,
+with a trigram index of its vocabulary for fuzzy searches and narrowing regex scans
+"""
+
+import os
+import json
+import re
+import math
+import threading
+from matcher import is_regex, required_literals
+from ngram_index import NgramIndex, ASCII_WORD_RE, NGRAM, fold
+from frontmatter import parse_frontmatter
+
+INDEX_VERSION = 2
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Word tokens; the same tokenizer is used for notes and queries
+TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return [token.lower() for token in TOKEN_RE.findall(text)]
+
+
+class SearchIndex:
+    """Inverted index over the markdown notes below memory_path"""
+
+    def __init__(self, index_file):
+        self.index_file = index_file
+        self.lock = threading.RLock()
+        self.save_lock = threading.Lock()  # one save at a time, since they share the temp file
+        self.ready = False
+        self.dirty = False
+        self._reset(None)
+
+    def _reset(self, vault_path):
+        self.vault_path = vault_path
+        self.next_id = 0
+        self.docs = {}        # note ID -> {"path", "mtime", "size", "length", "meta"}
+        self.ids = {}         # relative path -> note ID
+        self.postings = {}    # term -> {note ID: [positions]}
+        self.doc_terms = {}   # note ID -> terms, used to drop stale postings
+        self.total_length = 0  # sum of note lengths in tokens, for BM25
+        self.ngrams = NgramIndex()  # trigrams of the terms; rebuilt on load rather than saved
+        self.name_words = {}  # note ID -> filename words, filled in by fuzzy searches
+
+    def load(self, vault_path):
+        """Load the index from disk, discarding it if it belongs to another vault"""
+        with self.lock:
+            self._reset(vault_path)
+            if not os.path.exists(self.index_file):
+                return False
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Error loading search index: {e}")
+                return False
+
+            if data.get("version") != INDEX_VERSION or data.get("vault_path") != vault_path:
+                return False
+
+            self.next_id = data["next_id"]
+            self.docs = {int(doc_id): doc for doc_id, doc in data["docs"].items()}
+            self.ids = {doc["path"]: doc_id for doc_id, doc in self.docs.items()}
+            self.total_length = sum(doc["length"] for doc in self.docs.values())
+            for term, postings in data["postings"].items():
+                self.postings[term] = {int(doc_id): positions for doc_id, positions in postings.items()}
+                self.ngrams.add(term)
+                for doc_id in self.postings[term]:
+                    self.doc_terms.setdefault(doc_id, []).append(term)
+            return True
+
+    def save(self):
+        """
+        Write the index to disk atomically
+
+        Only a snapshot is taken under the index lock; searches and updates go on while
+        it is serialized. Doc entries and position lists are never changed once indexed,
+        so copying the dicts that hold them is enough.
+        """
+        with self.save_lock:
+            with self.lock:
+                data = {
+                    "version": INDEX_VERSION,
+                    "vault_path": self.vault_path,
+                    "next_id": self.next_id,
+                    "docs": dict(self.docs),
+                    "postings": {term: dict(postings) for term, postings in self.postings.items()}
+                }
+                # Changes made from here on mark the index dirty again
+                self.dirty = False
+            # Per-process temp file: production mode runs several workers sharing one index file
+            tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(tmp_file, self.index_file)
+            except Exception as e:
+                self.dirty = True
+                print(f"Error saving search index: {e}")
+
+    def sync(self, vault_path, memory_path):
+        """Bring the index in line with the files on disk, re-reading only changed notes"""
+        seen = set()
+        for root, _, files in os.walk(memory_path):
+            for file in files:
+                if not file.endswith('.md'):
+                    continue
+                file_path = os.path.join(root, file)
+                rel_path = os.path.relpath(file_path, vault_path)
+                seen.add(rel_path)
+                self.update_note(rel_path, file_path)
+
+        with self.lock:
+            for rel_path in [path for path in self.ids if path not in seen]:
+                self.remove_note(rel_path)
+            self.ready = True
+
+    def update_note(self, rel_path, file_path):
+        """Re-index a note if it changed since it was indexed, or drop it if it is gone"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.remove_note(rel_path)
+            return
+        doc = self.docs.get(self.ids.get(rel_path))
+        if doc and doc["mtime"] == stat.st_mtime_ns and doc["size"] == stat.st_size:
+            return
+        self.add_note(rel_path, file_path)
+
+    def add_note(self, rel_path, file_path):
+        """Index (or re-index) a single note"""
+        self.add_notes([(rel_path, file_path, None, None)])
+
+    def add_notes(self, notes):
+        """
+        Index (or re-index) notes, taking the index lock once
+
+        notes holds (relative path, file path, content, stat) tuples. Content and
+        stat may be None; content is only used when the file's current stat still
+        matches, so a note changed again since it was written is re-read instead.
+        """
+        analyzed = []
+        for rel_path, file_path, content, written_stat in notes:
+            try:
+                stat = os.stat(file_path)
+                if content is None or written_stat is None or \
+                        (stat.st_mtime_ns, stat.st_size) != (written_stat.st_mtime_ns, written_stat.st_size):
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        content = f.read()
+            except Exception as e:
+                print(f"Error indexing {file_path}: {e}")
+                self.remove_note(rel_path)
+                continue
+
+            positions = {}
+            tokens = tokenize(content)
+            for position, term in enumerate(tokens):
+                positions.setdefault(term, []).append(position)
+            # Frontmatter is parsed once per version of the note, along with its terms
+            meta = parse_frontmatter(content)
+            analyzed.append((rel_path, stat, len(tokens), positions, meta))
+
+        with self.lock:
+            for rel_path, stat, length, positions, meta in analyzed:
+                self.remove_note(rel_path)
+                doc_id = self.next_id
+                self.next_id += 1
+                self.docs[doc_id] = {
+                    "path": rel_path,
+                    "mtime": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "length": length
+                }
+                self.ids[rel_path] = doc_id
+                self.total_length += length
+                if meta:
+                    self.docs[doc_id]["meta"] = meta
+                for term, term_positions in positions.items():
+                    term_postings = self.postings.get(term)
+                    if term_postings is None:
+                        term_postings = self.postings[term] = {}
+                        self.ngrams.add(term)
+                    term_postings[doc_id] = term_positions
+                self.doc_terms[doc_id] = list(positions)
+                self.dirty = True
+
+    def remove_note(self, rel_path):
+        """Drop a note and its postings from the index"""
+        with self.lock:
+            doc_id = self.ids.pop(rel_path, None)
+            if doc_id is None:
+                return
+            for term in self.doc_terms.pop(doc_id, []):
+                postings = self.postings.get(term)
+                if postings is None:
+                    continue
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+                    self.ngrams.remove(term)
+            self.name_words.pop(doc_id, None)
+            self.total_length -= self.docs.pop(doc_id)["length"]
+            self.dirty = True
+
+    def note_meta(self, rel_path):
+        """Parsed frontmatter of an indexed note, or None"""
+        with self.lock:
+            doc = self.docs.get(self.ids.get(rel_path))
+            return doc.get("meta") if doc else None
+
+    def remove_tree(self, rel_dir):
+        """Drop every note below a directory"""
+        prefix = rel_dir.rstrip(os.sep) + os.sep
+        with self.lock:
+            for rel_path in [path for path in self.ids if path.startswith(prefix)]:
+                self.remove_note(rel_path)
+
+    def search(self, query):
+        """
+        Answer a plain-text query from the index
+
+        Matches notes whose filename or content contains the query, case-insensitively,
+        exactly like a scan. Only a single word can be decided from the vocabulary,
+        since a run of word characters lies inside one indexed word; returns None for
+        other queries (see phrase_candidates()) and while the index is not built.
+        """
+        if not self.ready or not TOKEN_RE.fullmatch(query):
+            return None
+
+        needle = query.casefold()
+        with self.lock:
+            doc_ids = self._name_matches(needle)
+            for term in self._words_containing(query):
+                if needle in term.casefold():
+                    doc_ids.update(self.postings[term])
+            return sorted(self.docs[doc_id]["path"] for doc_id in doc_ids)
+
+    def phrase_candidates(self, query):
+        """
+        Paths of the notes a plain-text query can match, or None when it cannot be narrowed
+
+        A note's content must hold the query's words consecutively: the first may
+        end a longer word, the last may start one and any in between are whole
+        words. Separators are not indexed, so the notes still have to be matched.
+        Notes whose filename contains the query are always included.
+        """
+        terms = tokenize(query)
+        if not self.ready or is_regex(query) or not terms:
+            return None
+
+        with self.lock:
+            doc_ids = self._name_matches(query.casefold())
+            if len(terms) == 1:
+                slots = [self._words_containing(terms[0])]
+            else:
+                first, last = fold(terms[0]), fold(terms[-1])
+                slots = ([{term for term in self._words_containing(terms[0]) if fold(term).endswith(first)}]
+                         + [{term} if term in self.postings else set() for term in terms[1:-1]]
+                         + [{term for term in self._words_containing(terms[-1]) if fold(term).startswith(last)}])
+            slot_postings = [[self.postings[word] for word in words] for words in slots]
+            # Notes holding a word of every slot, intersected from the rarest slot
+            slot_docs = sorted((set().union(*postings) for postings in slot_postings), key=len)
+            candidates = slot_docs[0]
+            for docs in slot_docs[1:]:
+                candidates = candidates & docs
+            if len(slots) == 1:
+                doc_ids |= candidates
+            else:
+                doc_ids |= {doc_id for doc_id in candidates if self._has_phrase(doc_id, slot_postings)}
+            return {self.docs[doc_id]["path"] for doc_id in doc_ids}
+
+    def _has_phrase(self, doc_id, slot_postings):
+        """Check if a note has a word of each slot at consecutive positions"""
+        positions = [set().union(*(word_postings[doc_id] for word_postings in postings if doc_id in word_postings))
+                     for postings in slot_postings]
+        # Phrase starts, checked slot by slot from the one with the fewest positions
+        order = sorted(range(len(positions)), key=lambda slot: len(positions[slot]))
+        starts = {position - order[0] for position in positions[order[0]]}
+        for slot in order[1:]:
+            starts = {start for start in starts if start + slot in positions[slot]}
+            if not starts:
+                return False
+        return True
+
+    def _words_containing(self, fragment):
+        """Indexed words that may contain fragment (compared case-folded); callers hold the lock"""
+        if len(fold(fragment)) >= NGRAM:
+            return self.ngrams.containing(fragment)
+        folded = fold(fragment)
+        return {term for term in self.postings if folded in fold(term)}
+
+    def _name_matches(self, needle):
+        """IDs of the notes whose filename contains the case-folded needle"""
+        return {doc_id for doc_id, doc in self.docs.items()
+                if needle in os.path.basename(doc["path"]).casefold()}
+
+    def fuzzy_search(self, query, max_edits=None):
+        """
+        Typo-tolerant search: notes containing, for every query word, an indexed
+        word within max_edits of it (by word length when None), in their content
+        or filename
+
+        Returns [(path, score, matched words)] best first, where score is the mean
+        similarity of each query word's closest match, or None when the index is
+        not built yet or the query has no words.
+        """
+        words = list(dict.fromkeys(tokenize(query)))
+        if not self.ready or not words:
+            return None
+
+        with self.lock:
+            matches = None  # note ID -> (total similarity, matched words)
+            for word in words:
+                similar = dict(self.ngrams.similar(word, max_edits))
+                best = {}  # note ID -> (similarity, indexed word)
+                for term, similarity in similar.items():
+                    for doc_id in self.postings[term]:
+                        if similarity > best.get(doc_id, (0.0, None))[0]:
+                            best[doc_id] = (similarity, term)
+                for doc_id in (self.docs if matches is None else matches):
+                    for name_word in self._name_words(doc_id):
+                        similarity = similar.get(name_word, 0.0)
+                        if similarity > best.get(doc_id, (0.0, None))[0]:
+                            best[doc_id] = (similarity, name_word)
+
+                if matches is None:
+                    matches = {doc_id: (similarity, {term}) for doc_id, (similarity, term) in best.items()}
+                else:
+                    matches = {doc_id: (total + best[doc_id][0], terms | {best[doc_id][1]})
+                               for doc_id, (total, terms) in matches.items() if doc_id in best}
+                if not matches:
+                    return []
+
+            ranked = [(self.docs[doc_id]["path"], total / len(words), terms)
+                      for doc_id, (total, terms) in matches.items()]
+        ranked.sort(key=lambda hit: (-hit[1], hit[0]))
+        return ranked
+
+    def _name_words(self, doc_id):
+        words = self.name_words.get(doc_id)
+        if words is None:
+            name = os.path.splitext(os.path.basename(self.docs[doc_id]["path"]))[0]
+            words = self.name_words[doc_id] = tuple(tokenize(name))
+        return words
+
+    def regex_candidates(self, query, name_matches):
+        """
+        Paths of the notes a regex scan has to read, or None when it cannot be narrowed
+
+        Each run of NGRAM or more ASCII word characters in the regex's required
+        literals lies inside one word of any matching note, so only notes with an
+        indexed word containing every run of some alternative can match. Notes
+        whose filename satisfies name_matches are always included.
+        """
+        branches = required_literals(query)
+        if not self.ready or branches is None:
+            return None
+        branch_runs = []
+        for literals in branches:
+            runs = {run.lower() for literal in literals for run in ASCII_WORD_RE.findall(literal)}
+            if not runs:
+                return None
+            # Longer runs are usually rarer, so the intersection shrinks fastest
+            branch_runs.append(sorted(runs, key=len, reverse=True))
+
+        with self.lock:
+            doc_ids = set()
+            for runs in branch_runs:
+                matching = None
+                for run in runs:
+                    run_docs = set()
+                    for term in self.ngrams.containing(run):
+                        run_docs.update(self.postings[term])
+                    matching = run_docs if matching is None else matching & run_docs
+                    if not matching:
+                        break
+                doc_ids |= matching
+            paths = {self.docs[doc_id]["path"] for doc_id in doc_ids}
+            paths.update(doc["path"] for doc in self.docs.values() if name_matches(os.path.basename(doc["path"])))
+            return paths
+
+    def term_offsets(self, content, terms):
+        """Character spans in content of the words in terms (lowercase indexed words)"""
+        return [match.span() for match in TOKEN_RE.finditer(content) if match.group().lower() in terms]
+
+    def bm25_scores(self, paths, query):
+        """
+        Relevance of each path to the query words (BM25), plus a bonus when the
+        filename contains the query. A query word that is not an indexed word counts
+        the words containing it, so partial words rank too. Notes missing from the
+        index score 0.
+        """
+        terms = set(tokenize(query))
+        needle = query.casefold()
+        scores = {}
+        with self.lock:
+            count = len(self.docs)
+            average_length = self.total_length / count if count else 0
+            term_frequencies = {}  # query word -> {note ID: occurrences}
+            idf = {}
+            for term in terms:
+                words = [term] if term in self.postings else self._words_containing(term)
+                frequencies = term_frequencies[term] = {}
+                for word in words:
+                    for doc_id, positions in self.postings[word].items():
+                        frequencies[doc_id] = frequencies.get(doc_id, 0) + len(positions)
+                frequency = len(frequencies)
+                idf[term] = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            
+            for path in paths:
+                score = 0.0
+                if needle in os.path.basename(path).casefold():
+                    score += sum(idf.values()) or 1.0
+                doc_id = self.ids.get(path)
+                if doc_id is not None:
+                    length = self.docs[doc_id]["length"]
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length) if average_length else BM25_K1
+                    for term in terms:
+                        tf = term_frequencies[term].get(doc_id, 0)
+                        if tf:
+                            score += idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+                scores[path] = score
+        return scores
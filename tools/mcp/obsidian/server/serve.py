@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Serve Script
+Runs the Shared Memory Framework Server in development, production or async mode
+
+Development mode is the Flask debug server (single process, reloader, debugger).
+Production mode uses gunicorn on Linux/macOS (multiple worker processes, each with
+a thread pool, keep-alive and graceful reload on SIGHUP) and waitress on Windows
+(a single process with a thread pool).
+Async mode is the aiohttp server in async_app.py: one event loop multiplexing all
+connections, with file I/O and scans in a thread pool (--threads).
+
+Production and async mode can also listen on a Unix domain socket (--socket),
+which same-host clients use to skip TCP connection setup and loopback overhead.
+"""
+
+import os
+import sys
+import socket
+import argparse
+import platform
+
+DEFAULT_PORT = 5678
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_THREADS = 8
+DEFAULT_ASYNC_THREADS = 32
+DEFAULT_KEEPALIVE = 5  # seconds
+DEFAULT_GRACEFUL_TIMEOUT = 30  # seconds
+
+
+def default_workers():
+    """A couple of workers per core, capped: each worker keeps its own index in memory"""
+    return min(4, (os.cpu_count() or 1) * 2)
+
+
+def remove_stale_socket(path):
+    """Delete a socket file left behind by a server that is no longer running"""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.remove(path)
+        return
+    finally:
+        probe.close()
+    sys.exit(f"Another server is already listening on {path}")
+
+
+def serve_development(host, port):
+    from werkzeug.serving import is_running_from_reloader
+    from app import app, init_app
+    # The reloader's parent process only watches source files and restarts the server
+    if is_running_from_reloader():
+        init_app()
+    app.run(host=host, port=port, debug=True)
+
+
+def serve_gunicorn(host, port, workers, threads, keepalive, socket_path=None):
+    from gunicorn.app.base import BaseApplication
+
+    class StandaloneApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import app
+            return app
+
+    def when_ready(server):
+        # Only the user running the server may connect through the socket
+        if socket_path:
+            os.chmod(socket_path, 0o600)
+
+    def post_fork(server, worker):
+        # Each worker starts its own index build and vault watcher threads after the fork
+        from app import init_app
+        init_app()
+
+    StandaloneApplication({
+        "bind": [f"{host}:{port}"] + ([f"unix:{socket_path}"] if socket_path else []),
+        "when_ready": when_ready,
+        "post_fork": post_fork,
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread",
+        "keepalive": keepalive,
+        "graceful_timeout": DEFAULT_GRACEFUL_TIMEOUT,
+        "timeout": 120,
+        "accesslog": "-",
+    }).run()
+
+
+def serve_waitress(host, port, threads):
+    from waitress import serve
+    from app import app, init_app
+    init_app()
+    serve(app, host=host, port=port, threads=threads)
+
+
+def serve_async(host, port, threads, socket_path=None):
+    # The I/O pool is sized when async_app is imported
+    os.environ["OBSIDIAN_ASYNC_THREADS"] = str(threads)
+    from aiohttp import web
+    from app import init_app
+    from async_app import create_app
+    init_app()
+    unix_socket = None
+    if socket_path:
+        unix_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        unix_socket.bind(socket_path)
+        # Only the user running the server may connect through the socket
+        os.chmod(socket_path, 0o600)
+    try:
+        web.run_app(create_app(), host=host, port=port, sock=unix_socket)
+    finally:
+        if unix_socket is not None and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Shared Memory Framework Server")
+    parser.add_argument("--mode", choices=["development", "production", "async"],
+                        default=os.environ.get("MCP_SERVER_MODE", "development"),
+                        help="Server mode (default: development, or MCP_SERVER_MODE)")
+    parser.add_argument("--host", default=os.environ.get("MCP_HOST", DEFAULT_HOST), help="Interface to bind")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", DEFAULT_PORT)), help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("MCP_WORKERS", 0)) or default_workers(),
+                        help="Worker processes in production mode (gunicorn only)")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("MCP_THREADS", 0)),
+                        help="Threads per worker in production mode, or file I/O threads in async mode")
+    parser.add_argument("--socket", default=os.environ.get("MCP_SOCKET") or None,
+                        help="Also listen on this Unix domain socket in production and async mode (or MCP_SOCKET)")
+    parser.add_argument("--keepalive", type=int, default=DEFAULT_KEEPALIVE,
+                        help="Seconds to keep idle client connections open in production mode")
+    args = parser.parse_args()
+
+    # Make app.py importable regardless of the working directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    socket_path = os.path.abspath(args.socket) if args.socket else None
+    if socket_path and (args.mode == "development" or platform.system() == "Windows"):
+        print("Unix domain sockets need production or async mode on Linux/macOS; serving TCP only")
+        socket_path = None
+    if socket_path:
+        remove_stale_socket(socket_path)
+
+    if args.mode == "development":
+        serve_development(args.host, args.port)
+    elif args.mode == "async":
+        serve_async(args.host, args.port, args.threads or DEFAULT_ASYNC_THREADS, socket_path)
+    elif platform.system() == "Windows":
+        if args.workers > 1:
+            print("Multiple worker processes are not supported on Windows; using threads only")
+        serve_waitress(args.host, args.port, args.threads or DEFAULT_THREADS)
+    else:
+        serve_gunicorn(args.host, args.port, args.workers, args.threads or DEFAULT_THREADS, args.keepalive,
+                       socket_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Snippets
+Matching lines with line numbers and UTF-8 byte offsets, so clients can see why a
+note matched without reading all of it. Snippets can be taken from decoded text or
+from the raw bytes of a note, decoding only the lines around each match.
+"""
+
+MAX_SNIPPETS = 20  # per note
+MAX_CONTEXT_LINES = 5
+MAX_SNIPPET_CHARS = 240
+COUNT_CHUNK_BYTES = 1024 * 1024  # newlines in a memory-mapped note are counted this much at a time
+
+
+def make_snippet(content, start, end, context_lines=0):
+    """Snippet for the match content[start:end] with up to context_lines lines around it"""
+    window_start = content.rfind('\n', 0, start) + 1
+    for _ in range(context_lines):
+        if window_start == 0:
+            break
+        window_start = content.rfind('\n', 0, window_start - 1) + 1
+    
+    window_end = content.find('\n', end)
+    window_end = len(content) if window_end == -1 else window_end
+    for _ in range(context_lines):
+        if window_end == len(content):
+            break
+        following = content.find('\n', window_end + 1)
+        window_end = len(content) if following == -1 else following
+    
+    # Keep long lines (pasted logs, minified JSON) bounded around the match
+    if window_end - window_start > MAX_SNIPPET_CHARS:
+        half = max(0, (MAX_SNIPPET_CHARS - (end - start)) // 2)
+        window_start = max(window_start, start - half)
+        window_end = min(window_end, max(end + half, window_start + MAX_SNIPPET_CHARS))
+    
+    return {
+        "line": content.count('\n', 0, start) + 1,
+        "offset": len(content[:start].encode('utf-8')),
+        "length": len(content[start:end].encode('utf-8')),
+        "text": content[window_start:window_end].rstrip('\n')
+    }
+
+
+def count_newlines(data, start, end):
+    """Newlines in data[start:end], copying at most COUNT_CHUNK_BYTES of a memory map at once"""
+    return sum(data[chunk:min(chunk + COUNT_CHUNK_BYTES, end)].count(b'\n')
+               for chunk in range(start, end, COUNT_CHUNK_BYTES))
+
+
+def make_byte_snippet(data, start, end, line, context_lines=0):
+    """make_snippet() for the match data[start:end] of UTF-8 bytes on line, decoding only the lines around it"""
+    window_start = data.rfind(b'\n', 0, start) + 1
+    for _ in range(context_lines):
+        if window_start == 0:
+            break
+        window_start = data.rfind(b'\n', 0, window_start - 1) + 1
+    
+    window_end = data.find(b'\n', end)
+    window_end = len(data) if window_end == -1 else window_end
+    for _ in range(context_lines):
+        if window_end == len(data):
+            break
+        following = data.find(b'\n', window_end + 1)
+        window_end = len(data) if following == -1 else following
+    
+    # A long line is cut well beyond MAX_SNIPPET_CHARS characters (of at most 4 bytes) either side
+    # of the match, on character boundaries, so make_snippet() trims it the same way
+    reach = 4 * MAX_SNIPPET_CHARS
+    cut_start, cut_end = max(window_start, start - reach), min(window_end, end + reach)
+    while cut_start > window_start and 0x80 <= data[cut_start] < 0xC0:
+        cut_start -= 1
+    while cut_end < window_end and 0x80 <= data[cut_end] < 0xC0:
+        cut_end += 1
+    
+    text = data[cut_start:cut_end].decode('utf-8', errors='replace')
+    match_start = len(data[cut_start:start].decode('utf-8', errors='replace'))
+    match_end = match_start + len(data[start:end].decode('utf-8', errors='replace'))
+    snippet = make_snippet(text, match_start, match_end, context_lines)
+    snippet.update(line=line, offset=start, length=end - start)
+    return snippet
+
+
+def find_snippets(content, spans, max_snippets, context_lines=0):
+    """Snippets for the first matches in spans (start, end), at most one per line"""
+    snippets = []
+    last_line_end = -1
+    for start, end in spans:
+        if start < last_line_end:
+            continue
+        snippets.append(make_snippet(content, start, end, context_lines))
+        if len(snippets) >= max_snippets:
+            break
+        last_line_end = content.find('\n', start)
+        if last_line_end == -1:
+            break
+    return snippets
+
+
+def find_byte_snippets(data, spans, max_snippets, context_lines=0):
+    """find_snippets() for UTF-8 bytes or a memory map, with spans as byte offsets"""
+    snippets = []
+    last_line_end = -1
+    line = 1
+    counted = 0
+    for start, end in spans:
+        if start < last_line_end:
+            continue
+        line += count_newlines(data, counted, start)
+        counted = start
+        snippets.append(make_byte_snippet(data, start, end, line, context_lines))
+        if len(snippets) >= max_snippets:
+            break
+        last_line_end = data.find(b'\n', start)
+        if last_line_end == -1:
+            break
+    return snippets
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Vault Stats
+Per-category note counts, sizes and newest modification times for /metadata,
+kept up to date from writes and watcher events instead of walking the vault
+"""
+
+import os
+import threading
+
+# Category names and the folder name that puts a note in each, in order of precedence
+CATEGORIES = (
+    ("contexts", "Contexts"),
+    ("conversations", "Conversations"),
+    ("system_prompts", "System_Prompts"),
+    ("projects", "Projects"),
+)
+
+
+def note_category(rel_path):
+    """Category of a vault-relative note path, or None if it is in none of them"""
+    if not rel_path.endswith('.md'):
+        return None
+    folder = os.path.dirname(rel_path)
+    for category, folder_name in CATEGORIES:
+        if folder_name in folder:
+            return category
+    return None
+
+
+class VaultStats:
+    """Running totals per category, updated one note at a time"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = False
+        self._reset()
+
+    def _reset(self):
+        self.notes = {}  # relative path -> (category, size, mtime)
+        self.totals = {category: {"notes": 0, "bytes": 0, "newest_mtime": None} for category, _ in CATEGORIES}
+
+    def rebuild(self, entries):
+        """Replace the totals with (relative path, size, mtime) entries"""
+        with self.lock:
+            self._reset()
+            for rel_path, size, mtime in entries:
+                self._add(rel_path, size, mtime)
+            self.ready = True
+
+    def update(self, rel_path, size, mtime):
+        """Record a note that was created or changed"""
+        with self.lock:
+            self._remove(rel_path)
+            self._add(rel_path, size, mtime)
+
+    def remove(self, rel_path):
+        """Forget a note that was removed"""
+        with self.lock:
+            self._remove(rel_path)
+
+    def remove_tree(self, rel_dir):
+        """Forget every note below a directory"""
+        prefix = rel_dir.rstrip(os.sep) + os.sep
+        with self.lock:
+            for rel_path in [path for path in self.notes if path.startswith(prefix)]:
+                self._remove(rel_path)
+
+    def _add(self, rel_path, size, mtime):
+        category = note_category(rel_path)
+        if category is None:
+            return
+        self.notes[rel_path] = (category, size, mtime)
+        totals = self.totals[category]
+        totals["notes"] += 1
+        totals["bytes"] += size
+        if totals["newest_mtime"] is None or mtime > totals["newest_mtime"]:
+            totals["newest_mtime"] = mtime
+
+    def _remove(self, rel_path):
+        entry = self.notes.pop(rel_path, None)
+        if entry is None:
+            return
+        category, size, mtime = entry
+        totals = self.totals[category]
+        totals["notes"] -= 1
+        totals["bytes"] -= size
+        if mtime == totals["newest_mtime"]:
+            # Only removing the newest note needs a pass over the category
+            mtimes = [entry[2] for entry in self.notes.values() if entry[0] == category]
+            totals["newest_mtime"] = max(mtimes) if mtimes else None
+
+    def snapshot(self):
+        """Copy of the per-category totals"""
+        with self.lock:
+            return {category: dict(totals) for category, totals in self.totals.items()}
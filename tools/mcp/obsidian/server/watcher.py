@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Vault Watcher
+Watches the AI Memory tree for changes made outside the server (e.g. edits in Obsidian)
+and reports them in batches so indexes can be updated incrementally.
+
+Uses inotify on Linux and falls back to polling file mtimes and sizes elsewhere.
+"""
+
+import os
+import sys
+import time
+import errno
+import ctypes
+import ctypes.util
+import select
+import struct
+import threading
+from collections import namedtuple
+
+# kind is one of: created, modified, deleted, moved, rescan
+# For moved events path is the old location and dest_path the new one.
+# A rescan event means events were lost and consumers should resynchronise fully.
+VaultEvent = namedtuple("VaultEvent", ["kind", "path", "dest_path", "is_dir"])
+
+DEFAULT_DEBOUNCE = 0.5  # seconds of quiet before a batch is delivered
+DEFAULT_POLL_INTERVAL = 2.0  # seconds between polling scans
+MAX_BATCH_DELAY = 5.0  # deliver a batch after this long even if changes keep arriving
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_note(path):
+    """Only markdown notes are reported for files"""
+    return path.endswith('.md')
+
+
+def _load_libc():
+    """Load libc with the inotify functions, or return None when unavailable"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        libc.inotify_rm_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class VaultWatcher:
+    """
+    Background watcher delivering lists of VaultEvent to a callback
+
+    The callback runs on the watcher thread; exceptions raised by it are logged
+    and do not stop the watcher.
+    """
+
+    def __init__(self, root, callback, mode="auto", debounce=DEFAULT_DEBOUNCE,
+                 poll_interval=DEFAULT_POLL_INTERVAL):
+        self.root = os.path.abspath(root)
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.mode = mode
+        self.backend = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._pending = []
+        self._pending_since = None
+
+    def start(self):
+        """Start watching; picks inotify when available unless polling is forced"""
+        libc = _load_libc() if self.mode in ("auto", "inotify") else None
+        if libc is not None:
+            try:
+                self._init_inotify(libc)
+                self.backend = "inotify"
+            except OSError as e:
+                print(f"inotify unavailable ({e}), falling back to polling")
+        if self.backend is None:
+            self._snapshot = self._scan()
+            self.backend = "poll"
+
+        target = self._run_inotify if self.backend == "inotify" else self._run_poll
+        self._thread = threading.Thread(target=target, name="vault-watcher", daemon=True)
+        self._thread.start()
+        return self.backend
+
+    def stop(self):
+        """Stop the watcher thread and release inotify resources"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        if self.backend == "inotify":
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+
+    def _queue(self, kind, path, dest_path=None, is_dir=False):
+        event = VaultEvent(kind, path, dest_path, is_dir)
+        # Editors write in several chunks; one modified event per path per batch is enough
+        if kind == "modified" and event in self._pending:
+            return
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending.append(event)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        events, self._pending = self._pending, []
+        self._pending_since = None
+        try:
+            self.callback(events)
+        except Exception as e:
+            print(f"Error applying vault events: {e}")
+
+    # inotify backend
+
+    def _init_inotify(self, libc):
+        self._libc = libc
+        self._fd = libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._watches = {}  # watch descriptor -> directory path
+        self._add_tree(self.root, report=False)
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK | IN_ONLYDIR)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+            return
+        self._watches[wd] = path
+
+    def _add_tree(self, path, report=True):
+        """Watch a directory tree, reporting notes already inside it as created"""
+        if not os.path.isdir(path):
+            if path == self.root:
+                raise OSError(errno.ENOENT, f"Directory not found: {path}")
+            return
+        for root, dirs, files in os.walk(path):
+            self._add_watch(root)
+            if report:
+                for file in files:
+                    if is_note(file):
+                        self._queue("created", os.path.join(root, file))
+
+    def _forget_tree(self, path):
+        """Drop watch bookkeeping for a directory that left the tree"""
+        prefix = path + os.sep
+        for wd, watched in list(self._watches.items()):
+            if watched == path or watched.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._watches[wd]
+
+    def _rename_tree(self, old_path, new_path):
+        """Watches follow inodes, so only the recorded paths need rewriting"""
+        prefix = old_path + os.sep
+        for wd, watched in self._watches.items():
+            if watched == old_path:
+                self._watches[wd] = new_path
+            elif watched.startswith(prefix):
+                self._watches[wd] = new_path + watched[len(old_path):]
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except OSError as e:
+            if e.errno in (errno.EINTR, errno.EAGAIN):
+                return []
+            raise
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, cookie, os.fsdecode(name)))
+        return events
+
+    def _handle_inotify(self, raw_events):
+        moved_from = {}  # cookie -> (path, is_dir)
+        for wd, mask, cookie, name in raw_events:
+            if mask & IN_Q_OVERFLOW:
+                self._queue("rescan", self.root)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            is_dir = bool(mask & IN_ISDIR)
+
+            if mask & IN_MOVED_FROM:
+                moved_from[cookie] = (path, is_dir)
+            elif mask & IN_MOVED_TO:
+                source = moved_from.pop(cookie, None)
+                if source is None:
+                    # Moved in from outside the tree
+                    if is_dir:
+                        self._add_tree(path)
+                    elif is_note(path):
+                        self._queue("created", path)
+                elif is_dir:
+                    self._rename_tree(source[0], path)
+                    self._queue("moved", source[0], path, True)
+                elif is_note(source[0]) or is_note(path):
+                    self._queue("moved", source[0], path)
+            elif mask & IN_CREATE:
+                if is_dir:
+                    self._add_tree(path)
+                elif is_note(path):
+                    self._queue("created", path)
+            elif mask & IN_DELETE:
+                if is_dir or is_note(path):
+                    self._queue("deleted", path, is_dir=is_dir)
+            elif mask & (IN_MODIFY | IN_CLOSE_WRITE):
+                if not is_dir and is_note(path):
+                    self._queue("modified", path)
+
+        # Moved out of the tree without a matching IN_MOVED_TO
+        for path, is_dir in moved_from.values():
+            if is_dir:
+                self._forget_tree(path)
+            if is_dir or is_note(path):
+                self._queue("deleted", path, is_dir=is_dir)
+
+    def _run_inotify(self):
+        while not self._stop.is_set():
+            try:
+                readable, _, _ = select.select([self._fd], [], [], self.debounce)
+            except (OSError, ValueError):
+                break
+            if not readable:
+                self._flush()
+                continue
+            try:
+                self._handle_inotify(self._read_events())
+            except OSError as e:
+                print(f"Error reading inotify events: {e}")
+                self._queue("rescan", self.root)
+            if self._pending_since is not None and time.monotonic() - self._pending_since > MAX_BATCH_DELAY:
+                self._flush()
+        self._flush()
+
+    # Polling backend
+
+    def _scan(self):
+        """Snapshot of note path -> (mtime, size, inode)"""
+        snapshot = {}
+        for root, _, files in os.walk(self.root):
+            for file in files:
+                if not is_note(file):
+                    continue
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        return snapshot
+
+    def _diff(self, old, new):
+        created = [path for path in new if path not in old]
+        deleted = [path for path in old if path not in new]
+        # A deleted and a created path sharing an inode is a rename
+        deleted_inodes = {old[path][2]: path for path in deleted if old[path][2]}
+        for path in created:
+            source = deleted_inodes.pop(new[path][2], None)
+            if source is not None:
+                self._queue("moved", source, path)
+            else:
+                self._queue("created", path)
+        for path in deleted_inodes.values():
+            self._queue("deleted", path)
+        for path, signature in new.items():
+            if path in old and old[path][:2] != signature[:2]:
+                self._queue("modified", path)
+
+    def _run_poll(self):
+        while not self._stop.wait(self.poll_interval):
+            snapshot = self._scan()
+            self._diff(self._snapshot, snapshot)
+            self._snapshot = snapshot
+            self._flush()
@@ -20,6 +20,7 @@ CONFIG_FILE = SERVER_DIR / "config.json"
 PID_FILE = SCRIPT_DIR / "server.pid"
 LOG_FILE = SCRIPT_DIR / "server.log"
 VENV_DIR = SCRIPT_DIR / ".venv"
+SERVER_MODE = os.environ.get("MCP_SERVER_MODE", "development")  # or "production"
 
 def is_server_running():
     """Check if server is already running"""
@@ -96,7 +97,7 @@ def check_config():
 
 def start_server():
     """Start the server in the background"""
-    print("Starting Shared Memory Framework Server on port 5678...")
+    print(f"Starting Shared Memory Framework Server on port 5678 ({SERVER_MODE} mode)...")
     
     # Get python path based on platform
     if platform.system() == 'Windows':
@@ -113,7 +114,7 @@ def start_server():
             # Windows process creation
             from subprocess import CREATE_NEW_CONSOLE
             process = subprocess.Popen(
-                [str(python_path), "app.py"],
+                [str(python_path), "serve.py", "--mode", SERVER_MODE],
                 creationflags=CREATE_NEW_CONSOLE,
                 stdout=open(LOG_FILE, 'w'),
                 stderr=subprocess.STDOUT
@@ -121,7 +122,7 @@ def start_server():
         else:
             # Unix-like systems
             process = subprocess.Popen(
-                [str(python_path), "app.py"],
+                [str(python_path), "serve.py", "--mode", SERVER_MODE],
                 stdout=open(LOG_FILE, 'w'),
                 stderr=subprocess.STDOUT,
                 start_new_session=True  # Equivalent to nohup
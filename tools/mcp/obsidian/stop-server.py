@@ -24,7 +24,7 @@ def stop_server():
             if platform.system() == 'Windows':
                 subprocess.run("taskkill /f /im python.exe /fi \"WINDOWTITLE eq Shared Memory Framework Server\"", shell=True)
             else:
-                subprocess.run("pkill -f 'python.*app.py'", shell=True)
+                subprocess.run("pkill -f 'python.*(app|serve).py'", shell=True)
         except subprocess.SubprocessError:
             pass
         return
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Server Test Fixture
+Imports the Flask app with its search index and write journal in a temporary
+directory, and points it at a temporary vault for each test class
+
+Never loads server/config.json, so tests cannot touch a real vault.
+"""
+
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+import threading
+import unittest
+from werkzeug.serving import make_server
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server")
+WORK_DIR = tempfile.mkdtemp(prefix="obsidian-tests-")
+atexit.register(shutil.rmtree, WORK_DIR, True)
+
+os.environ["OBSIDIAN_INDEX_FILE"] = os.path.join(WORK_DIR, "index", "search_index.json")
+sys.path.insert(0, SERVER_DIR)
+
+import app as api  # noqa: E402
+
+
+def write_file(path, content):
+    """Write a UTF-8 file, creating its folders"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+
+
+def read_file(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def start_server():
+    """Serve the Flask app on a free loopback port in a thread; returns (base URL, stop function)"""
+    server = make_server("127.0.0.1", 0, api.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="test-server", daemon=True)
+    thread.start()
+
+    def stop():
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    return f"http://127.0.0.1:{server.server_port}", stop
+
+
+class VaultTestCase(unittest.TestCase):
+    """
+    Test case with a fresh vault holding NOTES (vault-relative path -> content)
+
+    With INDEXED the indexes are built and the watcher started, as after the
+    server's startup; otherwise requests are answered as while they build.
+    """
+
+    NOTES = {}
+    INDEXED = False
+
+    @classmethod
+    def setUpClass(cls):
+        cls.vault = tempfile.mkdtemp(dir=WORK_DIR)
+        cls.memory_path = os.path.join(cls.vault, "AI", "Memory")
+        os.makedirs(cls.memory_path)
+        for path, content in cls.NOTES.items():
+            write_file(os.path.join(cls.vault, path), content)
+        cls.saved_config = dict(api.config)
+        api.config.update(vault_path=cls.vault, memory_path=cls.memory_path)
+        api.note_cache.clear()
+        api.search_cache.clear()
+        if cls.INDEXED:
+            api.build_search_index()
+        cls.client = api.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        api.stop_vault_watcher()
+        for index in (api.search_index, api.conversation_index, api.vault_stats, api.query_index):
+            index.ready = False
+        api.config.update(cls.saved_config)
+
+    def path(self, rel_path):
+        """Absolute path of a vault-relative path"""
+        return os.path.join(self.vault, rel_path)
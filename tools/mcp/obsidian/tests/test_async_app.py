@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Async Server Tests
+The aiohttp server answers like the Flask app: same statuses and bodies for the
+shared routes, NDJSON negotiation, CORS preflight and headers, and errors
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server_fixture import VaultTestCase, read_file  # noqa: E402
+
+try:
+    from aiohttp.test_utils import TestClient, TestServer
+    import async_app
+except ImportError:
+    async_app = None
+
+NOTES = {
+    os.path.join("AI", "Memory", "Contexts", "Networking.md"): "---\ntags: [azure]\n---\n# Subnets\nsubnet peering\n",
+    os.path.join("AI", "Memory", "Conversations", "Claude", "20250301-Subnets.md"): "subnet plan\n",
+}
+
+# (method, path, query parameters, JSON body) answered the same by both servers; none changes the vault
+REQUESTS = [
+    ("GET", "/health", {}, None),
+    ("GET", "/search", {"query": "subnet"}, None),
+    ("GET", "/search", {"query": "sub.et", "snippets": 1, "limit": 1}, None),
+    ("GET", "/search", {"query": "sub(et"}, None),
+    ("GET", "/search", {"query": "subnet", "prefix": "../x"}, None),
+    ("GET", "/read", {"path": "AI/Memory/Contexts/Networking.md"}, None),
+    ("GET", "/read", {}, None),
+    ("GET", "/query", {"tag": "azure"}, None),
+    ("GET", "/query", {"date_from": "yesterday"}, None),
+    ("GET", "/conversations/recent", {"agent": "Claude"}, None),
+    ("GET", "/conversations/recent", {"agent": ".."}, None),
+    ("POST", "/write", {}, {"path": "AI/Memory/New.md"}),
+    ("POST", "/append", {}, {"content": "x"}),
+    ("POST", "/patch", {}, {"path": "AI/Memory/Contexts/Networking.md", "heading": "Missing", "content": "x"}),
+]
+
+
+@unittest.skipIf(async_app is None, "needs aiohttp")
+class AsyncAppTest(VaultTestCase, unittest.IsolatedAsyncioTestCase):
+
+    NOTES = NOTES
+
+    async def asyncSetUp(self):
+        self.async_client = TestClient(TestServer(async_app.create_app()))
+        await self.async_client.start_server()
+
+    async def asyncTearDown(self):
+        await self.async_client.close()
+
+    async def both(self, method, path, params=None, body=None, headers=None):
+        """(status, content type, parsed JSON lines) from the Flask app and from the aiohttp server"""
+        flask_response = self.client.open(path, method=method, query_string=params, json=body, headers=headers)
+        flask_lines = [json.loads(line) for line in flask_response.get_data(as_text=True).splitlines()]
+        async with self.async_client.request(method, path, params=params, json=body, headers=headers) as response:
+            async_lines = [json.loads(line) for line in (await response.text()).splitlines()]
+        return ((flask_response.status_code, flask_response.mimetype, flask_lines),
+                (response.status, response.content_type, async_lines))
+
+    async def test_routes_answer_like_flask(self):
+        for method, path, params, body in REQUESTS:
+            params = {name: str(value) for name, value in params.items()}
+            flask, asynchronous = await self.both(method, path, params, body)
+            self.assertEqual(asynchronous, flask, (method, path, params))
+
+    async def test_ndjson_negotiation_matches_flask(self):
+        for accept in ("application/x-ndjson", "application/x-ndjson, application/json;q=0.5",
+                       "application/json, application/x-ndjson", "*/*"):
+            flask, asynchronous = await self.both("GET", "/search", {"query": "sub.et"}, headers={"Accept": accept})
+            self.assertEqual(asynchronous, flask, accept)
+
+    async def test_cors_preflight(self):
+        headers = {"Origin": "http://localhost:3000", "Access-Control-Request-Method": "POST",
+                   "Access-Control-Request-Headers": "content-type"}
+        async with self.async_client.options("/write", headers=headers) as response:
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.headers["Access-Control-Allow-Origin"], "http://localhost:3000")
+            self.assertIn("POST", response.headers["Access-Control-Allow-Methods"])
+            self.assertEqual(response.headers["Access-Control-Allow-Headers"], "content-type")
+        async with self.async_client.options("/missing", headers=headers) as response:
+            self.assertEqual(response.status, 404)
+
+    async def test_cors_headers_on_streams_and_errors(self):
+        async with self.async_client.get("/read", params={"path": "AI/Memory/Contexts/Networking.md"},
+                                         headers={"Accept": "application/x-ndjson"}) as response:
+            self.assertEqual(response.headers["Access-Control-Allow-Origin"], "*")
+        async with self.async_client.get("/search") as response:
+            self.assertEqual(response.status, 400)
+            self.assertEqual(response.headers["Access-Control-Allow-Origin"], "*")
+
+    async def test_write_goes_through_the_thread_pool(self):
+        path = "AI/Memory/Written.md"
+        async with self.async_client.post("/write", json={"path": path, "content": "from aiohttp\n"}) as response:
+            self.assertEqual(await response.json(), {"status": "success", "path": path})
+        self.assertEqual(read_file(self.path(path)), "from aiohttp\n")
+        async with self.async_client.get("/read", params={"path": path}) as response:
+            self.assertEqual(await response.json(), {path: "from aiohttp\n"})
+
+
+if __name__ == "__main__":
+    unittest.main()
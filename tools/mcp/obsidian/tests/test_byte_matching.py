@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Byte Matching Tests
+Matching raw and memory-mapped note bytes gives the same matches and snippets as
+decoding the notes: queries that are safe on bytes, notes that must be decoded
+(carriage returns, letters that fold to ASCII), and byte-offset snippets
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import mmap
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server")
+sys.path.insert(0, SERVER_DIR)
+
+import scanner  # noqa: E402
+from matcher import ASCII_FOLDING_CHARS, QueryMatcher, is_bytes_safe  # noqa: E402
+from snippets import find_byte_snippets, find_snippets  # noqa: E402
+
+QUERIES = ["subnet", "SUBNET peer", "k", "s", "ss", "fi", r"sub\w*", r"peer(ing)?", "hub|spoke", r"\d{3}", "[a-c]x",
+           "^sub", "net$", "sub.et", "é"]
+LINES = ["subnet peering", "SubNet 10.0.0.0/16", "hub and spoke", "ﬁle ſtraße KELVIN", "café au lait résumé",
+         "a" * 900 + " subnet " + "b" * 900, "", "cx ax bx 123", "spoke\r", "straße", "Kelvin sign: K"]
+
+
+def random_note(rng):
+    separator = rng.choice(["\n", "\r\n", "\n"])
+    return separator.join(rng.choice(LINES) for _ in range(rng.randint(1, 12))) + rng.choice(["", "\n"])
+
+
+def decoded_matcher(query):
+    """Matcher that always decodes the note, as scans did before matching bytes"""
+    matcher = QueryMatcher(query)
+    matcher.byte_pattern = None
+    return matcher
+
+
+class BytesSafeTest(unittest.TestCase):
+
+    def test_safe_queries(self):
+        for query in ("subnet", r"sub\.net", "[a-c]x", "(hub|spoke)s?", "^sub", "net$", "a{2}"):
+            self.assertTrue(is_bytes_safe(query), query)
+            self.assertIsNotNone(QueryMatcher(query).byte_pattern, query)
+
+    def test_unsafe_queries_are_decoded(self):
+        # \d and \s match non-ASCII digits and spaces in text
+        for query in ("sub.et", "[^a]b", r"\w+", r"\bsub", "é", r"\d", r"\s"):
+            self.assertFalse(is_bytes_safe(query), query)
+            self.assertIsNone(QueryMatcher(query).byte_pattern, query)
+
+
+class BytesDecidableTest(unittest.TestCase):
+
+    def test_carriage_returns_need_decoding(self):
+        self.assertFalse(QueryMatcher("subnet").bytes_decidable(b"subnet\r\n"))
+        self.assertTrue(QueryMatcher("subnet").bytes_decidable(b"subnet\n"))
+
+    def test_letters_folding_to_the_query_letters_need_decoding(self):
+        for query, text in (("ss", "straße"), ("s", "ſ"), ("k", "Kelvin: K"), ("fi", "ﬁle"), ("i", "İ")):
+            self.assertFalse(QueryMatcher(query).bytes_decidable(text.encode("utf-8")), (query, text))
+        # Only letters the query uses matter
+        self.assertTrue(QueryMatcher("net").bytes_decidable("straße".encode("utf-8")))
+        # A class may cover letters it does not spell out
+        self.assertFalse(QueryMatcher("[a-z]x").bytes_decidable("straße".encode("utf-8")))
+
+    def test_every_folding_char_is_caught_for_its_letters(self):
+        for char in ASCII_FOLDING_CHARS:
+            folded = char.casefold() + char.lower() + char.upper()
+            letters = [letter for letter in folded if letter.isascii() and letter.isalpha()]
+            matcher = QueryMatcher(letters[0])
+            self.assertFalse(matcher.bytes_decidable(f"x{char}x".encode("utf-8")), char)
+
+
+class ByteSnippetsTest(unittest.TestCase):
+
+    def test_same_snippets_as_decoded_text(self):
+        rng = random.Random(23)
+        for _ in range(300):
+            content = random_note(rng).replace("\r", "")
+            data = content.encode("utf-8")
+            query = rng.choice([query for query in QUERIES if is_bytes_safe(query)])
+            matcher = QueryMatcher(query)
+            if not matcher.bytes_decidable(data):
+                continue
+            max_snippets, context_lines = rng.randint(1, 4), rng.randint(0, 2)
+            self.assertEqual(find_byte_snippets(data, matcher.byte_spans(data), max_snippets, context_lines),
+                             find_snippets(content, matcher.spans(content), max_snippets, context_lines),
+                             (query, content))
+
+
+class MatchContentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        return path
+
+    def test_note_bytes_maps_large_notes(self):
+        small, large = self.write("small.md", "x" * 10), self.write("large.md", "x" * 5000)
+        with mock.patch.object(scanner, "MMAP_MIN_BYTES", 4096):
+            with scanner.note_bytes(small) as data:
+                self.assertIsInstance(data, bytes)
+            with scanner.note_bytes(large) as data:
+                self.assertIsInstance(data, mmap.mmap)
+                self.assertEqual(data[:3], b"xxx")
+        with mock.patch.object(scanner, "MMAP_MIN_BYTES", 0), scanner.note_bytes(large) as data:
+            self.assertIsInstance(data, bytes)
+
+    def test_bytes_and_maps_match_like_decoded_text(self):
+        rng = random.Random(7)
+        paths = [self.write(f"{index}.md", random_note(rng)) for index in range(60)]
+        for mmap_min_bytes in (0, 1):
+            with mock.patch.object(scanner, "MMAP_MIN_BYTES", mmap_min_bytes):
+                for query in QUERIES:
+                    matcher, reference = QueryMatcher(query), decoded_matcher(query)
+                    for path in paths:
+                        for snippets, context_lines in ((0, 0), (3, 0), (2, 1)):
+                            self.assertEqual(scanner.match_content(path, matcher, False, snippets, context_lines),
+                                             scanner.match_content(path, reference, False, snippets, context_lines),
+                                             (mmap_min_bytes, query, path, snippets))
+
+    def test_name_match_still_takes_snippets(self):
+        path = self.write("subnet.md", "no match here\nsubnet\n")
+        matched, found = scanner.match_content(path, QueryMatcher("subnet"), True, snippets=1)
+        self.assertTrue(matched)
+        self.assertEqual(found[0]["line"], 2)
+        self.assertEqual(scanner.match_content(self.write("other.md", "nothing"), QueryMatcher("subnet"), True, 1),
+                         (True, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Compression Tests
+Accept-Encoding negotiation, compressed responses with their ETags, and
+compressed request bodies: gzip, deflate and zstd decoding, corrupt or
+unsupported codings, and bodies expanding past the request size limit, on
+both the Flask and aiohttp servers
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import gzip
+import json
+import zlib
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "adapters"))
+
+from server_fixture import VaultTestCase, read_file, start_server  # noqa: E402
+import compression  # noqa: E402
+from compression import (BodyTooLarge, choose_encoding, decompress, encoded_etag, parse_accept_encoding,  # noqa: E402
+                         should_compress, strip_etag_coding)
+import universal_client as client  # noqa: E402
+
+try:
+    from aiohttp.test_utils import TestClient, TestServer
+    import async_app
+except ImportError:
+    async_app = None
+
+# Expands to 8 MB from a few kilobytes
+BOMB = gzip.compress(b"\0" * (8 * 1024 * 1024))
+LARGE_NOTE = "subnet peering between hub and spoke\n" * 200
+
+
+class NegotiationTest(unittest.TestCase):
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(parse_accept_encoding("gzip, deflate;q=0.5, ZSTD;q=x, , br"),
+                         {"gzip": 1.0, "deflate": 0.5, "zstd": 0.0, "br": 1.0})
+        self.assertEqual(parse_accept_encoding(None), {})
+
+    def test_choose_encoding_without_zstd(self):
+        with mock.patch.object(compression, "zstandard", None):
+            self.assertEqual(choose_encoding("gzip, zstd"), "gzip")
+            self.assertEqual(choose_encoding("*"), "gzip")
+            self.assertIsNone(choose_encoding("zstd, br"))
+            self.assertIsNone(choose_encoding("gzip;q=0"))
+            self.assertIsNone(choose_encoding("*, gzip;q=0"))
+            self.assertIsNone(choose_encoding(None))
+
+    def test_choose_encoding_prefers_zstd(self):
+        with mock.patch.object(compression, "zstandard", mock.Mock()):
+            self.assertEqual(choose_encoding("gzip, zstd"), "zstd")
+            self.assertEqual(choose_encoding("zstd;q=0, gzip"), "gzip")
+
+    def test_should_compress(self):
+        self.assertTrue(should_compress("application/json", 1024, 1024))
+        self.assertFalse(should_compress("application/json", 1023, 1024))
+        self.assertFalse(should_compress("application/x-ndjson", 10 ** 6, 1024))
+
+    def test_etag_codings(self):
+        self.assertEqual(encoded_etag('"abc"', "gzip"), '"abc-gzip"')
+        self.assertEqual(encoded_etag('W/"abc"', "zstd"), 'W/"abc-zstd"')
+        self.assertEqual(strip_etag_coding("abc-zstd"), "abc")
+        self.assertEqual(strip_etag_coding("abc-br"), "abc-br")
+
+
+class DecompressTest(unittest.TestCase):
+
+    def test_codings(self):
+        data = b'{"path": "a.md"}' * 10
+        self.assertEqual(decompress(gzip.compress(data), "gzip"), data)
+        self.assertEqual(decompress(gzip.compress(data), " X-GZIP "), data)
+        self.assertEqual(decompress(zlib.compress(data), "deflate"), data)
+        self.assertEqual(decompress(data, None), data)
+        self.assertEqual(decompress(data, "identity"), data)
+
+    def test_unsupported_and_corrupt_bodies(self):
+        for body, coding in ((b"x", "br"), (b"not gzip", "gzip"), (b"not deflate", "deflate")):
+            with self.assertRaises(ValueError) as raised:
+                decompress(body, coding)
+            self.assertNotIsInstance(raised.exception, BodyTooLarge)
+        with mock.patch.object(compression, "zstandard", None), self.assertRaises(ValueError):
+            decompress(b"x", "zstd")
+
+    def test_oversized_compressed_body(self):
+        with mock.patch.object(compression, "MAX_REQUEST_BYTES", 1024 * 1024):
+            with self.assertRaises(BodyTooLarge):
+                decompress(BOMB, "gzip")
+            with self.assertRaises(BodyTooLarge):
+                decompress(zlib.compress(b"\0" * (2 * 1024 * 1024)), "deflate")
+            self.assertEqual(len(decompress(gzip.compress(b"\0" * 1024 * 1024), "gzip")), 1024 * 1024)
+
+    @unittest.skipIf(compression.zstandard is None, "needs zstandard")
+    def test_zstd(self):
+        data = LARGE_NOTE.encode("utf-8")
+        self.assertEqual(decompress(compression.compress(data, "zstd"), "zstd"), data)
+        with self.assertRaises(ValueError):
+            decompress(b"not zstd", "zstd")
+        with mock.patch.object(compression, "MAX_REQUEST_BYTES", 1024), self.assertRaises(BodyTooLarge):
+            decompress(compression.compress(data, "zstd"), "zstd")
+
+
+class FlaskCompressionTest(VaultTestCase):
+
+    NOTES = {os.path.join("AI", "Memory", "Contexts", "Large.md"): LARGE_NOTE,
+             os.path.join("AI", "Memory", "Contexts", "Small.md"): "small\n"}
+
+    def post(self, body, coding, path="/write"):
+        return self.client.post(path, data=body, content_type="application/json",
+                                headers={"Content-Encoding": coding})
+
+    def test_large_responses_are_compressed(self):
+        response = self.client.get("/read", query_string={"path": "AI/Memory/Contexts/Large.md"},
+                                   headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(response.get_data())),
+                         {"AI/Memory/Contexts/Large.md": LARGE_NOTE})
+        small = self.client.get("/read", query_string={"path": "AI/Memory/Contexts/Small.md"},
+                                headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", small.headers)
+        refused = self.client.get("/read", query_string={"path": "AI/Memory/Contexts/Large.md"},
+                                  headers={"Accept-Encoding": "gzip;q=0"})
+        self.assertNotIn("Content-Encoding", refused.headers)
+
+    def test_compressed_request_bodies(self):
+        body = json.dumps({"path": "AI/Memory/Contexts/Posted.md", "content": LARGE_NOTE}).encode("utf-8")
+        self.assertEqual(self.post(gzip.compress(body), "gzip").status_code, 200)
+        self.assertEqual(read_file(self.path("AI/Memory/Contexts/Posted.md")), LARGE_NOTE)
+        self.assertEqual(self.post(zlib.compress(body), "deflate").status_code, 200)
+
+    def test_rejected_request_bodies(self):
+        for body, coding, status in ((b"not gzip", "gzip", 415), (b"{}", "br", 415)):
+            response = self.post(body, coding)
+            self.assertEqual(response.status_code, status, coding)
+            self.assertIn("error", response.get_json())
+        with mock.patch.object(compression, "MAX_REQUEST_BYTES", 1024 * 1024):
+            response = self.post(BOMB, "gzip", "/write/batch")
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("exceeds", response.get_json()["error"])
+
+    def test_client_compresses_large_bodies(self):
+        url, stop = start_server()
+        self.addCleanup(stop)
+        sent = []
+        real_post = client.session.post
+
+        def post(url, data=None, headers=None, **kwargs):
+            sent.append(headers.get("Content-Encoding"))
+            return real_post(url, data=data, headers=headers, **kwargs)
+
+        with mock.patch.object(client, "SERVER_URL", url), mock.patch.object(client.session, "post", post):
+            self.assertEqual(client.write_note("AI/Memory/Contexts/Client.md", LARGE_NOTE)["status"], "success")
+            self.assertEqual(client.write_note("AI/Memory/Contexts/Tiny.md", "tiny\n")["status"], "success")
+        self.assertEqual(sent, ["gzip", None])
+        self.assertEqual(read_file(self.path("AI/Memory/Contexts/Client.md")), LARGE_NOTE)
+
+
+@unittest.skipIf(async_app is None, "needs aiohttp")
+class AsyncCompressionTest(VaultTestCase, unittest.IsolatedAsyncioTestCase):
+
+    NOTES = FlaskCompressionTest.NOTES
+
+    async def asyncSetUp(self):
+        self.async_client = TestClient(TestServer(async_app.create_app()))
+        await self.async_client.start_server()
+
+    async def asyncTearDown(self):
+        await self.async_client.close()
+
+    def post(self, body, coding, path="/write"):
+        return self.async_client.post(path, data=body, headers={"Content-Type": "application/json",
+                                                                 "Content-Encoding": coding})
+
+    async def test_compressed_request_bodies(self):
+        body = json.dumps({"path": "AI/Memory/Contexts/Async.md", "content": LARGE_NOTE}).encode("utf-8")
+        async with self.post(gzip.compress(body), "gzip") as response:
+            self.assertEqual(response.status, 200)
+        self.assertEqual(read_file(self.path("AI/Memory/Contexts/Async.md")), LARGE_NOTE)
+
+    async def test_rejected_request_bodies(self):
+        with mock.patch.object(compression, "zstandard", None):
+            async with self.post(b"{}", "zstd") as response:
+                self.assertEqual(response.status, 415)
+
+    async def test_oversized_compressed_body(self):
+        # aiohttp decodes gzip itself and applies client_max_size to the decoded body
+        with mock.patch.object(compression, "MAX_REQUEST_BYTES", 1024 * 1024):
+            limited = TestClient(TestServer(async_app.create_app()))
+        await limited.start_server()
+        self.addAsyncCleanup(limited.close)
+        async with limited.post("/write/batch", data=BOMB, headers={"Content-Type": "application/json",
+                                                                    "Content-Encoding": "gzip"}) as response:
+            self.assertEqual(response.status, 413)
+
+    @unittest.skipIf(compression.zstandard is None, "needs zstandard")
+    async def test_oversized_zstd_body(self):
+        with mock.patch.object(compression, "MAX_REQUEST_BYTES", 1024):
+            async with self.post(compression.compress(b"\0" * 4096, "zstd"), "zstd", "/write/batch") as response:
+                self.assertEqual(response.status, 413)
+
+    async def test_large_responses_are_compressed(self):
+        async with self.async_client.get("/read", params={"path": "AI/Memory/Contexts/Large.md"},
+                                         headers={"Accept-Encoding": "gzip"}) as response:
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertEqual(await response.json(), {"AI/Memory/Contexts/Large.md": LARGE_NOTE})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Conversation Index Tests
+Per-agent conversation lists kept newest first across adds and removes, and
+/conversations/recent answering the same from the index and from a folder listing
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server_fixture import VaultTestCase, api  # noqa: E402
+from conversation_index import ConversationIndex, CONVERSATIONS_DIR, conversation_agent  # noqa: E402
+
+
+def conversation(agent, name):
+    return os.path.join(CONVERSATIONS_DIR, agent, name)
+
+
+CLAUDE_OLD = conversation("Claude", "20250101-Setup.md")
+CLAUDE_NEW = conversation("Claude", "20250301-0930-Subnets.md")
+CLAUDE_SAME_DAY = conversation("Claude", "20250301-1200-Peering.md")
+CLAUDE_UNDATED = conversation("Claude", "Scratch.md")
+GPT = conversation("GPT", "20250201-Storage.md")
+
+
+class ConversationAgentTest(unittest.TestCase):
+
+    def test_agent_of_a_path(self):
+        self.assertEqual(conversation_agent(CLAUDE_OLD), "Claude")
+        self.assertIsNone(conversation_agent(os.path.join(CONVERSATIONS_DIR, "20250101-Loose.md")))
+        self.assertIsNone(conversation_agent(os.path.join("AI", "Memory", "Contexts", "20250101-Setup.md")))
+        self.assertIsNone(conversation_agent(conversation("Claude", "20250101-Setup.txt")))
+
+
+class ConversationIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ConversationIndex()
+        self.index.rebuild([CLAUDE_OLD, CLAUDE_UNDATED, GPT, CLAUDE_NEW, "AI/Memory/Contexts/Other.md"])
+
+    def test_newest_first_with_undated_last(self):
+        self.assertTrue(self.index.ready)
+        self.assertEqual(self.index.recent("Claude"), [CLAUDE_NEW, CLAUDE_OLD, CLAUDE_UNDATED])
+        self.assertEqual(self.index.recent(), [CLAUDE_NEW, GPT, CLAUDE_OLD, CLAUDE_UNDATED])
+        self.assertEqual(self.index.recent(limit=2), [CLAUDE_NEW, GPT])
+        self.assertEqual(self.index.recent("Nobody"), [])
+
+    def test_add_keeps_order_and_ignores_duplicates(self):
+        self.index.add(CLAUDE_SAME_DAY)
+        self.index.add(CLAUDE_SAME_DAY)
+        self.index.add("AI/Memory/Contexts/Other.md")
+        self.assertEqual(self.index.recent("Claude"), [CLAUDE_SAME_DAY, CLAUDE_NEW, CLAUDE_OLD, CLAUDE_UNDATED])
+        self.assertEqual(self.index.stats(), {"ready": True, "conversations": 5, "agents": 2})
+
+    def test_remove_and_remove_tree(self):
+        self.index.remove(CLAUDE_NEW)
+        self.index.remove(CLAUDE_NEW)
+        self.assertEqual(self.index.recent("Claude"), [CLAUDE_OLD, CLAUDE_UNDATED])
+        self.index.remove_tree(os.path.join(CONVERSATIONS_DIR, "Claude") + os.sep)
+        self.assertEqual(self.index.recent(), [GPT])
+        self.index.remove(GPT)
+        self.assertEqual(self.index.stats(), {"ready": True, "conversations": 0, "agents": 0})
+
+
+NOTES = {path: "note\n" for path in (CLAUDE_OLD, CLAUDE_NEW, CLAUDE_UNDATED, GPT)}
+EXPECTED_ALL = [
+    {"path": CLAUDE_NEW, "date": "2025-03-01T09:30:00"},
+    {"path": GPT, "date": "2025-02-01T00:00:00"},
+    {"path": CLAUDE_OLD, "date": "2025-01-01T00:00:00"},
+    {"path": CLAUDE_UNDATED, "date": None},
+]
+
+
+class RecentConversationsRouteTest(VaultTestCase):
+    """Answered from a folder listing while the index builds"""
+
+    NOTES = NOTES
+
+    def recent(self, **params):
+        return self.client.get("/conversations/recent", query_string=params)
+
+    def test_all_agents_and_one_agent(self):
+        self.assertEqual(self.recent().get_json(), EXPECTED_ALL)
+        self.assertEqual(self.recent(agent="Claude", limit=2).get_json(), [EXPECTED_ALL[0], EXPECTED_ALL[2]])
+        self.assertEqual(self.recent(agent="Nobody").get_json(), [])
+
+    def test_invalid_agent_and_limit(self):
+        for agent in ("..", ".", "Claude/../..", "../Contexts"):
+            response = self.recent(agent=agent)
+            self.assertEqual(response.status_code, 400, agent)
+            self.assertIn("Invalid agent name", response.get_json()["error"])
+        self.assertEqual(self.recent(limit=-1).status_code, 400)
+        self.assertEqual(self.recent(limit="ten").status_code, 400)
+
+
+class IndexedRecentConversationsRouteTest(RecentConversationsRouteTest):
+    """Answered from the conversation index once built, and kept current by writes"""
+
+    INDEXED = True
+
+    def test_answered_from_the_index(self):
+        self.assertTrue(api.conversation_index.ready)
+        self.assertEqual(api.conversation_index.recent(), [entry["path"] for entry in EXPECTED_ALL])
+
+    def test_written_conversation_is_listed(self):
+        path = conversation("GPT", "20250401-Latest.md")
+        response = self.client.post("/write", json={"path": path.replace(os.sep, "/"), "content": "new\n"})
+        self.assertEqual(response.status_code, 200)
+        try:
+            self.assertEqual(self.recent(limit=1).get_json(), [{"path": path, "date": "2025-04-01T00:00:00"}])
+        finally:
+            os.remove(self.path(path))
+            api.conversation_index.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Conditional Request Tests
+ETags on /read, /search and /metadata answered with 304 Not Modified for a
+matching If-None-Match (weak, listed or carrying a compression coding), changed
+by writes, withheld while generations are not tracked, and reused by the client
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "adapters"))
+
+from server_fixture import VaultTestCase, api, start_server  # noqa: E402
+import universal_client as client  # noqa: E402
+
+try:
+    from aiohttp.test_utils import TestClient, TestServer
+    import async_app
+except ImportError:
+    async_app = None
+
+NETWORKING = "AI/Memory/Contexts/Networking.md"
+STORAGE = "AI/Memory/Contexts/Storage.md"
+NOTES = {
+    os.path.join("AI", "Memory", "Contexts", "Networking.md"): "# Subnets\nsubnet peering\n",
+    os.path.join("AI", "Memory", "Contexts", "Storage.md"): "blob storage\n" * 200,
+}
+
+
+class EtagMatchesTest(unittest.TestCase):
+
+    def test_weak_comparison(self):
+        for header in ('"abc"', 'W/"abc"', 'abc', '"x", W/"abc"', '*', '"abc-gzip"', 'W/"abc-zstd"'):
+            self.assertTrue(api.etag_matches(header, "abc"), header)
+        for header in ('"abcd"', '"abc-deflate"', '', None):
+            self.assertFalse(api.etag_matches(header, "abc"), header)
+        self.assertFalse(api.etag_matches('*', None))
+
+
+class ReadEtagTest(VaultTestCase):
+
+    NOTES = NOTES
+
+    def read(self, *paths, **headers):
+        return self.client.get("/read", query_string=[("path", path) for path in paths], headers=headers)
+
+    def test_revalidation(self):
+        response = self.read(NETWORKING)
+        etag = response.headers["ETag"]
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        self.assertFalse(etag.startswith("W/"))
+        for header in (etag, f"W/{etag}", f'"other", {etag}'):
+            not_modified = self.read(NETWORKING, **{"If-None-Match": header})
+            self.assertEqual(not_modified.status_code, 304, header)
+            self.assertEqual(not_modified.headers["ETag"], etag)
+            self.assertEqual(not_modified.get_data(), b"")
+
+    def test_writes_change_the_etag(self):
+        etag = self.read(STORAGE).headers["ETag"]
+        self.client.post("/write", json={"path": STORAGE, "content": "blob storage v2\n"})
+        response = self.read(STORAGE, **{"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.get_json(), {STORAGE: "blob storage v2\n"})
+        self.client.post("/write", json={"path": STORAGE, "content": NOTES[STORAGE.replace("/", os.sep)]})
+
+    def test_several_notes_and_missing_notes(self):
+        both = self.read(NETWORKING, STORAGE).headers["ETag"]
+        self.assertNotEqual(both, self.read(STORAGE, NETWORKING).headers["ETag"])
+        self.assertEqual(self.read(NETWORKING, STORAGE, **{"If-None-Match": both}).status_code, 304)
+        missing = self.read("AI/Memory/Missing.md")
+        self.assertEqual(missing.headers["ETag"], '"missing"')
+
+    def test_compressed_responses_carry_the_coding(self):
+        response = self.read(STORAGE, **{"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        etag = response.headers["ETag"]
+        self.assertTrue(etag.endswith('-gzip"'), etag)
+        self.assertEqual(self.read(STORAGE, **{"Accept-Encoding": "gzip", "If-None-Match": etag}).status_code, 304)
+        # The identity response revalidates against the compressed ETag too
+        self.assertEqual(self.read(STORAGE, **{"If-None-Match": etag}).status_code, 304)
+
+    def test_ndjson_responses_have_no_etag(self):
+        response = self.read(NETWORKING, Accept=api.NDJSON_MIMETYPE)
+        self.assertNotIn("ETag", response.headers)
+
+
+class UntrackedGenerationTest(VaultTestCase):
+    """Without the indexes and watcher, /search and /metadata cannot be revalidated"""
+
+    NOTES = NOTES
+
+    def test_no_etag_while_indexes_build(self):
+        for route, params in (("/search", {"query": "subnet"}), ("/metadata", {})):
+            response = self.client.get(route, query_string=params, headers={"If-None-Match": "*"})
+            self.assertEqual(response.status_code, 200, route)
+            self.assertNotIn("ETag", response.headers)
+
+
+class GenerationEtagTest(VaultTestCase):
+
+    NOTES = NOTES
+    INDEXED = True
+
+    def get(self, route, etag=None, **params):
+        return self.client.get(route, query_string=params, headers={"If-None-Match": etag} if etag else {})
+
+    def test_search_and_metadata_revalidate_until_a_write(self):
+        search_etag = self.get("/search", query="subnet").headers["ETag"]
+        metadata_etag = self.get("/metadata").headers["ETag"]
+        self.assertEqual(self.get("/search", search_etag, query="subnet").status_code, 304)
+        self.assertEqual(self.get("/metadata", metadata_etag).status_code, 304)
+
+        self.client.post("/write", json={"path": "AI/Memory/Contexts/New.md", "content": "subnet too\n"})
+        try:
+            response = self.get("/search", search_etag, query="subnet")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.get_json()), 2)
+            self.assertEqual(self.get("/metadata", metadata_etag).status_code, 200)
+        finally:
+            os.remove(self.path("AI/Memory/Contexts/New.md"))
+
+    def test_ndjson_search_has_no_etag(self):
+        response = self.client.get("/search", query_string={"query": "subnet"}, headers={"Accept": api.NDJSON_MIMETYPE})
+        self.assertNotIn("ETag", response.headers)
+
+
+class ClientRevalidationTest(VaultTestCase):
+
+    NOTES = NOTES
+
+    def test_cached_response_reused_on_304(self):
+        url, stop = start_server()
+        self.addCleanup(stop)
+        statuses = []
+        real_get = client.session.get
+
+        def get(*args, **kwargs):
+            response = real_get(*args, **kwargs)
+            statuses.append(response.status_code)
+            return response
+
+        with mock.patch.object(client, "SERVER_URL", url), mock.patch.object(client.session, "get", get), \
+                mock.patch.object(client, "validator_cache", client.OrderedDict()):
+            first = client.read_notes([NETWORKING])
+            self.assertEqual(client.read_notes([NETWORKING]), first)
+            self.client.post("/write", json={"path": NETWORKING, "content": "changed\n"})
+            self.assertEqual(client.read_notes([NETWORKING]), {NETWORKING: "changed\n"})
+        self.assertEqual(statuses, [200, 304, 200])
+
+
+@unittest.skipIf(async_app is None, "needs aiohttp")
+class AsyncEtagTest(VaultTestCase, unittest.IsolatedAsyncioTestCase):
+
+    NOTES = NOTES
+
+    async def test_read_revalidation_matches_flask(self):
+        async_client = TestClient(TestServer(async_app.create_app()))
+        await async_client.start_server()
+        self.addAsyncCleanup(async_client.close)
+        etag = self.client.get("/read", query_string={"path": STORAGE}).headers["ETag"]
+        # aiohttp's client asks for gzip unless told otherwise
+        async with async_client.get("/read", params={"path": STORAGE},
+                                    headers={"Accept-Encoding": "identity"}) as response:
+            self.assertEqual(response.headers["ETag"], etag)
+        async with async_client.get("/read", params={"path": STORAGE}, headers={"If-None-Match": etag}) as response:
+            self.assertEqual(response.status, 304)
+        async with async_client.get("/read", params={"path": STORAGE}, headers={"Accept-Encoding": "gzip"}) as response:
+            gzip_etag = response.headers["ETag"]
+            self.assertEqual(gzip_etag, etag[:-1] + '-gzip"')
+        async with async_client.get("/read", params={"path": STORAGE},
+                                    headers={"If-None-Match": f"W/{gzip_etag}"}) as response:
+            self.assertEqual(response.status, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Search Tests
+Bounded edit distance, trigram lookups of similar and containing words, typo
+tolerant searches ranked by similarity, and regex scans narrowed to notes that
+can match without ever dropping one that does
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import re
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server_fixture import VaultTestCase  # noqa: E402
+from ngram_index import NgramIndex, auto_edits, edit_distance, fold  # noqa: E402
+from search_index import SearchIndex  # noqa: E402
+
+
+def reference_distance(a, b):
+    """Optimal string alignment distance, computed in full"""
+    rows = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            rows[i][j] = min(rows[i - 1][j] + 1, rows[i][j - 1] + 1, rows[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                rows[i][j] = min(rows[i][j], rows[i - 2][j - 2] + 1)
+    return rows[-1][-1]
+
+
+class EditDistanceTest(unittest.TestCase):
+
+    def test_examples(self):
+        self.assertEqual(edit_distance("kubernetes", "kubernetes", 2), 0)
+        self.assertEqual(edit_distance("kubernets", "kubernetes", 2), 1)
+        self.assertEqual(edit_distance("teh", "the", 2), 1)
+        self.assertEqual(edit_distance("subnet", "sbunet", 1), 1)
+        self.assertEqual(edit_distance("", "abc", 3), 3)
+        # Beyond the limit the exact count does not matter
+        self.assertEqual(edit_distance("subnet", "storage", 2), 3)
+        self.assertEqual(edit_distance("a", "abcdef", 1), 2)
+
+    def test_matches_the_full_computation_within_the_limit(self):
+        rng = random.Random(25)
+        for _ in range(2000):
+            a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))
+            b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))
+            limit = rng.randint(0, 3)
+            expected = reference_distance(a, b)
+            self.assertEqual(edit_distance(a, b, limit), expected if expected <= limit else limit + 1, (a, b, limit))
+
+    def test_auto_edits_by_length(self):
+        self.assertEqual([auto_edits("x" * length) for length in (1, 2, 3, 5, 6, 12)], [0, 0, 1, 1, 2, 2])
+
+
+class NgramIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = NgramIndex()
+        for word in ("kubernetes", "subnet", "subnets", "peering", "strasse", "ſtate", "k8s", "go"):
+            self.index.add(word)
+
+    def test_similar_words_most_similar_first(self):
+        self.assertEqual([word for word, _ in self.index.similar("subnetz")], ["subnet", "subnets"])
+        self.assertEqual(self.index.similar("Kubernets")[0][0], "kubernetes")
+        self.assertAlmostEqual(self.index.similar("kubernets")[0][1], 0.9)
+        self.assertEqual(self.index.similar("peerign", 1), [("peering", 1 - 1 / 7)])
+        self.assertEqual(self.index.similar("peerign", 0), [])
+        self.assertEqual(self.index.similar("go"), [("go", 1.0)])
+        self.assertEqual(self.index.similar("gx"), [])
+
+    def test_containing(self):
+        self.assertEqual(self.index.containing("ubne"), {"subnet", "subnets"})
+        self.assertEqual(self.index.containing("NETS"), {"subnets"})
+        self.assertEqual(self.index.containing("state"), {"ſtate"})
+        self.assertEqual(self.index.containing("zzz"), set())
+
+    def test_remove(self):
+        self.index.remove("subnets")
+        self.assertEqual(self.index.containing("subnet"), {"subnet"})
+        self.index.remove("subnet")
+        self.assertNotIn("ubn", self.index.grams)
+
+    def test_fold(self):
+        self.assertEqual(fold("ſtate"), "state")
+        self.assertEqual(fold("KELVIN"), "kelvin")
+        self.assertEqual(fold("İstanbul"), "istanbul")
+
+
+NOTES = {
+    "Kubernetes.md": "Cluster notes with minikube and k8s\n",
+    "Networking.md": "resource azurerm_subnet.private in the private endpoint subnet\nvnet peering\n",
+    "Storage.md": "blob storage accounts and private endpoints\n",
+    "Peering.md": "hub and spoke topology\n",
+    "Logs.md": "error 404 at 12:30, retry 3 times\n",
+}
+
+
+class SearchIndexTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.vault = tempfile.mkdtemp()
+        cls.memory_path = os.path.join(cls.vault, "AI", "Memory")
+        os.makedirs(cls.memory_path)
+        for name, content in NOTES.items():
+            with open(os.path.join(cls.memory_path, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+        cls.index = SearchIndex(os.path.join(cls.vault, "search_index.json"))
+        cls.index.load(cls.vault)
+        cls.index.sync(cls.vault, cls.memory_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.vault)
+
+
+def note(name):
+    return os.path.join("AI", "Memory", name)
+
+
+class FuzzySearchTest(SearchIndexTestCase):
+
+    def paths(self, query, max_edits=None):
+        return [path for path, _, _ in self.index.fuzzy_search(query, max_edits)]
+
+    def test_typos_in_content_and_filenames(self):
+        self.assertEqual(self.paths("minikub"), [note("Kubernetes.md")])
+        self.assertEqual(self.paths("storgae"), [note("Storage.md")])
+        # "Peering" is also a filename word
+        self.assertEqual(self.paths("perring"), [note("Networking.md"), note("Peering.md")])
+
+    def test_every_word_must_match_and_scores_rank(self):
+        self.assertEqual(self.paths("privat endpont"), [note("Networking.md"), note("Storage.md")])
+        ranked = self.index.fuzzy_search("privat endpoints")
+        self.assertEqual([path for path, _, _ in ranked], [note("Storage.md"), note("Networking.md")])
+        self.assertGreater(ranked[0][1], ranked[1][1])
+        self.assertEqual(ranked[0][2], {"private", "endpoints"})
+        self.assertEqual(self.paths("private xyzzy"), [])
+
+    def test_edit_limit(self):
+        self.assertEqual(self.paths("storgae", 0), [])
+        self.assertEqual(self.paths("storage", 0), [note("Storage.md")])
+        self.assertEqual(self.paths("stroage", 1), [note("Storage.md")])
+
+    def test_no_words_or_index(self):
+        self.assertIsNone(self.index.fuzzy_search("!!"))
+        self.assertIsNone(SearchIndex(os.path.join(self.vault, "unbuilt.json")).fuzzy_search("storage"))
+
+
+class RegexCandidatesTest(SearchIndexTestCase):
+
+    REGEXES = [r"azurerm_\w+", r"sub(net|nets)\b", r"private\s+endpoint", r"k8s|minikube", r"error \d{3}",
+               r"hub.*spoke", r"STOR(age)?", r"peer(ing)?", r"\x62lob", r"(?i)NETWORK", r"kube[a-z]+", r"zzz+yyy"]
+
+    def scan(self, regex):
+        pattern = re.compile(regex, re.IGNORECASE)
+        return {note(name) for name, content in NOTES.items() if pattern.search(name) or pattern.search(content)}
+
+    def test_candidates_never_drop_a_match(self):
+        for regex in self.REGEXES:
+            pattern = re.compile(regex, re.IGNORECASE)
+            candidates = self.index.regex_candidates(regex, lambda name: pattern.search(name) is not None)
+            if candidates is not None:
+                self.assertLessEqual(self.scan(regex), candidates, regex)
+
+    def test_selective_regexes_are_narrowed(self):
+        candidates = self.index.regex_candidates(r"azurerm_\w+", lambda name: False)
+        self.assertEqual(candidates, {note("Networking.md")})
+        self.assertEqual(self.index.regex_candidates(r"zzz+yyy", lambda name: False), set())
+        self.assertEqual(self.index.regex_candidates(r"kube[a-z]+", lambda name: "kube" in name.lower()),
+                         {note("Kubernetes.md")})
+
+    def test_regexes_without_word_runs_are_not_narrowed(self):
+        for regex in (r".*", r"\d+", r"a.b", r"[a-z]{5}"):
+            self.assertIsNone(self.index.regex_candidates(regex, lambda name: False), regex)
+
+
+class FuzzyRouteTest(VaultTestCase):
+
+    INDEXED = True
+    NOTES = {note(name): content for name, content in NOTES.items()}
+
+    def search(self, **params):
+        return self.client.get("/search", query_string=params)
+
+    def test_fuzzy_parameter(self):
+        for value in ("auto", "true", "2", "on"):
+            self.assertEqual(self.search(query="storgae", fuzzy=value).get_json(), [note("Storage.md")], value)
+        self.assertEqual(self.search(query="storgae", fuzzy="0").get_json(), [])
+        self.assertEqual(self.search(query="storgae", fuzzy="false").get_json(), [])
+
+    def test_fuzzy_snippets_point_at_the_matched_words(self):
+        hits = self.search(query="storgae acounts", fuzzy="auto", snippets=1).get_json()
+        self.assertEqual(hits[0]["path"], note("Storage.md"))
+        self.assertEqual(hits[0]["snippets"][0]["line"], 1)
+        self.assertIn("storage", hits[0]["snippets"][0]["text"])
+
+    def test_invalid_fuzzy_searches(self):
+        for params in ({"query": "stor.ge", "fuzzy": "auto"}, {"query": "storage", "fuzzy": "3"},
+                       {"query": "storage", "fuzzy": "maybe"}):
+            response = self.search(**params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("fuzzy", response.get_json()["error"])
+
+
+class UnindexedFuzzyRouteTest(FuzzyRouteTest):
+    """While the index builds fuzzy searches are exact"""
+
+    INDEXED = False
+
+    def test_fuzzy_parameter(self):
+        self.assertEqual(self.search(query="storgae", fuzzy="auto").get_json(), [])
+        self.assertEqual(self.search(query="storage", fuzzy="auto").get_json(), [note("Storage.md")])
+
+    def test_fuzzy_snippets_point_at_the_matched_words(self):
+        hits = self.search(query="storage", fuzzy="auto", snippets=1).get_json()
+        self.assertIn("storage", hits[0]["snippets"][0]["text"])
+
+
+if __name__ == "__main__":
+    unittest.main()
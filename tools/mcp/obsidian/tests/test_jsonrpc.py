@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+JSON-RPC Tests
+The universal client's JSON-RPC dispatch against a live server, batches answered
+in order with runs of gets sharing one /read, and its persistent stdio mode
+answering many requests from one process
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import json
+import unittest
+import subprocess
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "adapters"))
+
+from server_fixture import VaultTestCase, start_server, read_file  # noqa: E402
+import universal_client as client  # noqa: E402
+
+CLIENT_SCRIPT = os.path.abspath(client.__file__)
+NOTES = {
+    os.path.join("AI", "Memory", "Contexts", "Networking.md"): "# Subnets\nsubnet peering\n",
+    os.path.join("AI", "Memory", "Contexts", "Storage.md"): "blob storage\n",
+}
+
+
+class LiveServerTestCase(VaultTestCase):
+    """Vault served over HTTP, with the client module pointed at it"""
+
+    NOTES = NOTES
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.url, cls.stop_server = start_server()
+        cls.saved_url = client.SERVER_URL
+        client.SERVER_URL = cls.url
+
+    @classmethod
+    def tearDownClass(cls):
+        client.SERVER_URL = cls.saved_url
+        cls.stop_server()
+        super().tearDownClass()
+
+
+class HandleJsonRpcTest(LiveServerTestCase):
+
+    def test_get_search_and_write(self):
+        self.assertEqual(client.handle_jsonrpc("get", {"path": "AI/Memory/Contexts/Storage.md"}), "blob storage\n")
+        self.assertEqual(client.handle_jsonrpc("search", {"query": "subnet"}),
+                         [os.path.join("AI", "Memory", "Contexts", "Networking.md")])
+        result = client.handle_jsonrpc("write", {"path": "AI/Memory/New.md", "content": "new\n"})
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(read_file(self.path("AI/Memory/New.md")), "new\n")
+
+    def test_invalid_params_and_unknown_methods(self):
+        self.assertEqual(client.handle_jsonrpc("get", {})["error"]["code"], -32602)
+        self.assertEqual(client.handle_jsonrpc("write", {"path": "a.md"})["error"]["code"], -32602)
+        self.assertEqual(client.handle_jsonrpc("delete", {"path": "a.md"})["error"]["code"], -32601)
+
+    def test_server_errors_become_jsonrpc_errors(self):
+        response = client.process_jsonrpc({"jsonrpc": "2.0", "id": 4, "method": "search", "params": {"query": "a("}})
+        self.assertEqual(response["id"], 4)
+        self.assertIn("error", response)
+        self.assertEqual(client.process_jsonrpc({"id": 5})["error"]["code"], -32600)
+        self.assertEqual(client.process_jsonrpc([1])["error"]["code"], -32600)
+
+
+class BatchTest(LiveServerTestCase):
+
+    def request(self, request_id, method, **params):
+        return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+
+    def test_responses_keep_batch_order(self):
+        batch = [self.request(1, "search", query="blob"), self.request(2, "get", path="AI/Memory/Contexts/Storage.md"),
+                 self.request(3, "nope"), self.request(4, "get", path="AI/Memory/Missing.md")]
+        responses = client.process_jsonrpc_batch(batch)
+        self.assertEqual([response["id"] for response in responses], [1, 2, 3, 4])
+        self.assertEqual(responses[1]["result"], "blob storage\n")
+        self.assertEqual(responses[2]["error"]["code"], -32601)
+        self.assertIn("error", responses[3])
+
+    def test_consecutive_gets_share_one_read(self):
+        paths = ["AI/Memory/Contexts/Storage.md", "AI/Memory/Contexts/Networking.md"]
+        batch = [self.request(i, "get", path=paths[i % 2]) for i in range(4)] + [self.request(9, "search", query="x")]
+        with mock.patch.object(client, "read_notes", wraps=client.read_notes) as read_notes:
+            responses = client.process_jsonrpc_batch(batch)
+        read_notes.assert_called_once_with(paths * 2)
+        self.assertEqual([response["result"] for response in responses[:2]],
+                         ["blob storage\n", "# Subnets\nsubnet peering\n"])
+
+    def test_notifications_and_invalid_members(self):
+        notification = {"jsonrpc": "2.0", "method": "search", "params": {"query": "blob"}}
+        self.assertIsNone(client.process_jsonrpc_batch([notification]))
+        responses = client.process_jsonrpc_batch([notification, 7, self.request(1, "search", query="blob")])
+        self.assertEqual(responses[0]["error"]["code"], -32600)
+        self.assertEqual(responses[1]["id"], 1)
+        self.assertEqual(client.process_jsonrpc_batch([])["error"]["code"], -32600)
+
+
+class StdioModeTest(LiveServerTestCase):
+
+    def run_stdio(self, lines):
+        env = dict(os.environ, MCP_SERVER_URL=self.url)
+        env.pop("MCP_SOCKET", None)
+        completed = subprocess.run([sys.executable, CLIENT_SCRIPT, "--jsonrpc-stdio"], input="\n".join(lines) + "\n",
+                                   capture_output=True, text=True, env=env, timeout=60)
+        return [json.loads(line) for line in completed.stdout.splitlines()]
+
+    def test_one_process_answers_every_request(self):
+        requests = [{"jsonrpc": "2.0", "id": i, "method": "get", "params": {"path": "AI/Memory/Contexts/Storage.md"}}
+                    for i in range(20)]
+        responses = self.run_stdio([json.dumps(request) for request in requests])
+        self.assertEqual(sorted(response["id"] for response in responses), list(range(20)))
+        self.assertTrue(all(response["result"] == "blob storage\n" for response in responses))
+
+    def test_parse_errors_and_notifications(self):
+        responses = self.run_stdio([
+            "{not json",
+            json.dumps({"jsonrpc": "2.0", "method": "search", "params": {"query": "subnet"}}),
+            "",
+            json.dumps({"jsonrpc": "2.0", "id": "b", "method": "nope"}),
+        ])
+        self.assertEqual(sorted(response["error"]["code"] for response in responses), [-32700, -32601])
+
+    def test_batch_line_gets_one_array(self):
+        responses = self.run_stdio([json.dumps([
+            {"jsonrpc": "2.0", "id": "a", "method": "search", "params": {"query": "blob"}},
+            {"jsonrpc": "2.0", "method": "search", "params": {"query": "blob"}},
+            {"jsonrpc": "2.0", "id": "b", "method": "nope"}])])
+        self.assertEqual(len(responses), 1)
+        self.assertEqual([response["id"] for response in responses[0]], ["a", "b"])
+        self.assertEqual(responses[0][0]["result"], [os.path.join("AI", "Memory", "Contexts", "Storage.md")])
+
+
+if __name__ == "__main__":
+    unittest.main()
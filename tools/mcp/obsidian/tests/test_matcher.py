@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Matcher Tests
+Compiled query cache, plain-text matching without the regex engine, and literal
+extraction behind the trigram regex prefilter: every match of a regex must
+contain all literals of one of the returned alternatives
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from matcher import required_literals, QueryMatcher, MatcherCache  # noqa: E402
+
+
+class QueryMatcherTest(unittest.TestCase):
+
+    def test_plain_text_skips_the_regex_engine(self):
+        matcher = QueryMatcher("C# notes")
+        self.assertTrue(matcher.literal)
+        self.assertIsNone(matcher.pattern)
+        self.assertTrue(matcher.search("my c# Notes here"))
+        self.assertFalse(matcher.search("C notes"))
+
+    def test_plain_text_folds_case_like_the_regex(self):
+        self.assertTrue(QueryMatcher("strasse").search("Die Straße"))
+        self.assertTrue(QueryMatcher("Straße").search("STRASSE"))
+        self.assertTrue(QueryMatcher("KUBE").search("kubernetes"))
+
+    def test_regex_queries(self):
+        matcher = QueryMatcher(r"snet_app_\d+")
+        self.assertFalse(matcher.literal)
+        self.assertTrue(matcher.search("Subnet SNET_APP_0142"))
+        self.assertFalse(matcher.search("snet_app_x"))
+
+    def test_spans_of_plain_text(self):
+        self.assertEqual(list(QueryMatcher("kube").spans("Kube and kubelet")), [(0, 4), (9, 13)])
+        # Offsets are in the original text even where case folding changes its length
+        self.assertEqual(list(QueryMatcher("ab").spans("ß ab")), [(2, 4)])
+
+    def test_empty_matches_are_not_spans(self):
+        self.assertEqual(list(QueryMatcher("x*").spans("axb")), [(1, 2)])
+
+
+class MatcherCacheTest(unittest.TestCase):
+
+    def test_returns_the_compiled_matcher(self):
+        cache = MatcherCache()
+        first = cache.get("kube.*")
+        self.assertIs(cache.get("kube.*"), first)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = MatcherCache(max_size=2)
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        cache.get("c")
+        self.assertEqual(list(cache.matchers), ["a", "c"])
+
+    def test_invalid_regex_raises_and_is_not_cached(self):
+        cache = MatcherCache()
+        with self.assertRaises(re.error):
+            cache.get("kube(")
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+class RequiredLiteralsTest(unittest.TestCase):
+
+    def assertLiterals(self, pattern, expected):
+        self.assertEqual(required_literals(pattern), expected, pattern)
+
+    def test_plain_and_escaped_punctuation(self):
+        self.assertLiterals("azurerm", [["azurerm"]])
+        self.assertLiterals(r"key\.vault", [["key.vault"]])
+
+    def test_class_escapes_end_a_literal(self):
+        self.assertLiterals(r"snet_app_01\d\d", [["snet_app_01"]])
+        self.assertLiterals(r"ab\wcd\bef", [["ab", "cd", "ef"]])
+
+    def test_code_point_escapes_drop_their_operands(self):
+        for pattern in (r"\x61zurerm", r"\u0061zurerm", r"\U00000061zurerm",
+                        r"\N{LATIN SMALL LETTER A}zurerm", r"\141zurerm", r"\0zurerm", r"\01zurerm"):
+            self.assertLiterals(pattern, [["zurerm"]])
+
+    def test_backreferences_drop_their_digits(self):
+        self.assertLiterals(r"(a)\1zurerm", [["zurerm"]])
+        self.assertLiterals(r"(a)(b)(c)(d)(e)(f)(g)(h)(i)(j)(k)(l)\12zurerm", [["zurerm"]])
+
+    def test_octal_escape_keeps_following_digits(self):
+        # \0 takes at most two more octal digits, so the 8 is a literal
+        self.assertLiterals(r"\08ab", [["8ab"]])
+
+    def test_alternation_and_groups(self):
+        self.assertLiterals("subnet|peering", [["subnet"], ["peering"]])
+        self.assertLiterals("foo|bar(baz|qux)zip", [["foo"], ["bar", "zip"]])
+        self.assertLiterals(r"module\.aks_cluster_0(1|2)", [["module.aks_cluster_0"]])
+
+    def test_quantifiers_drop_optional_characters(self):
+        self.assertLiterals("a(b|c)d+e?f", [["a", "d", "f"]])
+        self.assertLiterals("colou?r", [["colo", "r"]])
+        self.assertLiterals("ab{2}c", [["a", "c"]])
+        self.assertLiterals("st*ate", [["s", "ate"]])
+
+    def test_classes_and_anchors_end_a_literal(self):
+        self.assertLiterals("^# [a-z]+ log$", [["# ", " log"]])
+        self.assertLiterals(r"ab[\]x]cd", [["ab", "cd"]])
+
+    def test_verbose_patterns_are_not_narrowed(self):
+        self.assertIsNone(required_literals("(?x) terraform  state"))
+
+    def test_matches_contain_the_literals(self):
+        texts = ["azurerm_subnet", "private endpoint", "aks_cluster_01", "colour log", "abbc", "\x00zurerm"]
+        for pattern in (r"\x61zurerm", r"\141zurerm", r"(a)\1zurerm", r"\0zurerm", "colou?r", "ab{2}c",
+                        r"aks_cluster_0(1|2)", "private|public", r"end\w+"):
+            for text in texts:
+                match = re.search(pattern, text, re.IGNORECASE)
+                if match:
+                    found = match.group().lower()
+                    self.assertTrue(any(all(literal.lower() in found for literal in literals)
+                                        for literals in required_literals(pattern)), (pattern, text))
+
+
+if __name__ == "__main__":
+    unittest.main()
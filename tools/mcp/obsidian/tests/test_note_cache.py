@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Note Cache Tests
+Cached content is returned only while the file is unchanged, and the cache stays
+within its byte budget by evicting the least recently used notes
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from note_cache import NoteCache  # noqa: E402
+
+
+class NoteCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def note(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_repeated_reads_hit(self):
+        cache = NoteCache()
+        path = self.note("a.md", "alpha\n")
+        self.assertEqual(cache.read(path), "alpha\n")
+        self.assertEqual(cache.read(path), "alpha\n")
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (1, 1))
+
+    def test_changed_file_is_read_again(self):
+        cache = NoteCache()
+        path = self.note("a.md", "alpha\n")
+        cache.read(path)
+        stat = os.stat(path)
+        self.note("a.md", "gamma\n")
+        # Same size, and an mtime only a nanosecond later
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertEqual(cache.read(path), "gamma\n")
+
+    def test_replaced_file_is_read_again(self):
+        cache = NoteCache()
+        path = self.note("a.md", "alpha\n")
+        cache.read(path)
+        stat = os.stat(path)
+        replacement = self.note("b.md", "omega\n")
+        os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(replacement, path)
+        self.assertEqual(cache.read(path), "omega\n")
+
+    def test_deleted_file_raises(self):
+        cache = NoteCache()
+        path = self.note("a.md", "alpha\n")
+        cache.read(path)
+        os.remove(path)
+        with self.assertRaises(FileNotFoundError):
+            cache.read(path)
+
+    def test_evicts_least_recently_used_within_budget(self):
+        cache = NoteCache(max_bytes=25)
+        paths = [self.note(f"{name}.md", name * 10) for name in "abc"]
+        cache.read(paths[0])
+        cache.read(paths[1])
+        cache.read(paths[0])  # b is now the least recently used
+        cache.read(paths[2])
+        self.assertEqual(set(cache.entries), {paths[0], paths[2]})
+        self.assertLessEqual(cache.current_bytes, 25)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_oversized_note_is_not_cached(self):
+        cache = NoteCache(max_bytes=5)
+        path = self.note("big.md", "x" * 10)
+        self.assertEqual(cache.read(path), "x" * 10)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_invalidate_tree(self):
+        cache = NoteCache()
+        os.makedirs(os.path.join(self.directory, "sub"))
+        inside = self.note(os.path.join("sub", "a.md"), "a")
+        beside = self.note("sub-notes.md", "b")
+        cache.read(inside)
+        cache.read(beside)
+        cache.invalidate_tree(os.path.join(self.directory, "sub"))
+        self.assertEqual(list(cache.entries), [beside])
+        self.assertEqual(cache.current_bytes, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
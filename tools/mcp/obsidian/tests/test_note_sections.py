@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Note Section Tests
+Heading parsing and section lookup (levels, fences, frontmatter), replace,
+append and prepend patches keeping line endings and spacing, and the /append
+and /patch routes including missing notes and sections
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server_fixture import VaultTestCase, api, read_file, write_file  # noqa: E402
+from note_sections import parse_heading, find_section, patch_section  # noqa: E402
+
+NOTE = """---
+# a YAML comment, not a heading
+title: Plan
+---
+# Plan
+Intro
+
+## Actions
+- one
+
+```
+## Not a heading
+```
+
+### Details
+detail
+
+## Notes
+last"""
+
+
+class FindSectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lines = NOTE.splitlines(keepends=True)
+
+    def section(self, heading):
+        found = find_section(self.lines, heading)
+        return "".join(self.lines[found[0]:found[1]]) if found else None
+
+    def test_parse_heading(self):
+        self.assertEqual(parse_heading("## Actions"), (2, "Actions"))
+        self.assertEqual(parse_heading("  ### Details ###  "), (3, "Details"))
+        self.assertEqual(parse_heading("Actions"), (None, "Actions"))
+        self.assertEqual(parse_heading("#hashtag"), (None, "#hashtag"))
+        self.assertEqual(parse_heading("##"), (2, ""))
+
+    def test_section_ends_at_the_next_heading_of_the_same_level(self):
+        self.assertEqual(self.section("## Actions"),
+                         "## Actions\n- one\n\n```\n## Not a heading\n```\n\n### Details\ndetail\n\n")
+        self.assertEqual(self.section("details"), "### Details\ndetail\n\n")
+        self.assertEqual(self.section("Notes"), "## Notes\nlast")
+        self.assertTrue(self.section("# Plan").endswith("last"))
+
+    def test_section_not_found(self):
+        self.assertIsNone(self.section("### Actions"))
+        self.assertIsNone(self.section("Not a heading"))
+        self.assertIsNone(self.section("a YAML comment, not a heading"))
+        self.assertIsNone(self.section("Missing"))
+        self.assertIsNone(find_section([], "Plan"))
+
+    def test_unclosed_frontmatter_is_body(self):
+        self.assertEqual(find_section(["---\n", "# Title\n", "text\n"], "Title"), (1, 3))
+
+    def test_fences_only_close_with_the_same_marker(self):
+        lines = ["## A\n", "~~~\n", "```\n", "## B\n", "~~~\n", "## C\n"]
+        self.assertEqual(find_section(lines, "A"), (0, 5))
+        self.assertIsNone(find_section(lines, "B"))
+
+
+class PatchSectionTest(unittest.TestCase):
+
+    def test_replace_keeps_the_heading_and_spacing(self):
+        patched = patch_section(NOTE, "## Actions", "- two")
+        self.assertIn("## Actions\n- two\n\n## Notes\nlast", patched)
+        self.assertTrue(patched.startswith(NOTE[:NOTE.index("## Actions")]))
+
+    def test_append_and_prepend(self):
+        self.assertIn("### Details\ndetail\nmore\n\n## Notes", patch_section(NOTE, "Details", "more", "append"))
+        self.assertIn("### Details\nfirst\ndetail\n\n", patch_section(NOTE, "Details", "first\n", "prepend"))
+        # The last section of a note without a final newline
+        self.assertTrue(patch_section(NOTE, "Notes", "more", "append").endswith("## Notes\nlast\nmore\n"))
+
+    def test_heading_only_section(self):
+        self.assertEqual(patch_section("# A", "A", "body"), "# A\nbody\n")
+        self.assertEqual(patch_section("# A\n\n# B\n", "A", "", "replace"), "# A\n\n# B\n")
+
+    def test_crlf_line_endings_are_kept(self):
+        content = "# A\r\nold\r\n\r\n# B\r\nb\r\n"
+        self.assertEqual(patch_section(content, "A", "new"), "# A\r\nnew\r\n\r\n# B\r\nb\r\n")
+        self.assertEqual(patch_section(content, "B", "c", "append"), "# A\r\nold\r\n\r\n# B\r\nb\r\nc\r\n")
+
+    def test_section_not_found_and_bad_operation(self):
+        self.assertIsNone(patch_section(NOTE, "Missing", "x"))
+        with self.assertRaises(ValueError):
+            patch_section(NOTE, "Actions", "x", "delete")
+
+
+class AppendPatchRouteTest(VaultTestCase):
+
+    INDEXED = True
+    PLAN = os.path.join("AI", "Memory", "Projects", "Plan.md")
+    NOTES = {PLAN: NOTE}
+
+    def setUp(self):
+        write_file(self.path(self.PLAN), NOTE)
+        api.note_cache.clear()
+
+    def post(self, route, **body):
+        return self.client.post(route, json=body)
+
+    def search(self, query):
+        return self.client.get("/search", query_string={"query": query}).get_json()
+
+    def test_patch_changes_one_section_and_reindexes(self):
+        response = self.post("/patch", path="AI/Memory/Projects/Plan.md", heading="### Details", content="rollout",
+                             operation="append")
+        self.assertEqual(response.get_json(), {"status": "success", "path": "AI/Memory/Projects/Plan.md",
+                                               "heading": "### Details"})
+        self.assertIn("detail\nrollout\n\n## Notes", read_file(self.path(self.PLAN)))
+        self.assertEqual(self.search("rollout"), [self.PLAN])
+        self.assertEqual(self.client.get("/read", query_string={"path": "AI/Memory/Projects/Plan.md"}).get_json(),
+                         {"AI/Memory/Projects/Plan.md": read_file(self.path(self.PLAN))})
+
+    def test_patch_errors(self):
+        cases = [
+            ({"path": "AI/Memory/Projects/Plan.md", "heading": "Missing", "content": "x"}, 404, "Section not found"),
+            ({"path": "AI/Memory/Projects/Gone.md", "heading": "Plan", "content": "x"}, 404, "Note not found"),
+            ({"path": "AI/Memory/Projects/Plan.md", "heading": "Plan", "content": "x", "operation": "delete"}, 400,
+             "operation must be one of"),
+            ({"path": "AI/Memory/Projects/Plan.md", "content": "x"}, 400, "required"),
+        ]
+        for body, status, message in cases:
+            response = self.post("/patch", **body)
+            self.assertEqual(response.status_code, status, body)
+            self.assertIn(message, response.get_json()["error"])
+        self.assertEqual(read_file(self.path(self.PLAN)), NOTE)
+        self.assertFalse(os.path.exists(self.path(os.path.join("AI", "Memory", "Projects", "Gone.md"))))
+
+    def test_patch_method(self):
+        response = self.client.patch("/patch", json={"path": "AI/Memory/Projects/Plan.md", "heading": "Notes",
+                                                     "content": "replaced"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(read_file(self.path(self.PLAN)).endswith("## Notes\nreplaced\n"))
+
+    def test_append_creates_and_extends_notes(self):
+        path = "AI/Memory/Conversations/Claude/20250301-Log.md"
+        first = self.post("/append", path=path, content="first entry")
+        self.assertEqual(first.get_json(), {"status": "success", "path": path, "size": len("first entry")})
+        self.post("/append", path=path, content="second entry\n")
+        self.assertEqual(read_file(self.path(path)), "first entry\nsecond entry\n")
+        self.assertEqual(self.search("second entry"), [path.replace("/", os.sep)])
+        self.assertEqual(self.post("/append", path=path).status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Note Writer Tests
+Atomic replacement that never leaves a truncated note or temporary files,
+group commits sharing one fsync pass, batches with per-item errors, and the
+write journal replaying writes a crashed process left unfinished
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+import subprocess
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server_fixture import VaultTestCase, api, write_file, read_file  # noqa: E402
+import note_writer  # noqa: E402
+from note_writer import NoteWriter, GroupCommit, WriteJournal, remove_temp_files  # noqa: E402
+
+
+class TempDirTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def listing(self, directory=None):
+        return sorted(os.listdir(directory or self.dir))
+
+
+class AtomicWriteTest(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.writer = NoteWriter("fsync")
+        self.note = os.path.join(self.dir, "note.md")
+        write_file(self.note, "old\n")
+
+    def test_write_replaces_the_note(self):
+        with open(self.note, 'r', encoding='utf-8') as reader:
+            stat = self.writer.write(self.note, "new\r\ncontent\n")
+            # A reader that opened the note before keeps the old file, never a truncated one
+            self.assertEqual(reader.read(), "old\n")
+        self.assertEqual(read_file(self.note), "new\r\ncontent\n")
+        self.assertEqual(stat.st_size, len("new\r\ncontent\n"))
+        self.assertEqual(self.listing(), ["note.md"])
+
+    def test_failed_write_leaves_the_note_and_no_temp_file(self):
+        with self.assertRaises(UnicodeEncodeError):
+            self.writer.write(self.note, "bad \ud800 surrogate")
+        self.assertEqual(read_file(self.note), "old\n")
+        self.assertEqual(self.listing(), ["note.md"])
+
+    def test_write_creates_folders_and_calls_apply_under_the_lock(self):
+        note = os.path.join(self.dir, "a", "b", "new.md")
+        seen = []
+        self.writer.write(note, "x", apply=lambda: seen.append((read_file(note), note in self.writer.path_locks)))
+        self.assertEqual(seen, [("x", True)])
+        self.assertEqual(self.writer.path_locks, {})
+
+    def test_update_transforms_the_current_content(self):
+        self.assertEqual(self.writer.update(self.note, lambda current: current + "more\n"), "old\nmore\n")
+        missing = os.path.join(self.dir, "missing.md")
+        self.assertEqual(self.writer.update(missing, lambda current: repr(current)), "None")
+
+    def test_update_aborted_by_the_transform(self):
+        def transform(current):
+            raise ValueError("no")
+        with self.assertRaises(ValueError):
+            self.writer.update(self.note, transform)
+        self.assertEqual(read_file(self.note), "old\n")
+        self.assertEqual(self.listing(), ["note.md"])
+
+    def test_concurrent_updates_lose_nothing(self):
+        def add_line(i):
+            self.writer.update(self.note, lambda current: current + f"{i}\n")
+        threads = [threading.Thread(target=add_line, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(read_file(self.note).split()), sorted(["old"] + [str(i) for i in range(20)]))
+
+    def test_append_adds_a_missing_newline(self):
+        write_file(self.note, "no newline")
+        self.assertEqual(self.writer.append(self.note, "next\n"), len("no newline\nnext\n"))
+        self.writer.append(self.note, "last")
+        self.assertEqual(read_file(self.note), "no newline\nnext\nlast")
+        created = os.path.join(self.dir, "sub", "created.md")
+        self.writer.append(created, "first\n")
+        self.assertEqual(read_file(created), "first\n")
+
+    def test_sync_modes(self):
+        with self.assertRaises(ValueError):
+            NoteWriter("sometimes")
+        with mock.patch.object(note_writer.os, "fsync") as fsync:
+            NoteWriter("none").write(self.note, "a")
+            fsync.assert_not_called()
+            NoteWriter("fsync").write(self.note, "b")
+            self.assertGreaterEqual(fsync.call_count, 2)  # the file and its directory
+
+
+class GroupCommitTest(TempDirTestCase):
+
+    def test_concurrent_writers_share_one_commit(self):
+        group = GroupCommit(window=0.5)
+        fds = [os.open(os.path.join(self.dir, name), os.O_CREAT | os.O_RDWR) for name in ("a", "b")]
+        self.addCleanup(lambda: [os.close(fd) for fd in fds])
+        errors = []
+
+        def sync(fd):
+            try:
+                group.sync(fds=[fd], directory=self.dir)
+            except Exception as e:
+                errors.append(e)
+
+        group.begin()
+        group.begin()
+        with mock.patch.object(note_writer.os, "fsync") as fsync:
+            leader = threading.Thread(target=sync, args=(fds[0],))
+            leader.start()
+            while not group.batch.led:
+                time.sleep(0.001)
+            # Joins the batch while the leader waits for other writers
+            follower = threading.Thread(target=sync, args=(fds[1],))
+            follower.start()
+            leader.join()
+            follower.join()
+        self.assertEqual(errors, [])
+        self.assertEqual((group.commits, group.requests), (1, 2))
+        synced = [call.args[0] for call in fsync.call_args_list]
+        self.assertEqual(sorted(synced[:2]), sorted(fds))
+        self.assertEqual(len(synced), 3)  # one pass over both files and the shared directory
+
+    def test_lone_writer_does_not_wait(self):
+        group = GroupCommit(window=10)
+        group.begin()
+        started = time.monotonic()
+        group.sync(directory=self.dir)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_errors_reach_every_writer_in_the_batch(self):
+        group = GroupCommit(window=0.5)
+        errors = []
+
+        def sync():
+            try:
+                group.sync(fds=[12345])
+            except OSError as e:
+                errors.append(e)
+
+        group.begin()
+        group.begin()
+        with mock.patch.object(note_writer.os, "fsync", side_effect=OSError("disk gone")):
+            threads = [threading.Thread(target=sync)]
+            threads[0].start()
+            while not group.batch.led:
+                time.sleep(0.001)
+            threads.append(threading.Thread(target=sync))
+            threads[1].start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual([str(e) for e in errors], ["disk gone", "disk gone"])
+
+    def test_writer_stats_count_group_commits(self):
+        writer = NoteWriter("group")
+        with mock.patch.object(note_writer.os, "fsync"):
+            for i in range(3):
+                writer.write(os.path.join(self.dir, f"{i}.md"), "x")
+        stats = writer.stats()
+        self.assertEqual((stats["sync_mode"], stats["writes"]), ("group", 3))
+        self.assertEqual(stats["sync_requests"], 6)  # file, then directory, for each write
+        self.assertEqual(stats["group_commits"], 6)
+
+
+class WriteBatchTest(TempDirTestCase):
+
+    def test_per_item_results_and_order_within_a_path(self):
+        writer = NoteWriter("none")
+        os.makedirs(os.path.join(self.dir, "folder.md"))
+        note = os.path.join(self.dir, "a.md")
+        items = [(note, "first", "a.md"), (os.path.join(self.dir, "folder.md"), "x", "folder.md"),
+                 (os.path.join(self.dir, "b.md"), "b", "b.md"), (note, "second", "a.md")]
+        applied = []
+        results = writer.write_batch(items, apply=applied.append, workers=4)
+        self.assertIsInstance(results[1], OSError)
+        self.assertEqual([result.st_size for index, result in enumerate(results) if index != 1], [5, 1, 6])
+        self.assertEqual(read_file(note), "second")
+        self.assertEqual([(path, content) for path, content, _ in applied[0]],
+                         [(note, "first"), (os.path.join(self.dir, "b.md"), "b"), (note, "second")])
+        self.assertEqual(self.listing(), ["a.md", "b.md", "folder.md"])
+
+    def test_empty_batch(self):
+        applied = []
+        self.assertEqual(NoteWriter("none").write_batch([], apply=applied.append), [])
+        self.assertEqual(applied, [[]])
+
+
+def dead_pid():
+    """PID of a process that has exited"""
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    child.wait()
+    return child.pid
+
+
+class WriteJournalTest(TempDirTestCase):
+
+    def journal_records(self, journal):
+        with open(journal.journal_file, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_records_until_done_and_clean_close(self):
+        journal = WriteJournal(os.path.join(self.dir, "journal"))
+        self.assertEqual(journal.open(), [])
+        self.assertIsNone(WriteJournal(self.dir).begin("unopened.md"))
+        record_id = journal.begin("a.md")
+        self.assertEqual(self.journal_records(journal), [{"op": "begin", "id": 0, "path": "a.md"}])
+        journal.done(record_id)
+        journal.done(None)
+        self.assertEqual(self.journal_records(journal)[-1], {"op": "done", "id": 0})
+        journal.close()
+        self.assertFalse(os.path.exists(journal.journal_file))
+
+    def test_pending_writes_keep_the_journal(self):
+        journal = WriteJournal(self.dir)
+        journal.open()
+        journal.begin("a.md")
+        journal.close()
+        self.assertTrue(os.path.exists(journal.journal_file))
+        self.assertEqual(WriteJournal(self.dir).open(), ["a.md"])
+
+    def test_unfinished_writes_of_dead_processes_are_replayed(self):
+        crashed = os.path.join(self.dir, f"write_journal.{dead_pid()}.log")
+        with open(crashed, 'w', encoding='utf-8') as f:
+            for record in ({"op": "begin", "id": 0, "path": "done.md"}, {"op": "begin", "id": 1, "path": "b.md"},
+                           {"op": "done", "id": 0}, {"op": "begin", "id": 2, "path": "a.md"}):
+                f.write(json.dumps(record) + "\n")
+            f.write('{"op": "begin", "id": 3, "pa')  # torn by the crash
+        live = os.path.join(self.dir, f"write_journal.{os.getppid()}.log")
+        with open(live, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"op": "begin", "id": 0, "path": "live.md"}) + "\n")
+        write_file(os.path.join(self.dir, "other.log"), "not a journal")
+
+        journal = WriteJournal(self.dir)
+        self.assertEqual(journal.open(), ["a.md", "b.md"])
+        self.assertEqual(self.listing(), sorted(["other.log", os.path.basename(live),
+                                                 os.path.basename(journal.journal_file)]))
+        journal.close()
+
+    def test_compaction_once_nothing_is_pending(self):
+        journal = WriteJournal(self.dir)
+        journal.open()
+        with mock.patch.object(note_writer, "JOURNAL_COMPACT_BYTES", 100):
+            first, second = journal.begin("a" * 80 + ".md"), journal.begin("b.md")
+            journal.done(first)
+            self.assertGreater(os.path.getsize(journal.journal_file), 100)
+            journal.done(second)
+        self.assertEqual(os.path.getsize(journal.journal_file), 0)
+        journal.close()
+
+    def test_writer_journals_until_apply_returns(self):
+        writer = NoteWriter("none", journal_dir=os.path.join(self.dir, "journal"))
+        writer.journal.open()
+        note = os.path.join(self.dir, "note.md")
+        seen = []
+        writer.write(note, "x", rel_path="note.md", apply=lambda: seen.append(sorted(writer.journal.pending)))
+        self.assertEqual(seen, [[0]])
+        self.assertEqual(writer.journal.pending, set())
+        with self.assertRaises(RuntimeError):
+            writer.write(note, "y", rel_path="note.md", apply=mock.Mock(side_effect=RuntimeError("crash")))
+        self.assertEqual(writer.journal.pending, {1})
+        writer.journal.close()
+
+
+class RemoveTempFilesTest(TempDirTestCase):
+
+    def test_only_note_temp_files_are_removed(self):
+        for name in (".a.md.0123.tmp", os.path.join("sub", ".b.md.4567.tmp"), "c.md", ".other.tmp", "d.md.tmp"):
+            write_file(os.path.join(self.dir, name), "x")
+        self.assertEqual(remove_temp_files(self.dir), 2)
+        self.assertEqual(self.listing(), [".other.tmp", "c.md", "d.md.tmp", "sub"])
+        self.assertEqual(self.listing(os.path.join(self.dir, "sub")), [])
+
+
+class RecoverInterruptedWritesTest(VaultTestCase):
+
+    NOTES = {os.path.join("AI", "Memory", "Contexts", "Networking.md"): "subnet\n"}
+    INDEXED = True
+
+    def test_interrupted_write_is_reindexed(self):
+        # The crash came after the rename but before the index update
+        api.stop_vault_watcher()
+        path = os.path.join("AI", "Memory", "Contexts", "Networking.md")
+        write_file(self.path(path), "peering\n")
+        leftover = self.path(os.path.join("AI", "Memory", "Contexts", ".Other.md.0123.tmp"))
+        write_file(leftover, "half")
+        self.assertEqual(self.client.get("/search", query_string={"query": "peering"}).get_json(), [])
+
+        with mock.patch.object(api, "interrupted_writes", [path]), mock.patch("builtins.print"):
+            api.recover_interrupted_writes()
+        self.assertEqual(self.client.get("/search", query_string={"query": "peering"}).get_json(), [path])
+        self.assertFalse(os.path.exists(leftover))
+
+
+if __name__ == "__main__":
+    unittest.main()
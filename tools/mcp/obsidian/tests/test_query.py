@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Frontmatter Query Tests
+Frontmatter parsing (including malformed blocks), the columnar query index kept
+by updates and removes, and /query answering the same from the index and from
+parsing every note
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import datetime
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server_fixture import VaultTestCase, api  # noqa: E402
+from frontmatter import parse_frontmatter, parse_date  # noqa: E402
+from query_index import QueryIndex  # noqa: E402
+
+
+class ParseFrontmatterTest(unittest.TestCase):
+
+    def test_scalars_lists_and_quotes(self):
+        content = ("---\n"
+                   "title: \"Subnets: a plan\"\n"
+                   "Agent: Claude  # who wrote it\n"
+                   "date: 2025-03-01 09:30\n"
+                   "tags: [azure, '#networking', ]\n"
+                   "status: 'draft'\n"
+                   "other: ignored\n"
+                   "---\n"
+                   "# Body\n")
+        self.assertEqual(parse_frontmatter(content), {
+            "title": "Subnets: a plan", "agent": "Claude", "date": "2025-03-01 09:30",
+            "tags": ["azure", "networking"], "status": "draft"})
+
+    def test_block_lists_and_comma_separated_tags(self):
+        self.assertEqual(parse_frontmatter("---\ntags:\n  - azure\n  - \"#vnet\"\n# comment\n\n---\n")["tags"],
+                         ["azure", "vnet"])
+        self.assertEqual(parse_frontmatter("---\ntags: azure, vnet\n---\n")["tags"], ["azure", "vnet"])
+        self.assertEqual(parse_frontmatter("---\ntitle: x\n...\nbody\n"), {"title": "x", "tags": []})
+
+    def test_no_frontmatter(self):
+        self.assertEqual(parse_frontmatter("# Just a note\n"), {})
+        self.assertEqual(parse_frontmatter(""), {})
+        self.assertEqual(parse_frontmatter("\n---\ntitle: x\n---\n"), {})
+
+    def test_malformed_frontmatter(self):
+        # Never closed: the dashes start a note body, not a block
+        self.assertEqual(parse_frontmatter("---\ntitle: x\ntags: [a]\n"), {})
+        # Opening line with trailing text
+        self.assertEqual(parse_frontmatter("----\ntitle: x\n---\n"), {})
+        self.assertEqual(parse_frontmatter("--- title: x\n---\n"), {})
+        # Lines that are not "key: value" are skipped, and end a block list
+        self.assertEqual(parse_frontmatter("---\ntags:\n  - a\nnot a key\n  - b\n: no key\nstatus: done\n---\n"),
+                         {"tags": ["a"], "status": "done"})
+        # An empty value is only kept for tags; a list outside tags stays a list
+        self.assertEqual(parse_frontmatter("---\ntitle:\ntags:\nagent: [a, b]\n---\n"),
+                         {"tags": [], "agent": ["a", "b"]})
+        # An unterminated inline list is a plain string
+        self.assertEqual(parse_frontmatter("---\ntags: [a, b\n---\n")["tags"], ["[a", "b"])
+
+    def test_parse_date(self):
+        self.assertEqual(parse_date("2025-03-01"), datetime.datetime(2025, 3, 1))
+        self.assertEqual(parse_date(" 2025-03-01 09:30 "), datetime.datetime(2025, 3, 1, 9, 30))
+        for value in ("yesterday", "2025-13-01", "", None, ["2025-03-01"]):
+            self.assertIsNone(parse_date(value), value)
+
+
+class QueryIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = QueryIndex()
+        self.index.rebuild([
+            ("a.md", {"agent": "Claude", "date": "2025-03-01", "tags": ["azure", "vnet"], "status": "draft"}),
+            ("b.md", {"agent": "claude", "date": "2025-03-02 10:00", "tags": ["Azure"]}),
+            ("c.md", {"agent": "GPT", "date": "not a date", "tags": []}),
+            (os.path.join("sub", "d.md"), {"date": "2025-01-15", "tags": ["azure"], "project": "net"}),
+        ])
+
+    def paths(self, filters=None, **options):
+        return [result["path"] for result in self.index.query(filters or {}, **options)]
+
+    def test_filters_are_case_insensitive_and_intersected(self):
+        self.assertEqual(self.paths({"agent": ["CLAUDE"]}), ["b.md", "a.md"])
+        self.assertEqual(self.paths({"tags": ["azure"]}), ["b.md", "a.md", os.path.join("sub", "d.md")])
+        self.assertEqual(self.paths({"tags": ["azure", "vnet"]}), ["a.md"])
+        self.assertEqual(self.paths({"tags": ["azure"], "agent": ["gpt"]}), [])
+        self.assertEqual(self.paths({"status": ["missing"]}), [])
+
+    def test_date_range_and_undated_notes_last(self):
+        self.assertEqual(self.paths(), ["b.md", "a.md", os.path.join("sub", "d.md"), "c.md"])
+        self.assertEqual(self.paths(date_from=datetime.datetime(2025, 3, 1)), ["b.md", "a.md"])
+        self.assertEqual(self.paths(date_to=datetime.datetime(2025, 3, 1)), ["a.md", os.path.join("sub", "d.md")])
+        self.assertEqual(self.paths(date_from=datetime.datetime(2025, 2, 1), date_to=datetime.datetime(2025, 2, 28)),
+                         [])
+
+    def test_prefix(self):
+        self.assertEqual(self.paths({"tags": ["azure"]}, prefix="sub"), [os.path.join("sub", "d.md")])
+
+    def test_results_carry_the_frontmatter(self):
+        self.assertEqual(self.index.query({"project": ["NET"]}),
+                         [{"path": os.path.join("sub", "d.md"), "date": "2025-01-15", "tags": ["azure"],
+                           "project": "net"}])
+
+    def test_update_and_remove(self):
+        self.index.update("a.md", {"agent": "GPT", "date": "2024-01-01", "tags": []})
+        self.assertEqual(self.paths({"agent": ["claude"]}), ["b.md"])
+        self.assertEqual(self.paths(date_to=datetime.datetime(2024, 12, 31)), ["a.md"])
+        self.index.update("b.md", None)
+        self.index.remove_tree("sub")
+        self.index.remove("missing.md")
+        self.assertEqual(self.paths({"tags": ["azure"]}), [])
+        self.assertEqual(self.index.stats(), {"ready": True, "notes": 2, "tags": 0})
+
+
+def note(agent, date, tags):
+    return f"---\nagent: {agent}\ndate: {date}\ntags: [{', '.join(tags)}]\n---\nbody\n"
+
+
+CONTEXTS = os.path.join("AI", "Memory", "Contexts")
+NOTES = {
+    os.path.join(CONTEXTS, "Networking.md"): note("Claude", "2025-03-01 09:30", ["azure", "vnet"]),
+    os.path.join(CONTEXTS, "Storage.md"): note("GPT", "2025-03-01", ["azure"]),
+    os.path.join("AI", "Memory", "Projects", "Plan.md"): note("Claude", "2025-02-01", ["plan"]),
+    os.path.join(CONTEXTS, "Broken.md"): "---\nagent: Claude\ntags: [azure]\nbody without a closing line\n",
+    os.path.join(CONTEXTS, "Plain.md"): "no frontmatter\n",
+}
+
+
+class QueryRouteTest(VaultTestCase):
+    """Answered by parsing every note while the index builds"""
+
+    NOTES = NOTES
+
+    def query(self, **params):
+        return self.client.get("/query", query_string=params)
+
+    def paths(self, **params):
+        response = self.query(**params)
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return [result["path"] for result in response.get_json()]
+
+    def test_filters(self):
+        networking, storage = os.path.join(CONTEXTS, "Networking.md"), os.path.join(CONTEXTS, "Storage.md")
+        self.assertEqual(self.paths(tag="azure"), [networking, storage])
+        self.assertEqual(self.paths(tag="azure,vnet"), [networking])
+        self.assertEqual(self.client.get("/query?tag=azure&tag=vnet").get_json()[0]["path"], networking)
+        self.assertEqual(self.paths(agent="claude"), [networking, os.path.join("AI", "Memory", "Projects", "Plan.md")])
+        self.assertEqual(self.paths(agent="claude", prefix="AI/Memory/Contexts/"), [networking])
+
+    def test_a_bare_end_date_covers_the_whole_day(self):
+        self.assertEqual(len(self.paths(date_from="2025-03-01", date_to="2025-03-01")), 2)
+        self.assertEqual(len(self.paths(date_to="2025-03-01 09:00")), 2)
+
+    def test_pagination(self):
+        response = self.query(tag="azure", limit=1)
+        self.assertEqual(response.headers["X-Next-Offset"], "1")
+        response = self.query(tag="azure", limit=1, offset=1)
+        self.assertEqual(len(response.get_json()), 1)
+        self.assertNotIn("X-Next-Offset", response.headers)
+
+    def test_invalid_parameters(self):
+        for params in ({"date_from": "yesterday"}, {"date_to": "2025-02-30"}, {"limit": -1}, {"offset": "x"},
+                       {"prefix": "../Other"}):
+            self.assertEqual(self.query(**params).status_code, 400, params)
+
+
+class IndexedQueryRouteTest(QueryRouteTest):
+    """Answered from the query index once built, and kept current by writes"""
+
+    INDEXED = True
+
+    def test_answered_from_the_index(self):
+        self.assertTrue(api.query_index.ready)
+        self.assertEqual(api.query_index.stats()["notes"], 3)
+
+    def test_write_updates_the_index(self):
+        path = os.path.join(CONTEXTS, "Storage.md")
+        url_path = path.replace(os.sep, "/")
+        self.client.post("/write", json={"path": url_path, "content": note("GPT", "2025-03-01", ["vnet"])})
+        try:
+            self.assertEqual(self.paths(tag="vnet", agent="gpt"), [path])
+            self.assertEqual(self.paths(tag="azure"), [os.path.join(CONTEXTS, "Networking.md")])
+        finally:
+            self.client.post("/write", json={"path": url_path, "content": NOTES[path]})
+
+
+if __name__ == "__main__":
+    unittest.main()
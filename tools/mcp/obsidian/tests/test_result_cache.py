@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Search Result Cache Tests
+Results valid for one vault generation: stale generations never stored or
+served, the byte bound kept by evicting cheap or bulky results first, and
+/search answering from the cache until a write or an outside edit
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server_fixture import VaultTestCase, api, write_file  # noqa: E402
+from result_cache import SearchResultCache, result_size, ENTRY_OVERHEAD  # noqa: E402
+
+
+def paths(count, length=10):
+    return ([f"{index:0{length}d}" for index in range(count)], None)
+
+
+class SearchResultCacheTest(unittest.TestCase):
+
+    def test_hit_and_miss(self):
+        cache = SearchResultCache()
+        self.assertIsNone(cache.get("q", 1))
+        cache.put("q", 1, paths(2), 0.5)
+        self.assertEqual(cache.get("q", 1), paths(2))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+        self.assertEqual((stats["hit_rate"], stats["saved_seconds"]), (0.5, 0.5))
+
+    def test_newer_generation_invalidates_everything(self):
+        cache = SearchResultCache()
+        cache.put("a", 1, paths(1), 0.1)
+        cache.put("b", 1, paths(1), 0.1)
+        self.assertIsNone(cache.get("a", 2))
+        self.assertEqual(cache.stats()["invalidations"], 2)
+        self.assertEqual((cache.stats()["entries"], cache.stats()["bytes"]), (0, 0))
+
+    def test_stale_generation_is_neither_stored_nor_served(self):
+        cache = SearchResultCache()
+        cache.get("q", 5)
+        # Computed before the latest change
+        cache.put("q", 4, paths(1), 0.1)
+        self.assertEqual(cache.stats()["entries"], 0)
+        cache.put("q", 5, paths(1), 0.1)
+        # A request that read an older generation does not get the newer result, nor drop it
+        self.assertIsNone(cache.get("q", 4))
+        self.assertEqual(cache.get("q", 5), paths(1))
+
+    def test_result_size(self):
+        self.assertEqual(result_size([]), ENTRY_OVERHEAD)
+        self.assertEqual(result_size(["abc"]), 2 * ENTRY_OVERHEAD + 3)
+        hit = {"path": "abc", "snippets": [{"text": "12345"}, {"text": ""}]}
+        self.assertEqual(result_size([hit]), 4 * ENTRY_OVERHEAD + 8)
+
+    def test_byte_bound_evicts_cheap_results_first(self):
+        size = result_size(paths(1)[0])
+        cache = SearchResultCache(max_bytes=3 * size)
+        cache.put("slow", 1, paths(1), 1.0)
+        cache.put("cheap", 1, paths(1), 0.001)
+        cache.put("medium", 1, paths(1), 0.1)
+        cache.put("new", 1, paths(1), 0.1)
+        self.assertIsNone(cache.get("cheap", 1))
+        for key in ("slow", "medium", "new"):
+            self.assertIsNotNone(cache.get(key, 1), key)
+        stats = cache.stats()
+        self.assertEqual((stats["evictions"], stats["bytes"]), (1, 3 * size))
+        self.assertLessEqual(stats["bytes"], stats["max_bytes"])
+
+    def test_bulky_results_go_before_small_ones_of_equal_cost(self):
+        small = result_size(paths(1)[0])
+        cache = SearchResultCache(max_bytes=result_size(paths(20)[0]) + small)
+        cache.put("small", 1, paths(1), 0.1)
+        cache.put("bulky", 1, paths(20), 0.1)
+        cache.put("another", 1, paths(1), 0.1)
+        self.assertIsNone(cache.get("bulky", 1))
+        self.assertIsNotNone(cache.get("small", 1))
+
+    def test_oversized_results_are_not_stored(self):
+        cache = SearchResultCache(max_bytes=100)
+        cache.put("q", 1, paths(5), 0.1)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_replacing_a_key_and_clear(self):
+        cache = SearchResultCache()
+        cache.put("q", 1, paths(1), 0.1)
+        cache.put("q", 1, paths(3), 0.1)
+        self.assertEqual(cache.stats()["bytes"], result_size(paths(3)[0]))
+        cache.clear()
+        self.assertEqual((cache.stats()["entries"], cache.stats()["bytes"]), (0, 0))
+
+    def test_heap_stays_bounded_under_repeated_hits(self):
+        cache = SearchResultCache()
+        cache.put("q", 1, paths(1), 0.1)
+        for _ in range(1000):
+            cache.get("q", 1)
+        self.assertLess(len(cache.heap), 100)
+
+
+NOTES = {os.path.join("AI", "Memory", "Contexts", "Networking.md"): "subnet peering\n"}
+
+
+class SearchCacheRouteTest(VaultTestCase):
+
+    NOTES = NOTES
+    INDEXED = True
+
+    def setUp(self):
+        api.search_cache.clear()
+
+    def search(self, query="subnet"):
+        return self.client.get("/search", query_string={"query": query}).get_json()
+
+    def wait_for_generation(self, generation):
+        deadline = time.monotonic() + 10
+        while api.tracked_generation() == generation:
+            self.assertLess(time.monotonic(), deadline, "watcher did not see the change")
+            time.sleep(0.05)
+
+    def test_repeated_search_is_served_from_the_cache(self):
+        self.assertEqual(self.search(), [os.path.join("AI", "Memory", "Contexts", "Networking.md")])
+        with mock.patch.object(api.search_index, "search", side_effect=AssertionError("searched again")):
+            self.assertEqual(self.search(), [os.path.join("AI", "Memory", "Contexts", "Networking.md")])
+
+    def test_write_invalidates_cached_results(self):
+        self.search()
+        self.client.post("/write", json={"path": "AI/Memory/Contexts/Subnets.md", "content": "subnet plan\n"})
+        try:
+            self.assertEqual(len(self.search()), 2)
+        finally:
+            os.remove(self.path(os.path.join("AI", "Memory", "Contexts", "Subnets.md")))
+            self.wait_for_generation(api.tracked_generation())
+
+    def test_outside_edit_invalidates_cached_results(self):
+        self.assertEqual(self.search("vnet"), [])
+        generation = api.tracked_generation()
+        path = os.path.join("AI", "Memory", "Contexts", "Outside.md")
+        write_file(self.path(path), "vnet\n")
+        self.wait_for_generation(generation)
+        try:
+            self.assertEqual(self.search("vnet"), [path])
+        finally:
+            generation = api.tracked_generation()
+            os.remove(self.path(path))
+            self.wait_for_generation(generation)
+
+
+class UntrackedSearchCacheTest(VaultTestCase):
+    """Without the watcher outside edits would go unseen, so nothing is cached"""
+
+    NOTES = NOTES
+
+    def test_nothing_is_cached(self):
+        api.search_cache.clear()
+        stats = api.search_cache.stats()
+        for _ in range(2):
+            self.client.get("/search", query_string={"query": "subnet"})
+        self.assertEqual(api.search_cache.stats()["entries"], 0)
+        self.assertEqual(api.search_cache.stats()["hits"], stats["hits"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Scan Engine Tests
+Serial and process-pool scans find the same notes in the same stable order,
+match filenames as well as content, and stop once the limit is reached
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+import scanner  # noqa: E402
+from scanner import ScanEngine, list_notes, scan_files  # noqa: E402
+
+
+class ScanEngineTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.vault = tempfile.mkdtemp()
+        cls.memory_path = os.path.join(cls.vault, "AI", "Memory")
+        for folder in ("b", "a"):
+            os.makedirs(os.path.join(cls.memory_path, folder))
+            for i in range(30):
+                content = f"note {i}\nsubnet snet_app_{i:04d}\n" if i % 3 == 0 else f"note {i}\nnothing here\n"
+                with open(os.path.join(cls.memory_path, folder, f"{i:02d}.md"), 'w', encoding='utf-8') as f:
+                    f.write(content)
+        with open(os.path.join(cls.memory_path, "a", "Subnets.md"), 'w', encoding='utf-8') as f:
+            f.write("named after the query\n")
+        with open(os.path.join(cls.memory_path, "a", "image.png"), 'wb') as f:
+            f.write(b"subnet")
+        cls.paths = list_notes(cls.memory_path)
+        cls.engine = ScanEngine(workers=2, chunk_size=7)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.shutdown()
+        shutil.rmtree(cls.vault)
+
+    def scan(self, query, parallel=False, limit=None):
+        with mock.patch.object(scanner, "MIN_PARALLEL_FILES", 0 if parallel else len(self.paths) + 1):
+            return [path for path, _ in self.engine.scan(self.vault, self.paths, query, limit=limit)]
+
+    def test_list_notes_is_sorted_and_markdown_only(self):
+        rel_paths = [os.path.relpath(path, self.memory_path) for path in self.paths]
+        self.assertEqual(rel_paths[0], os.path.join("a", "00.md"))
+        self.assertEqual(rel_paths[-1], os.path.join("b", "29.md"))
+        self.assertNotIn(os.path.join("a", "image.png"), rel_paths)
+        self.assertEqual(len(rel_paths), 61)
+
+    def test_filenames_and_content_match(self):
+        found = self.scan("subnet")
+        self.assertEqual(len(found), 21)
+        self.assertIn(os.path.join("AI", "Memory", "a", "Subnets.md"), found)
+
+    def test_parallel_scan_matches_serial_scan(self):
+        for query in ("subnet", r"snet_app_00[0-2]\d", "zzz"):
+            self.assertEqual(self.scan(query, parallel=True), self.scan(query), query)
+        self.assertIsNotNone(self.engine.pool)
+
+    def test_limit_stops_the_scan(self):
+        serial = self.scan("note", limit=10)
+        self.assertEqual(len(serial), 10)
+        self.assertEqual(self.scan("note", parallel=True, limit=10), serial)
+        self.assertEqual(self.scan("note", limit=0), [])
+
+    def test_unreadable_notes_are_reported_and_skipped(self):
+        broken = os.path.join(self.vault, "broken.md")
+        with open(broken, 'wb') as f:
+            f.write(b"\xff\xfe not utf-8 subnet\xff")
+        missing = os.path.join(self.vault, "missing.md")
+        # \w is Unicode-aware, so the notes are decoded rather than matched as bytes
+        matches, errors = scan_files(self.vault, [broken, missing, self.paths[0]], r"^note \w")
+        self.assertEqual(matches, [(os.path.relpath(self.paths[0], self.vault), None)])
+        self.assertEqual(len(errors), 2)
+        os.remove(broken)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Search API Tests
+/search and /query through the Flask test client: prefixes stay inside the notes
+folder, pages end, and sort orders hold for index and scan results
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server_fixture import VaultTestCase, write_file  # noqa: E402
+
+
+class SearchApiTest(VaultTestCase):
+
+    NOTES = {
+        os.path.join("AI", "Memory", "Contexts", "Kubernetes.md"): "---\ntags: [k8s]\n---\nkube cluster notes\n",
+        os.path.join("AI", "Memory", "Contexts", "Kubelet.md"): "---\ntags: [k8s]\n---\nkube node agent\n",
+        os.path.join("AI", "Memory", "Projects", "Cluster.md"): "---\ntags: [k8s]\n---\nkube upgrade plan\n",
+        os.path.join("AI", "Other", "Outside.md"): "kube outside the notes folder\n",
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A note beside the vault that no prefix may reach
+        write_file(os.path.join(cls.vault, "..", "leakdir", "leak.md"), "kube leaked\n")
+
+    def search(self, **params):
+        return self.client.get("/search", query_string=params)
+
+    def test_prefix_outside_the_vault_is_refused(self):
+        for prefix in ("../leakdir", "../", "..", "AI/../../leakdir", "/../leakdir"):
+            response = self.search(query="kub.", prefix=prefix, snippets=1)
+            self.assertEqual(response.status_code, 400, prefix)
+            self.assertIn("prefix", response.get_json()["error"])
+        self.assertEqual(self.client.get("/query", query_string={"prefix": "../leakdir"}).status_code, 400)
+
+    def test_prefix_is_normalized(self):
+        response = self.search(query="kub.", prefix="AI/Memory/Projects/../Contexts/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [os.path.join("AI", "Memory", "Contexts", "Kubelet.md"),
+                                               os.path.join("AI", "Memory", "Contexts", "Kubernetes.md")])
+
+    def test_prefix_does_not_widen_the_scan(self):
+        without_prefix = self.search(query="kub.").get_json()
+        with_prefix = self.search(query="kub.", prefix="AI/").get_json()
+        self.assertNotIn(os.path.join("AI", "Other", "Outside.md"), with_prefix)
+        self.assertEqual(sorted(with_prefix), sorted(without_prefix))
+        self.assertEqual(self.search(query="kub.", prefix="AI/Other/").get_json(), [])
+
+    def test_empty_page_has_no_next_offset(self):
+        response = self.search(query="kub.", limit=0, offset=1)
+        self.assertEqual(response.get_json(), [])
+        self.assertNotIn("X-Next-Offset", response.headers)
+        response = self.client.get("/query", query_string={"tag": "k8s", "limit": 0})
+        self.assertNotIn("X-Next-Offset", response.headers)
+
+    def test_pages_follow_next_offset(self):
+        seen = []
+        offset = 0
+        while offset is not None:
+            response = self.search(query="kub.", limit=2, offset=offset)
+            seen.extend(response.get_json())
+            offset = response.headers.get("X-Next-Offset")
+        self.assertEqual(sorted(seen), sorted(self.search(query="kub.").get_json()))
+        self.assertEqual(len(seen), len(set(seen)))
+
+
+
+class SortTest(VaultTestCase):
+
+    NOTES = {
+        os.path.join("AI", "Memory", "Conversations", "20250101-Terraform.md"): "terraform once\n",
+        os.path.join("AI", "Memory", "Conversations", "20250301-1200-Terraform.md"): "terraform terraform terraform\n",
+        os.path.join("AI", "Memory", "Contexts", "State.md"): "terraform state and more words to dilute it\n",
+    }
+    INDEXED = True
+
+    def search(self, **params):
+        response = self.client.get("/search", query_string=params)
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return [os.path.basename(path) for path in response.get_json()]
+
+    def test_relevance_puts_the_best_match_first(self):
+        self.assertEqual(self.search(query="terraform", sort="relevance")[0], "20250301-1200-Terraform.md")
+
+    def test_date_puts_the_newest_filename_date_first_and_undated_last(self):
+        self.assertEqual(self.search(query="terraform", sort="date"),
+                         ["20250301-1200-Terraform.md", "20250101-Terraform.md", "State.md"])
+
+    def test_mtime_puts_the_newest_note_first(self):
+        old = self.path(os.path.join("AI", "Memory", "Conversations", "20250301-1200-Terraform.md"))
+        os.utime(old, (1, 1))
+        self.addCleanup(os.utime, old, None)
+        self.assertEqual(self.search(query="terraform", sort="mtime")[-1], "20250301-1200-Terraform.md")
+
+    def test_path_order_for_index_and_scan_results(self):
+        expected = ["State.md", "20250101-Terraform.md", "20250301-1200-Terraform.md"]
+        self.assertEqual(self.search(query="terraform", sort="path"), expected)
+        self.assertEqual(self.search(query="terra.orm", sort="path"), expected)
+
+    def test_invalid_arguments_are_rejected(self):
+        for params in ({"query": "terraform", "sort": "size"}, {"query": "terraform", "limit": -1},
+                       {"query": "terraform", "offset": "x"}, {}):
+            self.assertEqual(self.client.get("/search", query_string=params).status_code, 400, params)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Search Index Tests
+Plain-text lookups must find the same notes as a case-insensitive substring scan
+of note names and content, and saves write a consistent snapshot of the index
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from search_index import SearchIndex  # noqa: E402
+
+NOTES = {
+    "Kubernetes.md": "Cluster notes with minikube and k8s",
+    "RemoteState.md": "remote-state and remote  state, plus a tfstate file: statefile",
+    "Strasse.md": "Straße and STRASSE",
+    "Languages.md": "C# and F# notes",
+    "Subnets.md": "resource azurerm_subnet.private in the private endpoint subnet",
+}
+
+QUERIES = ["Kube", "kubernetes", "minik", "k8", "remote state", "remote-state", "tfstat", "statef",
+           "te fi", "strasse", "Straße", "C#", "c", "azurerm_subnet", "in the priv", "private endpoint",
+           "endpoint sub", "ate endpoint pri", " private", "private ", "zzz"]
+
+
+class PlainTextSearchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.vault = tempfile.mkdtemp()
+        memory_path = os.path.join(cls.vault, "AI", "Memory")
+        os.makedirs(memory_path)
+        for name, content in NOTES.items():
+            with open(os.path.join(memory_path, name), 'w', encoding='utf-8') as f:
+                f.write(content + "\n")
+        cls.index = SearchIndex(os.path.join(cls.vault, "search_index.json"))
+        cls.index.load(cls.vault)
+        cls.index.sync(cls.vault, memory_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.vault)
+
+    def scan(self, query):
+        needle = query.casefold()
+        return sorted(os.path.join("AI", "Memory", name) for name, content in NOTES.items()
+                      if needle in name.casefold() or needle in content.casefold())
+
+    def test_matches_substring_scan(self):
+        for query in QUERIES:
+            expected = self.scan(query)
+            found = self.index.search(query)
+            if found is None:
+                # Phrases are narrowed by the index, then the candidates are matched
+                candidates = self.index.phrase_candidates(query)
+                self.assertTrue(set(expected) <= candidates, query)
+            else:
+                self.assertEqual(found, expected, query)
+
+    def test_partial_words_rank(self):
+        scores = self.index.bm25_scores([os.path.join("AI", "Memory", "Kubernetes.md"),
+                                         os.path.join("AI", "Memory", "Strasse.md")], "minik")
+        self.assertGreater(scores[os.path.join("AI", "Memory", "Kubernetes.md")], 0)
+        self.assertEqual(scores[os.path.join("AI", "Memory", "Strasse.md")], 0)
+
+
+
+class SaveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.vault = tempfile.mkdtemp()
+        self.memory_path = os.path.join(self.vault, "AI", "Memory")
+        os.makedirs(self.memory_path)
+        for name, content in NOTES.items():
+            with open(os.path.join(self.memory_path, name), 'w', encoding='utf-8') as f:
+                f.write(content + "\n")
+        self.index = SearchIndex(os.path.join(self.vault, ".index", "search_index.json"))
+        self.index.load(self.vault)
+        self.index.sync(self.vault, self.memory_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.vault)
+
+    def test_round_trip(self):
+        self.index.save()
+        self.assertFalse(self.index.dirty)
+        loaded = SearchIndex(self.index.index_file)
+        self.assertTrue(loaded.load(self.vault))
+        self.assertEqual(loaded.postings, self.index.postings)
+        self.assertEqual(loaded.docs, self.index.docs)
+
+    def test_saved_copy_is_a_snapshot(self):
+        self.index.save()
+        self.index.remove_note(os.path.join("AI", "Memory", "Kubernetes.md"))
+        self.assertTrue(self.index.dirty)
+        loaded = SearchIndex(self.index.index_file)
+        loaded.load(self.vault)
+        self.assertIn(os.path.join("AI", "Memory", "Kubernetes.md"), loaded.ids)
+
+    def test_failed_save_stays_dirty(self):
+        # The index directory cannot be created below a regular file
+        blocker = os.path.join(self.vault, "blocker")
+        open(blocker, 'w').close()
+        self.index.index_file = os.path.join(blocker, "search_index.json")
+        self.index.save()
+        self.assertTrue(self.index.dirty)
+
+
+if __name__ == "__main__":
+    unittest.main()
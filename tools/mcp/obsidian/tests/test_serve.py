@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Serve Script Tests
+Mode selection, gunicorn settings, stale socket handling, and production and
+async servers answering requests after they start, over TCP and their Unix
+domain socket
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import tempfile
+import unittest
+import subprocess
+import urllib.request
+from unittest import mock
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server")
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "adapters"))
+
+import serve  # noqa: E402
+import universal_client as client  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class ModeSelectionTest(unittest.TestCase):
+
+    def run_main(self, *argv, system="Linux"):
+        calls = {}
+        # Defaults come from the environment of manage-mcp.py
+        environ = {name: value for name, value in os.environ.items() if not name.startswith("MCP_") and name != "PORT"}
+        with mock.patch.object(sys, "argv", ["serve.py", *argv]), mock.patch.dict(os.environ, environ, clear=True), \
+                mock.patch.object(serve.platform, "system", return_value=system), \
+                mock.patch.object(serve, "remove_stale_socket"):
+            for name in ("serve_development", "serve_gunicorn", "serve_waitress", "serve_async"):
+                patcher = mock.patch.object(serve, name,
+                                            side_effect=lambda *args, name=name: calls.update({name: args}))
+                patcher.start()
+                self.addCleanup(patcher.stop)
+            serve.main()
+        return calls
+
+    def test_production_uses_gunicorn_with_socket(self):
+        calls = self.run_main("--mode", "production", "--workers", "3", "--threads", "4", "--socket", "smf.sock")
+        self.assertEqual(calls["serve_gunicorn"], (serve.DEFAULT_HOST, serve.DEFAULT_PORT, 3, 4,
+                                                   serve.DEFAULT_KEEPALIVE, os.path.abspath("smf.sock")))
+
+    def test_production_on_windows_uses_waitress_without_socket(self):
+        calls = self.run_main("--mode", "production", "--socket", "smf.sock", system="Windows")
+        self.assertEqual(calls["serve_waitress"], (serve.DEFAULT_HOST, serve.DEFAULT_PORT, serve.DEFAULT_THREADS))
+
+    def test_async_and_development(self):
+        self.assertEqual(self.run_main("--mode", "async", "--port", "6000")["serve_async"],
+                         (serve.DEFAULT_HOST, 6000, serve.DEFAULT_ASYNC_THREADS, None))
+        self.assertEqual(self.run_main("--mode", "development", "--socket", "smf.sock")["serve_development"],
+                         (serve.DEFAULT_HOST, serve.DEFAULT_PORT))
+
+    def test_default_workers_are_capped(self):
+        with mock.patch.object(serve.os, "cpu_count", return_value=64):
+            self.assertEqual(serve.default_workers(), 4)
+        with mock.patch.object(serve.os, "cpu_count", return_value=None):
+            self.assertEqual(serve.default_workers(), 2)
+
+
+class GunicornSettingsTest(unittest.TestCase):
+
+    def test_workers_start_the_app_after_forking(self):
+        from gunicorn.app.base import BaseApplication
+        settings = {}
+        with mock.patch.object(BaseApplication, "run", lambda application: settings.update(
+                {name: application.cfg.settings[name].get() for name in application.cfg.settings})):
+            serve.serve_gunicorn("127.0.0.1", 5999, 2, 6, 7, socket_path="/tmp/smf.sock")
+        self.assertEqual(settings["bind"], ["127.0.0.1:5999", "unix:/tmp/smf.sock"])
+        self.assertEqual((settings["workers"], settings["threads"], settings["keepalive"]), (2, 6, 7))
+        self.assertEqual(settings["worker_class"], "gthread")
+        self.assertEqual(settings["post_fork"].__name__, "post_fork")
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class StaleSocketTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.work_dir, "smf.sock")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_stale_socket_is_removed(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+        serve.remove_stale_socket(self.path)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_live_socket_stops_the_start(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as live:
+            live.bind(self.path)
+            live.listen(1)
+            with self.assertRaises(SystemExit):
+                serve.remove_stale_socket(self.path)
+        self.assertTrue(os.path.exists(self.path))
+
+
+def wait_for(check, server, timeout=30):
+    """Poll check() until it returns a result, failing if the server process exits first"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            result = check()
+        except OSError:
+            result = None
+        if result:
+            return result
+        if time.monotonic() > deadline or server.poll() is not None:
+            raise AssertionError("server did not start")
+        time.sleep(0.2)
+
+
+@unittest.skipIf(sys.platform == "win32", "gunicorn needs Linux or macOS")
+class ServerProcessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        vault = os.path.join(self.work_dir, "vault")
+        os.makedirs(os.path.join(vault, "AI", "Memory"))
+        with open(os.path.join(vault, "AI", "Memory", "a.md"), 'w') as f:
+            f.write("subnet\n")
+        self.config_file = os.path.join(self.work_dir, "config.json")
+        with open(self.config_file, 'w') as f:
+            json.dump({"vault_path": vault}, f)
+
+    def start(self, *args):
+        """Start serve.py on a free port; returns (process, base URL)"""
+        port = free_port()
+        env = dict(os.environ, OBSIDIAN_CONFIG_FILE=self.config_file,
+                   OBSIDIAN_INDEX_FILE=os.path.join(self.work_dir, "index", "search_index.json"))
+        env.pop("MCP_SOCKET", None)
+        server = subprocess.Popen([sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port), *args],
+                                  cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.addCleanup(server.wait, 10)
+        self.addCleanup(server.terminate)
+        return server, f"http://127.0.0.1:{port}"
+
+    def search(self, url):
+        with urllib.request.urlopen(f"{url}/search?query=subnet", timeout=5) as response:
+            return json.load(response)
+
+    def test_worker_serves_a_configured_vault(self):
+        server, url = self.start("--mode", "production", "--workers", "1", "--threads", "2")
+        self.assertEqual(wait_for(lambda: self.search(url), server), [os.path.join("AI", "Memory", "a.md")])
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+    def test_client_talks_over_the_unix_socket(self):
+        for mode in ("production", "async"):
+            socket_path = os.path.join(self.work_dir, f"{mode}.sock")
+            server, url = self.start("--mode", mode, "--workers", "1", "--socket", socket_path)
+            wait_for(lambda: client.socket_accepts(socket_path) and self.search(url), server)
+            self.assertEqual(os.stat(socket_path).st_mode & 0o777, 0o600, mode)
+
+            # Nothing listens on this TCP port, so only the socket can answer
+            tcp_url = f"http://127.0.0.1:{free_port()}"
+            with mock.patch.object(client, "SERVER_SOCKET", socket_path), \
+                    mock.patch.object(client, "SERVER_URL", tcp_url):
+                session = client.make_session(None)
+            response = session.get(f"{tcp_url}/search", params={"query": "subnet"}, timeout=5)
+            self.assertEqual(response.json(), [os.path.join("AI", "Memory", "a.md")], mode)
+            server.terminate()
+            server.wait(10)
+            self.assertFalse(os.path.exists(socket_path), mode)
+
+
+if __name__ == "__main__":
+    unittest.main()
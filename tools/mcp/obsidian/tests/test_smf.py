@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+SMF CLI Tests
+smf.py calls the universal client in-process without spawning a subprocess, with
+the same results and error handling as running the client script
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TESTS_DIR)
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", ".."))
+
+from server_fixture import VaultTestCase, start_server  # noqa: E402
+import smf  # noqa: E402
+
+
+class CallClientTest(VaultTestCase):
+
+    NOTES = {
+        os.path.join("AI", "Memory", "Contexts", "Networking.md"): "# Subnets\nsubnet peering\n",
+        os.path.join("AI", "Memory", "Conversations", "Claude", "20250301-1200-Subnets.md"): "subnet plan\n",
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.url, cls.stop_server = start_server()
+        # The subprocess client reads the URL from its environment, the imported one from the module
+        environ = {name: value for name, value in os.environ.items() if name != "MCP_SOCKET"}
+        cls.environ = mock.patch.dict(os.environ, dict(environ, MCP_SERVER_URL=cls.url), clear=True)
+        cls.environ.start()
+        client = smf.load_client()
+        cls.saved_url = client.SERVER_URL
+        client.SERVER_URL = cls.url
+
+    @classmethod
+    def tearDownClass(cls):
+        smf.load_client().SERVER_URL = cls.saved_url
+        cls.environ.stop()
+        cls.stop_server()
+        super().tearDownClass()
+
+    def call(self, mode, command, *args, **options):
+        with mock.patch.object(smf, "CLIENT_MODE", mode), mock.patch.object(smf, "_client", None):
+            return smf.call_client(command, *args, **options)
+
+    def test_in_process_calls_spawn_no_subprocess(self):
+        with mock.patch.object(smf.subprocess, "run", side_effect=AssertionError("subprocess spawned")):
+            self.assertEqual(self.call("inprocess", "search", "subnet"),
+                             [os.path.join("AI", "Memory", "Contexts", "Networking.md"),
+                              os.path.join("AI", "Memory", "Conversations", "Claude", "20250301-1200-Subnets.md")])
+
+    def test_modes_give_the_same_results(self):
+        for command, args, options in [("search", ("subnet",), {}), ("search", ("sub.et",), {"limit": 1}),
+                                       ("read", ("AI/Memory/Contexts/Networking.md",), {}),
+                                       ("recent", ("Claude",), {"limit": 1}), ("status", (), {})]:
+            self.assertEqual(self.call("inprocess", command, *args, **options),
+                             self.call("subprocess", command, *args, **options), command)
+
+    def test_errors_exit_like_the_client(self):
+        for mode in ("inprocess", "subprocess"):
+            with mock.patch("builtins.print"), self.assertRaises(SystemExit):
+                self.call(mode, "search", "sub(net")
+
+
+if __name__ == "__main__":
+    unittest.main()
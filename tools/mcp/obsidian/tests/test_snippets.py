@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Snippet Tests
+Matching lines with 1-based line numbers and UTF-8 byte offsets, at most one per
+line, with bounded context and length; /search returns the same snippets whether
+the index or a scan found the note
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server_fixture import VaultTestCase  # noqa: E402
+from snippets import find_snippets, MAX_SNIPPETS, MAX_SNIPPET_CHARS  # noqa: E402
+
+CONTENT = "# Networking\nThe subnet is private.\nPeering: subnet to subnet\nDone\n"
+
+
+def spans(pattern, content):
+    return [match.span() for match in re.finditer(pattern, content, re.IGNORECASE)]
+
+
+class FindSnippetsTest(unittest.TestCase):
+
+    def test_line_offset_and_length(self):
+        snippets = find_snippets(CONTENT, spans("subnet", CONTENT), 10)
+        self.assertEqual(snippets, [
+            {"line": 2, "offset": 17, "length": 6, "text": "The subnet is private."},
+            {"line": 3, "offset": 45, "length": 6, "text": "Peering: subnet to subnet"},
+        ])
+
+    def test_offsets_count_utf8_bytes(self):
+        content = "Größe\nStraße und subnet\n"
+        snippet = find_snippets(content, spans("subnet", content), 1)[0]
+        self.assertEqual(content.encode("utf-8")[snippet["offset"]:snippet["offset"] + snippet["length"]], b"subnet")
+        self.assertEqual(snippet["line"], 2)
+
+    def test_max_snippets(self):
+        content = "subnet\n" * 5
+        self.assertEqual(len(find_snippets(content, spans("subnet", content), 3)), 3)
+
+    def test_context_lines(self):
+        snippet = find_snippets(CONTENT, spans("private", CONTENT), 1, context_lines=1)[0]
+        self.assertEqual(snippet["text"], "# Networking\nThe subnet is private.\nPeering: subnet to subnet")
+        first = find_snippets(CONTENT, spans("networking", CONTENT), 1, context_lines=5)[0]
+        self.assertEqual(first["text"], CONTENT.rstrip("\n"))
+
+    def test_long_lines_are_cut_around_the_match(self):
+        content = "x" * 1000 + "subnet" + "y" * 1000
+        snippet = find_snippets(content, spans("subnet", content), 1)[0]
+        self.assertLessEqual(len(snippet["text"]), MAX_SNIPPET_CHARS)
+        self.assertIn("subnet", snippet["text"])
+        self.assertEqual(snippet["offset"], 1000)
+
+    def test_last_line_without_newline(self):
+        content = "first\nlast subnet"
+        self.assertEqual(find_snippets(content, spans("subnet", content), 5),
+                         [{"line": 2, "offset": 11, "length": 6, "text": "last subnet"}])
+
+
+class SearchSnippetsTest(VaultTestCase):
+
+    NOTES = {os.path.join("AI", "Memory", "Networking.md"): CONTENT,
+             os.path.join("AI", "Memory", "Many.md"): "subnet\n" * (MAX_SNIPPETS + 5)}
+    INDEXED = True
+
+    def hits(self, **params):
+        response = self.client.get("/search", query_string=dict(params, sort="path"))
+        return {hit["path"]: hit["snippets"] for hit in response.get_json()}
+
+    def test_index_and_scan_hits_have_the_same_snippets(self):
+        # A plain word is answered from the index, the equivalent regex by a scan
+        for params in ({"snippets": 2}, {"snippets": 3, "context": 1}):
+            self.assertEqual(self.hits(query="subnet", **params), self.hits(query="subne[t]", **params), params)
+
+    def test_snippet_count_is_capped(self):
+        hits = self.hits(query="subnet", snippets=1000)
+        self.assertEqual(len(hits[os.path.join("AI", "Memory", "Many.md")]), MAX_SNIPPETS)
+
+    def test_no_snippets_unless_requested(self):
+        response = self.client.get("/search", query_string={"query": "subnet"})
+        self.assertTrue(all(isinstance(hit, str) for hit in response.get_json()))
+
+
+if __name__ == "__main__":
+    unittest.main()
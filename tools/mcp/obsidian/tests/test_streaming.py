@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Streaming Tests
+/search and multi-path /read stream one JSON object per line when the client
+prefers NDJSON, and keep answering JSON otherwise
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server_fixture import VaultTestCase, api  # noqa: E402
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+def lines(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+class NdjsonTest(VaultTestCase):
+
+    NOTES = {os.path.join("AI", "Memory", name): f"{name} mentions the subnet\n" for name in ("a.md", "b.md", "c.md")}
+
+    def test_search_streams_one_hit_per_line(self):
+        response = self.client.get("/search", query_string={"query": "sub.et"}, headers=NDJSON)
+        self.assertEqual(response.mimetype, api.NDJSON_MIMETYPE)
+        self.assertEqual(lines(response), [{"path": os.path.join("AI", "Memory", name)}
+                                           for name in ("a.md", "b.md", "c.md")])
+
+    def test_search_stream_honours_paging_and_snippets(self):
+        response = self.client.get("/search", query_string={"query": "sub.et", "limit": 1, "offset": 1, "snippets": 1},
+                                   headers=NDJSON)
+        hits = lines(response)
+        self.assertEqual([hit["path"] for hit in hits], [os.path.join("AI", "Memory", "b.md")])
+        self.assertEqual(hits[0]["snippets"][0]["line"], 1)
+
+    def test_read_streams_notes_and_errors_in_order(self):
+        paths = ["AI/Memory/b.md", "AI/Memory/missing.md", "AI/Memory/a.md"]
+        response = self.client.get("/read", query_string={"path": paths}, headers=NDJSON)
+        items = lines(response)
+        self.assertEqual([item["path"] for item in items], paths)
+        self.assertEqual(items[0]["content"], "b.md mentions the subnet\n")
+        self.assertIn("error", items[1])
+
+    def test_json_unless_ndjson_is_preferred(self):
+        for accept in ("application/json", "application/json, application/x-ndjson", "*/*",
+                       "application/x-ndjson;q=0.4, application/json"):
+            response = self.client.get("/search", query_string={"query": "sub.et"}, headers={"Accept": accept})
+            self.assertEqual(response.mimetype, "application/json", accept)
+        response = self.client.get("/search", query_string={"query": "sub.et"},
+                                   headers={"Accept": "application/x-ndjson, application/json;q=0.5"})
+        self.assertEqual(response.mimetype, api.NDJSON_MIMETYPE)
+
+    def test_invalid_regex_is_rejected_before_streaming(self):
+        response = self.client.get("/search", query_string={"query": "sub(net"}, headers=NDJSON)
+        self.assertEqual(response.status_code, 400)
+
+    def test_errors_while_streaming_end_the_stream_with_an_error_line(self):
+        def failing():
+            yield {"path": "AI/Memory/a.md"}
+            raise OSError("disk gone")
+        with api.app.test_request_context():
+            response = api.ndjson_response(failing())
+            body = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(body[0], {"path": "AI/Memory/a.md"})
+        self.assertIn("disk gone", body[1]["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
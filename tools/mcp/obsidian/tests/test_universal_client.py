@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Universal Client Tests
+Requests go through the server's Unix domain socket while it listens, and over
+TCP to MCP_SERVER_URL when the socket file is stale
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import socket
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import UnixStreamServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "adapters"))
+
+import universal_client as client  # noqa: E402
+
+
+def health_handler(transport):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = f'{{"transport": "{transport}"}}'.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def address_string(self):
+            return transport
+
+        def log_message(self, *args):
+            pass
+    return Handler
+
+
+class UnixHTTPServer(UnixStreamServer, HTTPServer):
+    def server_bind(self):
+        UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class UnixSocketFallbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tcp_server = HTTPServer(("127.0.0.1", 0), health_handler("tcp"))
+        threading.Thread(target=self.tcp_server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.tcp_server.server_port}"
+        self.work_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.work_dir, "smf.sock")
+        self.unix_server = None
+
+    def tearDown(self):
+        for server in (self.tcp_server, self.unix_server):
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        shutil.rmtree(self.work_dir)
+
+    def leave_stale_socket(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socket_path)
+        stale.close()
+
+    def serve_unix(self):
+        self.unix_server = UnixHTTPServer(self.socket_path, health_handler("unix"))
+        threading.Thread(target=self.unix_server.serve_forever, daemon=True).start()
+
+    def get(self, session):
+        return session.get(self.url + "/health", timeout=5).json()["transport"]
+
+    def test_probe_rejects_stale_socket(self):
+        self.assertFalse(client.socket_accepts(self.socket_path))
+        self.leave_stale_socket()
+        self.assertFalse(client.socket_accepts(self.socket_path))
+        os.unlink(self.socket_path)
+        self.serve_unix()
+        self.assertTrue(client.socket_accepts(self.socket_path))
+
+    def test_adapter_falls_back_to_tcp(self):
+        self.leave_stale_socket()
+        session = client.requests.Session()
+        session.mount(self.url + "/", client.UnixSocketAdapter(self.socket_path))
+        self.assertEqual(self.get(session), "tcp")
+
+    def test_adapter_uses_live_socket(self):
+        self.serve_unix()
+        session = client.requests.Session()
+        session.mount(self.url + "/", client.UnixSocketAdapter(self.socket_path))
+        self.assertEqual(self.get(session), "unix")
+
+
+if __name__ == "__main__":
+    unittest.main()
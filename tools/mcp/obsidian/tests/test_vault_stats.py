@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Vault Stats Tests
+Per-category totals kept by updates and removes, the newest modification time
+recomputed only when the newest note goes, and /metadata answering the same
+from the running totals and from a walk of the vault
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server_fixture import VaultTestCase, api  # noqa: E402
+from vault_stats import VaultStats, note_category  # noqa: E402
+
+CONTEXT = os.path.join("AI", "Memory", "Contexts", "Networking.md")
+OLD_CONTEXT = os.path.join("AI", "Memory", "Contexts", "Storage.md")
+CONVERSATION = os.path.join("AI", "Memory", "Conversations", "Claude", "20250301-Subnets.md")
+PROJECT = os.path.join("AI", "Memory", "Projects", "Plan.md")
+
+
+class NoteCategoryTest(unittest.TestCase):
+
+    def test_categories(self):
+        self.assertEqual(note_category(CONTEXT), "contexts")
+        self.assertEqual(note_category(CONVERSATION), "conversations")
+        self.assertEqual(note_category(os.path.join("AI", "Memory", "System_Prompts", "Base.md")), "system_prompts")
+        self.assertEqual(note_category(PROJECT), "projects")
+        self.assertIsNone(note_category(os.path.join("AI", "Memory", "Inbox.md")))
+        self.assertIsNone(note_category(os.path.join("AI", "Memory", "Contexts", "diagram.png")))
+
+    def test_first_matching_folder_wins(self):
+        self.assertEqual(note_category(os.path.join("AI", "Memory", "Projects", "Contexts", "a.md")), "contexts")
+
+
+class VaultStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = VaultStats()
+        self.stats.rebuild([(CONTEXT, 100, 20.0), (OLD_CONTEXT, 50, 10.0), (CONVERSATION, 7, 5.0),
+                            (os.path.join("AI", "Memory", "Inbox.md"), 999, 99.0)])
+
+    def test_rebuild_totals(self):
+        self.assertTrue(self.stats.ready)
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot["contexts"], {"notes": 2, "bytes": 150, "newest_mtime": 20.0})
+        self.assertEqual(snapshot["conversations"], {"notes": 1, "bytes": 7, "newest_mtime": 5.0})
+        self.assertEqual(snapshot["projects"], {"notes": 0, "bytes": 0, "newest_mtime": None})
+
+    def test_update_replaces_a_note(self):
+        self.stats.update(CONTEXT, 30, 25.0)
+        self.stats.update(PROJECT, 12, 1.0)
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot["contexts"], {"notes": 2, "bytes": 80, "newest_mtime": 25.0})
+        self.assertEqual(snapshot["projects"], {"notes": 1, "bytes": 12, "newest_mtime": 1.0})
+
+    def test_removing_the_newest_note_recomputes_newest_mtime(self):
+        self.stats.remove(CONTEXT)
+        self.assertEqual(self.stats.snapshot()["contexts"], {"notes": 1, "bytes": 50, "newest_mtime": 10.0})
+        self.stats.remove(OLD_CONTEXT)
+        self.stats.remove(OLD_CONTEXT)
+        self.assertEqual(self.stats.snapshot()["contexts"], {"notes": 0, "bytes": 0, "newest_mtime": None})
+
+    def test_remove_tree(self):
+        self.stats.remove_tree(os.path.join("AI", "Memory", "Contexts"))
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot["contexts"]["notes"], 0)
+        self.assertEqual(snapshot["conversations"]["notes"], 1)
+
+    def test_snapshot_is_a_copy(self):
+        self.stats.snapshot()["contexts"]["notes"] = 42
+        self.assertEqual(self.stats.snapshot()["contexts"]["notes"], 2)
+
+
+NOTES = {CONTEXT: "# Subnets\n", OLD_CONTEXT: "blob storage\n", CONVERSATION: "subnet plan\n"}
+
+
+class MetadataRouteTest(VaultTestCase):
+    """Answered from a walk of the vault while the stats build"""
+
+    NOTES = NOTES
+
+    def metadata(self):
+        response = self.client.get("/metadata")
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_counts_and_sizes(self):
+        metadata = self.metadata()
+        self.assertTrue(metadata["vault_configured"])
+        self.assertEqual(metadata["stats"], {"contexts": 2, "conversations": 1, "system_prompts": 0, "projects": 0})
+        self.assertEqual(metadata["categories"]["contexts"]["bytes"], len("# Subnets\n") + len("blob storage\n"))
+        self.assertAlmostEqual(metadata["categories"]["conversations"]["newest_mtime"],
+                               os.stat(self.path(CONVERSATION)).st_mtime, places=3)
+        self.assertEqual(metadata["total_bytes"], sum(len(content) for content in NOTES.values()))
+
+
+class IndexedMetadataRouteTest(MetadataRouteTest):
+    """Answered from the running totals once built, and kept current by writes"""
+
+    INDEXED = True
+
+    def test_answered_from_the_running_totals(self):
+        self.assertTrue(api.vault_stats.ready)
+        with mock.patch.object(api, "list_notes", side_effect=AssertionError("vault walked")):
+            self.assertEqual(self.metadata()["stats"]["contexts"], 2)
+
+    def test_write_updates_the_totals(self):
+        path = "AI/Memory/Projects/Plan.md"
+        self.assertEqual(self.client.post("/write", json={"path": path, "content": "plan\n"}).status_code, 200)
+        try:
+            metadata = self.metadata()
+            self.assertEqual(metadata["categories"]["projects"]["notes"], 1)
+            self.assertEqual(metadata["total_bytes"], sum(len(content) for content in NOTES.values()) + 5)
+        finally:
+            os.remove(self.path(path))
+            api.vault_stats.remove(PROJECT)
+
+
+if __name__ == "__main__":
+    unittest.main()
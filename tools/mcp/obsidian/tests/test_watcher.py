@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Vault Watcher Tests
+Mapping of inotify events and polling snapshots to VaultEvent batches: notes only,
+renames as moves, moves out of the tree as deletions, overflow as a rescan
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import queue
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+import watcher  # noqa: E402
+from watcher import (VaultWatcher, VaultEvent, IN_CREATE, IN_MODIFY, IN_CLOSE_WRITE, IN_DELETE,  # noqa: E402
+                     IN_MOVED_FROM, IN_MOVED_TO, IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR)
+
+
+class FakeLibc:
+    def __init__(self):
+        self.removed = []
+
+    def inotify_rm_watch(self, fd, wd):
+        self.removed.append(wd)
+
+
+class InotifyMappingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, "Projects", "Old"))
+        self.watcher = VaultWatcher(self.root, callback=None)
+        self.watcher._libc = FakeLibc()
+        self.watcher._fd = -1
+        self.watcher._watches = {1: self.root, 2: os.path.join(self.root, "Projects"),
+                                 3: os.path.join(self.root, "Projects", "Old")}
+        # Directories created in a test would be watched through inotify_add_watch
+        self.watcher._add_watch = lambda path: self.watcher._watches.setdefault(len(self.watcher._watches) + 1, path)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def handle(self, *raw_events):
+        self.watcher._handle_inotify(list(raw_events))
+        events, self.watcher._pending = self.watcher._pending, []
+        return events
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def test_only_notes_are_reported(self):
+        self.assertEqual(self.handle((1, IN_CREATE, 0, "a.md"), (1, IN_CREATE, 0, ".a.md.123.tmp"),
+                                     (1, IN_CREATE, 0, "image.png")),
+                         [VaultEvent("created", self.path("a.md"), None, False)])
+
+    def test_repeated_writes_give_one_modified_event(self):
+        self.assertEqual(self.handle((1, IN_MODIFY, 0, "a.md"), (1, IN_MODIFY, 0, "a.md"),
+                                     (1, IN_CLOSE_WRITE, 0, "a.md")),
+                         [VaultEvent("modified", self.path("a.md"), None, False)])
+
+    def test_rename_inside_the_tree_is_a_move(self):
+        self.assertEqual(self.handle((1, IN_MOVED_FROM, 7, "a.md"), (2, IN_MOVED_TO, 7, "b.md")),
+                         [VaultEvent("moved", self.path("a.md"), self.path("Projects", "b.md"), False)])
+
+    def test_atomic_replace_of_a_note_is_a_move(self):
+        # The note writer renames a hidden temp file over the note
+        self.assertEqual(self.handle((1, IN_MOVED_FROM, 8, ".a.md.1f.tmp"), (1, IN_MOVED_TO, 8, "a.md")),
+                         [VaultEvent("moved", self.path(".a.md.1f.tmp"), self.path("a.md"), False)])
+
+    def test_directory_rename_rewrites_watches(self):
+        events = self.handle((2, IN_MOVED_FROM | IN_ISDIR, 9, "Old"), (2, IN_MOVED_TO | IN_ISDIR, 9, "New"))
+        self.assertEqual(events, [VaultEvent("moved", self.path("Projects", "Old"),
+                                             self.path("Projects", "New"), True)])
+        self.assertEqual(self.watcher._watches[3], self.path("Projects", "New"))
+
+    def test_move_out_of_the_tree_is_a_deletion(self):
+        events = self.handle((2, IN_MOVED_FROM | IN_ISDIR, 10, "Old"), (1, IN_MOVED_FROM, 11, "a.md"))
+        self.assertEqual(events, [VaultEvent("deleted", self.path("Projects", "Old"), None, True),
+                                  VaultEvent("deleted", self.path("a.md"), None, False)])
+        self.assertNotIn(3, self.watcher._watches)
+        self.assertEqual(self.watcher._libc.removed, [3])
+
+    def test_directory_moved_in_reports_its_notes(self):
+        moved_in = self.path("Incoming")
+        os.makedirs(moved_in)
+        with open(os.path.join(moved_in, "c.md"), 'w') as f:
+            f.write("c\n")
+        events = self.handle((1, IN_MOVED_TO | IN_ISDIR, 12, "Incoming"))
+        self.assertEqual(events, [VaultEvent("created", os.path.join(moved_in, "c.md"), None, False)])
+        self.assertIn(moved_in, self.watcher._watches.values())
+
+    def test_deleted_directory_and_note(self):
+        self.assertEqual(self.handle((2, IN_DELETE | IN_ISDIR, 0, "Old"), (1, IN_DELETE, 0, "a.md"),
+                                     (1, IN_DELETE, 0, "b.txt")),
+                         [VaultEvent("deleted", self.path("Projects", "Old"), None, True),
+                          VaultEvent("deleted", self.path("a.md"), None, False)])
+
+    def test_overflow_asks_for_a_rescan_and_ignored_drops_the_watch(self):
+        self.assertEqual(self.handle((-1, IN_Q_OVERFLOW, 0, ""), (3, IN_IGNORED, 0, "")),
+                         [VaultEvent("rescan", self.root, None, False)])
+        self.assertNotIn(3, self.watcher._watches)
+
+
+class PollDiffTest(unittest.TestCase):
+
+    def diff(self, old, new):
+        poller = VaultWatcher(tempfile.gettempdir(), callback=None)
+        poller._diff(old, new)
+        return poller._pending
+
+    def test_changes_between_snapshots(self):
+        old = {"/v/a.md": (1, 10, 100), "/v/b.md": (1, 10, 101), "/v/c.md": (1, 10, 102)}
+        new = {"/v/a.md": (2, 12, 100), "/v/b2.md": (1, 10, 101), "/v/d.md": (1, 5, 103)}
+        self.assertEqual(sorted(self.diff(old, new)), sorted([
+            VaultEvent("modified", "/v/a.md", None, False),
+            VaultEvent("moved", "/v/b.md", "/v/b2.md", False),
+            VaultEvent("deleted", "/v/c.md", None, False),
+            VaultEvent("created", "/v/d.md", None, False)]))
+
+    def test_unchanged_snapshot_gives_no_events(self):
+        snapshot = {"/v/a.md": (1, 10, 100)}
+        self.assertEqual(self.diff(snapshot, dict(snapshot)), [])
+
+
+class WatcherThreadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.batches = queue.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def collect(self, mode):
+        events = VaultWatcher(self.root, self.batches.put, mode=mode, debounce=0.05, poll_interval=0.05)
+        events.start()
+        self.addCleanup(events.stop)
+        return events
+
+    def wait_for(self, expected):
+        seen = []
+        while expected not in seen:
+            seen.extend(self.batches.get(timeout=5))
+        return seen
+
+    def test_poll_backend_reports_new_notes(self):
+        self.assertEqual(self.collect("poll").backend, "poll")
+        path = os.path.join(self.root, "a.md")
+        with open(path, 'w') as f:
+            f.write("a\n")
+        self.wait_for(VaultEvent("created", path, None, False))
+
+    @unittest.skipIf(watcher._load_libc() is None, "needs inotify")
+    def test_inotify_backend_reports_new_notes(self):
+        self.assertEqual(self.collect("auto").backend, "inotify")
+        path = os.path.join(self.root, "a.md")
+        with open(path, 'w') as f:
+            f.write("a\n")
+        self.wait_for(VaultEvent("created", path, None, False))
+        os.remove(path)
+        self.wait_for(VaultEvent("deleted", path, None, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
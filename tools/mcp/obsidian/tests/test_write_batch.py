@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Batch Write Tests
+/write/batch with JSON and NDJSON bodies: one result per item in request order,
+failed items reported without stopping the others, and every written note
+indexed in one pass, from the Flask app, the aiohttp server and the client
+
+Usage: python -m unittest discover tools/mcp/obsidian/tests
+"""
+
+import os
+import sys
+import json
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "adapters"))
+
+from server_fixture import VaultTestCase, api, read_file, start_server  # noqa: E402
+import universal_client as client  # noqa: E402
+
+try:
+    from aiohttp.test_utils import TestClient, TestServer
+    import async_app
+except ImportError:
+    async_app = None
+
+FOLDER = "AI/Memory/Contexts"
+
+
+class WriteBatchRouteTest(VaultTestCase):
+
+    INDEXED = True
+    # A folder named like a note, which cannot be written
+    NOTES = {os.path.join("AI", "Memory", "Contexts", "Folder.md", "inside.md"): "x\n"}
+
+    def post(self, body, content_type="application/json"):
+        return self.client.post("/write/batch", data=body, content_type=content_type)
+
+    def test_per_item_status_in_request_order(self):
+        items = [{"path": f"{FOLDER}/A.md", "content": "alpha\n"},
+                 {"path": f"{FOLDER}/B.md"},
+                 "not an object",
+                 {"path": f"{FOLDER}/Folder.md", "content": "x"},
+                 {"path": 7, "content": "x"},
+                 {"path": f"{FOLDER}/C.md", "content": "gamma\n"}]
+        with mock.patch.object(api.search_index, "add_notes", wraps=api.search_index.add_notes) as add_notes:
+            response = self.post(json.dumps(items))
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual((body["written"], body["failed"]), (2, 4))
+        self.assertEqual([(result["path"], result["status"]) for result in body["results"]],
+                         [(f"{FOLDER}/A.md", "success"), (f"{FOLDER}/B.md", "error"), (None, "error"),
+                          (f"{FOLDER}/Folder.md", "error"), (7, "error"), (f"{FOLDER}/C.md", "success")])
+        self.assertEqual(body["results"][1]["error"], "Path and content are required")
+        self.assertTrue(body["results"][3]["error"].startswith("Failed to write file"))
+        self.assertNotIn("error", body["results"][0])
+
+        add_notes.assert_called_once()
+        self.assertEqual(read_file(self.path(f"{FOLDER}/C.md")), "gamma\n")
+        self.assertEqual(self.client.get("/search", query_string={"query": "alpha|gamma"}).get_json(),
+                         [os.path.join("AI", "Memory", "Contexts", name) for name in ("A.md", "C.md")])
+
+    def test_ndjson_reports_bad_lines(self):
+        body = "\n".join([json.dumps({"path": f"{FOLDER}/D.md", "content": "delta\n"}), "",
+                          "{not json", json.dumps({"path": f"{FOLDER}/D.md", "content": "delta 2\n"})])
+        results = self.post(body, api.NDJSON_MIMETYPE).get_json()["results"]
+        self.assertEqual([result["status"] for result in results], ["success", "error", "success"])
+        self.assertIn("Invalid JSON on line 3", results[1]["error"])
+        # Items for one path are written in order
+        self.assertEqual(read_file(self.path(f"{FOLDER}/D.md")), "delta 2\n")
+
+    def test_invalid_bodies(self):
+        for body in ("{not json", json.dumps({"path": "a.md", "content": "x"})):
+            response = self.post(body)
+            self.assertEqual(response.status_code, 400, body)
+            self.assertIn("error", response.get_json())
+        self.assertEqual(self.post("[]").get_json(), {"written": 0, "failed": 0, "results": []})
+
+
+class ClientWriteBatchTest(VaultTestCase):
+
+    def test_client_and_jsonrpc_write_batch(self):
+        url, stop = start_server()
+        self.addCleanup(stop)
+        with mock.patch.object(client, "SERVER_URL", url):
+            result = client.write_notes([{"path": f"{FOLDER}/E.md", "content": "epsilon\n"}, {"path": "x"}])
+            self.assertEqual((result["written"], result["failed"]), (1, 1))
+            result = client.handle_jsonrpc("write_batch", {"notes": [{"path": f"{FOLDER}/F.md", "content": "f"}]})
+            self.assertEqual(result["written"], 1)
+            self.assertEqual(client.handle_jsonrpc("write_batch", {"notes": "x"})["error"]["code"], -32602)
+        self.assertEqual(read_file(self.path(f"{FOLDER}/E.md")), "epsilon\n")
+
+
+@unittest.skipIf(async_app is None, "needs aiohttp")
+class AsyncWriteBatchTest(VaultTestCase, unittest.IsolatedAsyncioTestCase):
+
+    async def test_answers_like_flask(self):
+        async_client = TestClient(TestServer(async_app.create_app()))
+        await async_client.start_server()
+        self.addAsyncCleanup(async_client.close)
+        body = "\n".join([json.dumps({"path": f"{FOLDER}/G.md", "content": "g\n"}), "{bad"])
+        async with async_client.post("/write/batch", data=body,
+                                     headers={"Content-Type": api.NDJSON_MIMETYPE}) as response:
+            async_result = await response.json()
+        flask_result = self.client.post("/write/batch", data=body, content_type=api.NDJSON_MIMETYPE).get_json()
+        self.assertEqual(async_result, flask_result)
+        self.assertEqual((async_result["written"], async_result["failed"]), (1, 1))
+        self.assertEqual(read_file(self.path(f"{FOLDER}/G.md")), "g\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,7 +13,13 @@ import datetime
 
 # Set the path to the universal client
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-CLIENT_PATH = os.path.join(SCRIPT_DIR, "obsidian", "adapters", "universal_client.py")
+CLIENT_DIR = os.path.join(SCRIPT_DIR, "obsidian", "adapters")
+CLIENT_PATH = os.path.join(CLIENT_DIR, "universal_client.py")
+
+# "inprocess" (default) imports the universal client; "subprocess" runs it as a script
+CLIENT_MODE = os.environ.get("SMF_CLIENT_MODE", "inprocess")
+
+_client = None
 
 
 def check_dependencies():
@@ -30,6 +36,21 @@ def check_client_exists():
         sys.exit(1)
 
 
+def load_client():
+    """Import the universal client module, or return None if it cannot be used in this interpreter"""
+    global _client
+    if _client is None and CLIENT_MODE != "subprocess":
+        if CLIENT_DIR not in sys.path:
+            sys.path.insert(0, CLIENT_DIR)
+        try:
+            import universal_client
+            _client = universal_client
+        except ImportError:
+            # Most likely requests is not installed here; fall back to other interpreters
+            return None
+    return _client
+
+
 def run_client(args):
     """Run the universal client with the given arguments"""
     # First, try using the same Python interpreter as this script
@@ -65,14 +86,64 @@ def run_client(args):
             sys.exit(1)
 
 
+def call_client(command, *args, **options):
+    """
+    Run a universal client command (search, read, write, append, patch, recent or status) and return its result
+    
+    The client is called in-process; run_client() is only used when it cannot be
+    imported or SMF_CLIENT_MODE=subprocess. Options are passed as --name flags in
+    that case. Errors are printed and exit like the client's command line does.
+    Returns the parsed JSON result, or the raw output if it is not JSON.
+    """
+    client = load_client()
+    if client is None:
+        cli_args = [command] + [str(arg) for arg in args]
+        for name, value in options.items():
+            if value is not None:
+                cli_args += [f"--{name}", str(value)]
+        output = run_client(cli_args)
+        try:
+            return json.loads(output)
+        except json.JSONDecodeError:
+            return output
+    
+    if command == "search":
+        result = client.search_notes(*args, **options)
+    elif command == "read":
+        result = client.read_notes(list(args))
+    elif command == "write":
+        result = client.write_note(*args)
+    elif command == "append":
+        result = client.append_note(*args)
+    elif command == "patch":
+        result = client.patch_note(*args, **options)
+    elif command == "recent":
+        result = client.recent_conversations(*args, **options)
+    else:
+        result = client.check_server()
+        if result.get("status") == "error":
+            print(f"Error: {result.get('message', 'Unknown error')}")
+            sys.exit(1)
+        return result
+    
+    # Handle errors the same way as the client's command line
+    if isinstance(result, dict) and isinstance(result.get("error"), dict):
+        print(f"Error: {result['error'].get('message', 'Unknown error')}")
+        sys.exit(1)
+    return result
+
+
+def print_result(result):
+    """Print a client result as indented JSON"""
+    if isinstance(result, str):
+        print(result)
+    else:
+        print(json.dumps(result, indent=2))
+
+
 def search_notes(query):
     """Search for notes matching the query"""
-    result = run_client(["search", query])
-    try:
-        data = json.loads(result)
-        print(json.dumps(data, indent=2))
-    except json.JSONDecodeError:
-        print(result)
+    print_result(call_client("search", query))
 
 
 def get_recent_conversations(agent="Claude", limit=5):
@@ -86,79 +157,47 @@ def get_recent_conversations(agent="Claude", limit=5):
     Returns:
         List of sorted conversation paths with date/time information
     """
-    result = run_client(["search", agent])
-    try:
-        data = json.loads(result)
-        # Filter conversations only
-        conversations = [path for path in data if f"AI/Memory/Conversations/{agent}/" in path]
-        
-        # Extract date/time information and create tuples for sorting
-        conversation_dates = []
-        for path in conversations:
-            # Extract the date from the filename (format: YYYYMMDD-Topic.md or YYYYMMDD-HHMM-Topic.md)
-            filename = os.path.basename(path)
-            if "-" not in filename:
-                continue
-                
-            # Try to parse with date and time first
-            date_part = filename.split("-")[0]
-            parts = filename.split("-")
-            
-            try:
-                # For both formats, we always have at least a date
-                date_time = datetime.datetime.strptime(date_part, "%Y%m%d")
-                
-                # Check if we have a timestamp component (format: YYYYMMDD-HHMM-Topic.md)
-                if len(parts) >= 3 and len(parts[1]) == 4 and parts[1].isdigit():
-                    # This is a timestamped conversation
-                    time_part = parts[1]
-                    time_obj = datetime.datetime.strptime(time_part, "%H%M").time()
-                    date_time = datetime.datetime.combine(date_time.date(), time_obj)
-                
-                # Add to our list
-                conversation_dates.append((path, date_time))
-            except (ValueError, IndexError):
-                # Fallback: just use the filename and put it at the end
-                conversation_dates.append((path, datetime.datetime(1970, 1, 1)))
-        
-        # Sort by date/time, newest first
-        conversation_dates.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return the paths, limited to the requested number
-        return conversation_dates[:limit]
-    except json.JSONDecodeError:
+    # The server keeps conversations ordered by date, so this is an index lookup
+    data = call_client("recent", agent, limit=limit)
+    if isinstance(data, str):
         print("Error parsing JSON response")
         return []
+    
+    conversation_dates = []
+    for item in data:
+        if item.get("date"):
+            date_time = datetime.datetime.fromisoformat(item["date"])
+        else:
+            # Fallback: notes without a date in their filename sort last
+            date_time = datetime.datetime(1970, 1, 1)
+        conversation_dates.append((item["path"], date_time))
+    
+    return conversation_dates
 
 
 def read_note(path):
     """Read a note by path"""
-    result = run_client(["read", path])
-    try:
-        data = json.loads(result)
-        print(json.dumps(data, indent=2))
-    except json.JSONDecodeError:
-        print(result)
+    print_result(call_client("read", path))
 
 
 def write_note(path, content):
     """Write content to a note"""
-    result = run_client(["write", path, content])
-    try:
-        data = json.loads(result)
-        print(json.dumps(data, indent=2))
-    except json.JSONDecodeError:
-        print(result)
+    print_result(call_client("write", path, content))
+
+
+def append_note(path, content):
+    """Append content to a note"""
+    print_result(call_client("append", path, content))
+
+
+def patch_note(path, heading, content, operation=None):
+    """Replace, append to or prepend to the section of a note under a heading"""
+    print_result(call_client("patch", path, heading, content, operation=operation))
 
 
 def check_status():
     """Check server status"""
-    result = run_client(["status"])
-    try:
-        data = json.loads(result)
-        print(json.dumps(data, indent=2))
-    except json.JSONDecodeError:
-        print(result)
+    print_result(call_client("status"))
 
 def test_jsonrpc():
     """Test JSON-RPC connectivity for MCP"""
@@ -362,6 +401,18 @@ def main():
     write_parser.add_argument("path", help="Note path")
     write_parser.add_argument("content", help="Content to write")
 
+    # Append command
+    append_parser = subparsers.add_parser("append", help="Append content to a note")
+    append_parser.add_argument("path", help="Note path")
+    append_parser.add_argument("content", help="Content to append")
+
+    # Patch command
+    patch_parser = subparsers.add_parser("patch", help="Change one section of a note")
+    patch_parser.add_argument("path", help="Note path")
+    patch_parser.add_argument("heading", help="Section heading, e.g. \"## Actions\"")
+    patch_parser.add_argument("content", help="New section content")
+    patch_parser.add_argument("--operation", choices=["replace", "append", "prepend"], help="How to change the section (default: replace)")
+
     # Status command
     subparsers.add_parser("status", help="Check server status")
     
@@ -401,6 +452,10 @@ def main():
         read_note(args.path)
     elif args.command == "write":
         write_note(args.path, args.content)
+    elif args.command == "append":
+        append_note(args.path, args.content)
+    elif args.command == "patch":
+        patch_note(args.path, args.heading, args.content, args.operation)
     elif args.command == "status":
         check_status()
     elif args.command == "test-jsonrpc":